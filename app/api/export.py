@@ -0,0 +1,91 @@
+import csv
+from django.db.models import Q
+from rest_framework.utils.encoders import JSONEncoder
+from modelCore.models import Destination, Park, Attraction
+from modelCore.serializers import DestinationSerializer as FlatDestinationSerializer
+from modelCore.serializers import ParkSerializer as FlatParkSerializer
+from modelCore.values import ValuesPlan
+from .serializers import AttractionSerializer
+
+class ExportType:
+    """
+    One exportable catalog type
+
+    Rows are read with `.values()` (related names come in through joins) and
+    rendered by the ValuesPlan of the type's API serializer, so exported
+    records match the API representation.
+    """
+
+    def __init__(self, name, model, serializer_class, updated_fields=('updated_at',)):
+        self.name = name
+        self.model = model
+        self.serializer_class = serializer_class
+        self.updated_fields = updated_fields
+
+    def plan(self, context):
+        return ValuesPlan.compile(self.serializer_class(context=context), self.model)
+
+    def rows(self, plan, updated_since=None, chunk_size=2000):
+        """
+        Iterate rendered records in primary key order with constant memory
+
+        Args:
+            plan (ValuesPlan): Compiled plan of the serializer
+            updated_since (datetime, optional): Only rows changed at or after this time
+            chunk_size (int): Rows fetched per database round trip
+        """
+        queryset = self.model.objects.order_by('pk')
+        if updated_since is not None:
+            condition = Q()
+            for field in self.updated_fields:
+                condition |= Q(**{f'{field}__gte': updated_since})
+            queryset = queryset.filter(condition)
+        for row in queryset.values(*plan.lookups).iterator(chunk_size=chunk_size):
+            yield plan.render(row)
+
+EXPORT_TYPES = {
+    'destination': ExportType('destination', Destination, FlatDestinationSerializer),
+    'park': ExportType('park', Park, FlatParkSerializer),
+    # Review stats are part of the record, a new review counts as a change
+    'attraction': ExportType(
+        'attraction', Attraction, AttractionSerializer,
+        updated_fields=('updated_at', 'rating_summary__updated_at')
+    ),
+}
+
+class Echo:
+    """File-like object handing each written CSV line back to the caller"""
+
+    def write(self, value):
+        return value
+
+def ndjson_lines(types, context, updated_since=None):
+    """
+    Stream records of several types as NDJSON, one object per line with a `type` key
+
+    Args:
+        types (list): ExportType instances, exported in order
+        context (dict): Serializer context
+        updated_since (datetime, optional): Only rows changed at or after this time
+    """
+    encoder = JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    for export_type in types:
+        plan = export_type.plan(context)
+        for record in export_type.rows(plan, updated_since):
+            yield encoder.encode({'type': export_type.name, **record}) + '\n'
+
+def csv_lines(export_type, context, updated_since=None):
+    """
+    Stream records of one type as CSV with a header row
+
+    Args:
+        export_type (ExportType): Type to export
+        context (dict): Serializer context
+        updated_since (datetime, optional): Only rows changed at or after this time
+    """
+    plan = export_type.plan(context)
+    writer = csv.writer(Echo())
+    names = [name for name, _ in plan.converters]
+    yield writer.writerow(names)
+    for record in export_type.rows(plan, updated_since):
+        yield writer.writerow(['' if record[name] is None else record[name] for name in names])
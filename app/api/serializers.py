@@ -1,13 +1,53 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
-from modelCore.models import Destination, Park, Attraction, GuestReview, User
+from drf_yasg.utils import swagger_serializer_method
+from modelCore.models import Destination, Park, Attraction, GuestReview, User, AttractionRatingSummary, TicketType
+from modelCore.serializers import SparseFieldsetMixin, TicketTypeListSerializer
 
-class ParkSerializer(serializers.ModelSerializer):
+def with_review_stats(queryset):
+    """
+    Join the precomputed rating summary onto an Attraction queryset
+
+    ReviewStatsMixin reads the summary instead of aggregating reviews per attraction.
+    """
+    return queryset.select_related('rating_summary')
+
+def with_parks(queryset):
+    """
+    Prefetch the parks of a Destination queryset, ordered by name
+
+    DestinationSerializer and the index page read `destination.parks.all`,
+    which then costs one query for all destinations instead of one per destination.
+    """
+    return queryset.prefetch_related(
+        Prefetch('parks', queryset=Park.objects.order_by('name', 'id'))
+    )
+
+def with_park_bundle(queryset):
+    """
+    Load everything ParkBundleSerializer reads for a Park queryset
+
+    The destination is joined in, attractions (with rating summaries) and
+    active ticket types are prefetched. Prefetched rows get their park set
+    from the parent, so a bundle costs three queries however many
+    attractions and ticket types the park has.
+    """
+    return queryset.select_related('destination').prefetch_related(
+        Prefetch('attractions', queryset=with_review_stats(Attraction.objects.all())),
+        Prefetch(
+            'ticket_types',
+            queryset=TicketType.objects.filter(is_active=True),
+            to_attr='active_ticket_types'
+        ),
+    )
+
+class ParkSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Park
         fields = ['id', 'name', 'created_at', 'updated_at']
         ref_name = 'WebParkSerializer'
 
-class DestinationSerializer(serializers.ModelSerializer):
+class DestinationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     parks = ParkSerializer(many=True, read_only=True)
 
     class Meta:
@@ -48,8 +88,57 @@ class GuestReviewCreateSerializer(serializers.ModelSerializer):
         review = GuestReview.objects.create(**validated_data)
         return review
 
-class AttractionReviewsSerializer(serializers.ModelSerializer):
-    reviews = GuestReviewSerializer(many=True, read_only=True)
+class ReviewStatsMixin:
+    """
+    review_count/avg_rating fields for attraction serializers
+
+    Reads AttractionRatingSummary, joined in by with_review_stats for querysets
+    and loaded with one query for single objects.
+    """
+    sparse_field_relations = {
+        'review_count': ('rating_summary',),
+        'avg_rating': ('rating_summary',),
+    }
+    values_method_fields = {
+        'review_count': (
+            ('rating_summary__review_count',),
+            lambda count: count or 0,
+        ),
+        'avg_rating': (
+            ('rating_summary__review_count', 'rating_summary__avg_rating'),
+            lambda count, avg: round(avg, 1) if count else 0,
+        ),
+    }
+    
+    def _is_swagger_fake_view(self):
+        # Check if this is for Swagger documentation generation
+        request = self.context.get('request')
+        return bool(request and getattr(request, 'swagger_fake_view', False))
+    
+    def _review_stats(self, obj):
+        try:
+            summary = obj.rating_summary
+        except AttractionRatingSummary.DoesNotExist:
+            # Attractions without published reviews have no summary row
+            return 0, 0
+        return summary.review_count, summary.avg_rating
+    
+    def get_review_count(self, obj):
+        if self._is_swagger_fake_view():
+            return 0
+        count, _ = self._review_stats(obj)
+        return count
+    
+    def get_avg_rating(self, obj):
+        if self._is_swagger_fake_view():
+            return 0
+        count, avg = self._review_stats(obj)
+        if not count:
+            return 0
+        return round(avg, 1)
+
+class AttractionReviewsSerializer(ReviewStatsMixin, serializers.ModelSerializer):
+    reviews = serializers.SerializerMethodField()
     review_count = serializers.SerializerMethodField()
     avg_rating = serializers.SerializerMethodField()
     
@@ -58,23 +147,16 @@ class AttractionReviewsSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'reviews', 'review_count', 'avg_rating']
         ref_name = 'WebAttractionReviewsSerializer'
     
-    def get_review_count(self, obj):
-        # Check if this is for Swagger documentation generation
-        if hasattr(self, 'context') and self.context.get('request') and getattr(self.context['request'], 'swagger_fake_view', False):
-            return 0
-        return obj.reviews.filter(is_published=True).count()
+    @swagger_serializer_method(serializer_or_field=GuestReviewSerializer(many=True))
+    def get_reviews(self, obj):
+        # The view passes the current page of reviews, otherwise serialize them all
+        reviews = self.context.get('reviews')
+        if reviews is None:
+            reviews = obj.reviews.select_related('user')
+        return GuestReviewSerializer(reviews, many=True, context=self.context).data
     
-    def get_avg_rating(self, obj):
-        # Check if this is for Swagger documentation generation
-        if hasattr(self, 'context') and self.context.get('request') and getattr(self.context['request'], 'swagger_fake_view', False):
-            return 0
-        reviews = obj.reviews.filter(is_published=True)
-        if not reviews.exists():
-            return 0
-        total_rating = sum(review.rating for review in reviews)
-        return round(total_rating / reviews.count(), 1)
 
-class AttractionSerializer(serializers.ModelSerializer):
+class AttractionSerializer(ReviewStatsMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     review_count = serializers.SerializerMethodField()
     avg_rating = serializers.SerializerMethodField()
     park_name = serializers.CharField(source='park.name', read_only=True)
@@ -92,20 +174,32 @@ class AttractionSerializer(serializers.ModelSerializer):
             'review_count', 'avg_rating'
         ]
         ref_name = 'WebAttractionSerializer'
+
+class NearbyAttractionSerializer(AttractionSerializer):
+    """Attraction with its distance in meters, read from context['distances']"""
+    distance = serializers.SerializerMethodField()
     
-    def get_review_count(self, obj):
-        # Check if this is for Swagger documentation generation
-        if hasattr(self, 'context') and self.context.get('request') and getattr(self.context['request'], 'swagger_fake_view', False):
-            return 0
-        return obj.reviews.filter(is_published=True).count()
+    class Meta(AttractionSerializer.Meta):
+        fields = AttractionSerializer.Meta.fields + ['distance']
+        ref_name = 'WebNearbyAttractionSerializer'
     
-    def get_avg_rating(self, obj):
-        # Check if this is for Swagger documentation generation
-        if hasattr(self, 'context') and self.context.get('request') and getattr(self.context['request'], 'swagger_fake_view', False):
-            return 0
-        reviews = obj.reviews.filter(is_published=True)
-        if not reviews.exists():
-            return 0
-        total_rating = sum(review.rating for review in reviews)
-        return round(total_rating / reviews.count(), 1)
+    def get_distance(self, obj):
+        distance = self.context.get('distances', {}).get(obj.pk)
+        return None if distance is None else round(distance, 1)
+
+class DestinationSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Destination
+        fields = ['id', 'name', 'slug']
+        ref_name = 'WebDestinationSummarySerializer'
 
+class ParkBundleSerializer(serializers.ModelSerializer):
+    """Everything the park page shows, for parks loaded with with_park_bundle"""
+    destination = DestinationSummarySerializer(read_only=True)
+    attractions = AttractionSerializer(many=True, read_only=True)
+    ticket_types = TicketTypeListSerializer(source='active_ticket_types', many=True, read_only=True)
+    
+    class Meta:
+        model = Park
+        fields = ['id', 'name', 'image', 'destination', 'attractions', 'ticket_types', 'created_at', 'updated_at']
+        ref_name = 'WebParkBundleSerializer'
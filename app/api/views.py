@@ -1,37 +1,185 @@
 from django.shortcuts import render
+from django.http import StreamingHttpResponse
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.safestring import mark_safe
 from rest_framework import viewsets, status, permissions, pagination
-from modelCore.models import Destination, Park, Attraction, GuestReview
+from modelCore.models import Destination, Park, Attraction, GuestReview, AttractionNeighbor, TicketType
 from .serializers import DestinationSerializer, ParkSerializer
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from .serializers import (
     AttractionSerializer,
     GuestReviewSerializer,
     GuestReviewCreateSerializer,
-    AttractionReviewsSerializer
+    AttractionReviewsSerializer,
+    NearbyAttractionSerializer,
+    ParkBundleSerializer,
+    with_review_stats,
+    with_parks,
+    with_park_bundle
+)
+from django.db import models, transaction
+from modelCore import geo, search as catalog_search
+from . import export
+from modelCore.pagination import AttractionPagination, ReviewPagination, PaginatedActionMixin
+from modelCore.generations import CACHE_ERRORS, get_cache, get_generations
+from modelCore.mixins import (
+    ConditionalGetMixin, CachedResponseMixin, SparseFieldsetViewMixin, ValuesListMixin, BatchRetrieveMixin
 )
-from django.db import models
 from rest_framework.authentication import TokenAuthentication, SessionAuthentication
 
 # Create your views here.
 
+DESTINATION_TREE_KEY = 'catalog:destination-tree:{}'
+DESTINATION_TREE_TIMEOUT = 24 * 60 * 60
+
+def build_destination_tree():
+    """Render the destination tree HTML from the database"""
+    return render_to_string('web/destination_tree.html', {
+        'destinations': with_parks(Destination.objects.all()),
+    })
+
+def render_destination_tree():
+    """
+    Render the destination -> parks tree of the main page
+
+    The HTML is cached under the current Destination/Park generations, so it
+    is rebuilt only after destinations or parks change, and on every request
+    while the cache is unavailable.
+    """
+    generations = get_generations((Destination, Park))
+    if generations is None:
+        return mark_safe(build_destination_tree())
+    cache = get_cache()
+    key = DESTINATION_TREE_KEY.format('.'.join(map(str, generations)))
+    try:
+        tree = cache.get(key)
+    except CACHE_ERRORS:
+        tree = None
+    if tree is None:
+        tree = build_destination_tree()
+        try:
+            cache.set(key, tree, DESTINATION_TREE_TIMEOUT)
+        except CACHE_ERRORS:
+            pass
+    return mark_safe(tree)
+
 def index(request):
     """
     Render the main page
     """
-    destinations = Destination.objects.all()
     context = {
-        'destinations': destinations,
+        'destination_tree': render_destination_tree(),
     }
     return render(request, 'web/index.html', context)
 
-class DestinationViewSet(viewsets.ModelViewSet):
+@swagger_auto_schema(
+    method='get',
+    operation_description="Full-text search over destinations, parks and attractions, best match first",
+    manual_parameters=[
+        openapi.Parameter('q', openapi.IN_QUERY, description="Search text, CJK and prefix matching supported", type=openapi.TYPE_STRING, required=True),
+        openapi.Parameter('type', openapi.IN_QUERY, description="Comma separated types: destination, park, attraction", type=openapi.TYPE_STRING, required=False),
+        openapi.Parameter('limit', openapi.IN_QUERY, description="Maximum results (default 20, max 100)", type=openapi.TYPE_INTEGER, required=False),
+    ]
+)
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def search(request):
+    """
+    Search the catalog
+    """
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return Response({"error": "q is required"}, status=status.HTTP_400_BAD_REQUEST)
+    
+    kinds = [kind for kind in request.query_params.get('type', '').split(',') if kind]
+    unknown = set(kinds) - set(catalog_search.DOCUMENTS)
+    if unknown:
+        return Response(
+            {"error": f"Unknown type: {', '.join(sorted(unknown))}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    try:
+        limit = min(max(int(request.query_params.get('limit', 20)), 1), 100)
+    except ValueError:
+        return Response({"error": "limit must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+    
+    results = catalog_search.get_backend().search(query, kinds=kinds or None, limit=limit)
+    return Response({'count': len(results), 'results': results})
+
+@swagger_auto_schema(
+    method='get',
+    operation_description=(
+        "Stream the catalog in one response. NDJSON has one object per line with a `type` key, "
+        "CSV exports a single type with a header row."
+    ),
+    manual_parameters=[
+        openapi.Parameter('output', openapi.IN_QUERY, description="ndjson (default) or csv", type=openapi.TYPE_STRING, required=False),
+        openapi.Parameter('type', openapi.IN_QUERY, description="Comma separated types: destination, park, attraction (default all, exactly one for csv)", type=openapi.TYPE_STRING, required=False),
+        openapi.Parameter('updated_since', openapi.IN_QUERY, description="Only records changed at or after this ISO date/datetime", type=openapi.TYPE_STRING, required=False),
+    ],
+    responses={200: "Streamed NDJSON or CSV"}
+)
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def export_catalog(request):
+    """
+    Stream destinations, parks and attractions as NDJSON or CSV
+    """
+    output = request.query_params.get('output', 'ndjson')
+    if output not in ('ndjson', 'csv'):
+        return Response({"error": "output must be ndjson or csv"}, status=status.HTTP_400_BAD_REQUEST)
+    
+    names = [name for name in request.query_params.get('type', '').split(',') if name] or list(export.EXPORT_TYPES)
+    unknown = set(names) - set(export.EXPORT_TYPES)
+    if unknown:
+        return Response(
+            {"error": f"Unknown type: {', '.join(sorted(unknown))}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if output == 'csv' and len(names) != 1:
+        return Response({"error": "csv exports exactly one type"}, status=status.HTTP_400_BAD_REQUEST)
+    
+    updated_since = None
+    value = request.query_params.get('updated_since')
+    if value:
+        updated_since = parse_datetime(value)
+        if updated_since is None and parse_date(value) is not None:
+            updated_since = parse_datetime(f'{value}T00:00:00')
+        if updated_since is None:
+            return Response({"error": "updated_since must be an ISO date or datetime"}, status=status.HTTP_400_BAD_REQUEST)
+        if timezone.is_naive(updated_since):
+            updated_since = timezone.make_aware(updated_since)
+    
+    types = [export.EXPORT_TYPES[name] for name in names]
+    context = {'request': request}
+    filename = f"catalog-{timezone.now():%Y%m%d%H%M%S}"
+    if output == 'csv':
+        response = StreamingHttpResponse(
+            export.csv_lines(types[0], context, updated_since),
+            content_type='text/csv; charset=utf-8'
+        )
+        filename = f'{filename}-{names[0]}.csv'
+    else:
+        response = StreamingHttpResponse(
+            export.ndjson_lines(types, context, updated_since),
+            content_type='application/x-ndjson; charset=utf-8'
+        )
+        filename = f'{filename}.ndjson'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+class DestinationViewSet(CachedResponseMixin, ConditionalGetMixin, SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """Destination Viewset"""
-    queryset = Destination.objects.all()
+    queryset = with_parks(Destination.objects.all())
     serializer_class = DestinationSerializer
     authentication_classes = [TokenAuthentication, SessionAuthentication]
+    conditional_timestamp_fields = ('updated_at', 'parks__updated_at')
+    cache_models = (Destination, Park)
     
     def get_permissions(self):
         """
@@ -61,24 +209,39 @@ class DestinationViewSet(viewsets.ModelViewSet):
     def retrieve(self, request, *args, **kwargs):
         return super().retrieve(request, *args, **kwargs)
 
-class ParkViewSet(viewsets.ModelViewSet):
+class ParkViewSet(CachedResponseMixin, ConditionalGetMixin, SparseFieldsetViewMixin, ValuesListMixin, BatchRetrieveMixin, PaginatedActionMixin, viewsets.ModelViewSet):
     """Theme Park Viewset"""
     queryset = Park.objects.all()
     serializer_class = ParkSerializer
     authentication_classes = [TokenAuthentication, SessionAuthentication]
+    cache_models = (Park,)
+    cache_actions = CachedResponseMixin.cache_actions + ('bundle',)
+    # Everything a bundle shows, see ParkBundleSerializer
+    bundle_cache_models = (Park, Destination, Attraction, GuestReview, TicketType)
 
     def get_permissions(self):
         """
         Set permissions based on action type:
-        - List and retrieve views: Allow unauthenticated access
+        - List, retrieve, batch and bundle views: Allow unauthenticated access
         - Create, update, delete views: Require admin permissions
         """
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'batch', 'bundle']:
             permission_classes = [permissions.AllowAny]
         else:
             permission_classes = [permissions.IsAdminUser]
         return [permission() for permission in permission_classes]
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'bundle':
+            queryset = with_park_bundle(queryset)
+        return queryset
+
+    def get_cache_models(self):
+        if self.action == 'bundle':
+            return self.bundle_cache_models
+        return super().get_cache_models()
+
     @swagger_auto_schema(
         operation_description="Get a list of all parks",
         responses={200: ParkSerializer(many=True)}
@@ -93,9 +256,10 @@ class ParkViewSet(viewsets.ModelViewSet):
     )
     def attractions(self, request, *args, **kwargs):
         park = self.get_object()
-        attractions = Attraction.objects.filter(park=park)
-        serializer = AttractionSerializer(attractions, many=True)
-        return Response(serializer.data)
+        attractions = with_review_stats(
+            Attraction.objects.filter(park=park).select_related('park', 'park__destination')
+        )
+        return self.paginated_response(attractions, AttractionSerializer, AttractionPagination)
 
     @swagger_auto_schema(
         operation_description="Get detailed information for a specific park",
@@ -104,19 +268,44 @@ class ParkViewSet(viewsets.ModelViewSet):
     def retrieve(self, request, *args, **kwargs):
         return super().retrieve(request, *args, **kwargs)
 
-class AttractionViewSet(viewsets.ModelViewSet):
+    @action(detail=True, methods=['get'])
+    @swagger_auto_schema(
+        operation_description="Get a park with its destination, attractions (with review stats) and active ticket types",
+        responses={200: ParkBundleSerializer()}
+    )
+    def bundle(self, request, *args, **kwargs):
+        return self.cached_response(request, self.bundle_response, *args, **kwargs)
+
+    def bundle_response(self, request, *args, **kwargs):
+        park = self.get_object()
+        serializer = ParkBundleSerializer(park, context=self.get_serializer_context())
+        return Response(serializer.data)
+
+class AttractionViewSet(CachedResponseMixin, ConditionalGetMixin, SparseFieldsetViewMixin, ValuesListMixin, BatchRetrieveMixin, PaginatedActionMixin, viewsets.ModelViewSet):
     """Attraction Viewset"""
     queryset = Attraction.objects.all()
     serializer_class = AttractionSerializer
     authentication_classes = [TokenAuthentication, SessionAuthentication]
+    pagination_class = AttractionPagination
+    conditional_timestamp_fields = (
+        'updated_at',
+        'park__updated_at',
+        'park__destination__updated_at',
+        'rating_summary__updated_at',
+    )
+    cache_models = (Attraction, Park, Destination, GuestReview)
+    nearby_default_radius = 1000
+    nearby_max_radius = 50000
+    nearby_default_limit = 20
+    nearby_max_limit = 100
 
     def get_permissions(self):
         """
         Set permissions based on action type:
-        - List and retrieve views: Allow unauthenticated access
+        - List, retrieve, batch and location views: Allow unauthenticated access
         - Create, update, delete views: Require admin permissions
         """
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'batch', 'nearby', 'neighbors']:
             permission_classes = [permissions.AllowAny]
         else:
             permission_classes = [permissions.IsAdminUser]
@@ -128,7 +317,9 @@ class AttractionViewSet(viewsets.ModelViewSet):
         if getattr(self, 'swagger_fake_view', False):
             return Attraction.objects.none()
             
-        queryset = Attraction.objects.all().select_related('park', 'park__destination')
+        queryset = with_review_stats(
+            Attraction.objects.all().select_related('park', 'park__destination')
+        )
         
         # Filter by query parameters
         park_id = self.request.query_params.get('park')
@@ -161,6 +352,20 @@ class AttractionViewSet(viewsets.ModelViewSet):
                 type=openapi.TYPE_STRING,
                 format=openapi.FORMAT_UUID,
                 required=False
+            ),
+            openapi.Parameter(
+                'fields',
+                openapi.IN_QUERY,
+                description="Comma separated fields to return, e.g. id,name,latitude,longitude",
+                type=openapi.TYPE_STRING,
+                required=False
+            ),
+            openapi.Parameter(
+                'omit',
+                openapi.IN_QUERY,
+                description="Comma separated fields to leave out",
+                type=openapi.TYPE_STRING,
+                required=False
             )
         ]
     )
@@ -186,15 +391,100 @@ class AttractionViewSet(viewsets.ModelViewSet):
             return Response({"detail": "Cannot get reviews for swagger fake view"})
             
         attraction = self.get_object()
-        serializer = AttractionReviewsSerializer(attraction, context={'request': request})
-        return Response(serializer.data)
+        reviews = attraction.reviews.select_related('user')
+        paginator, page = self.paginate_action(reviews, ReviewPagination)
+        
+        context = self.get_serializer_context()
+        context['reviews'] = page
+        data = AttractionReviewsSerializer(attraction, context=context).data
+        if paginator is not None:
+            data['next'] = paginator.get_next_link()
+            data['previous'] = paginator.get_previous_link()
+        return Response(data)
+
+    def distance_response(self, matches):
+        """
+        Serialize (attraction id, distance) pairs in order, with their distances
+
+        Args:
+            matches (list): (attraction ID, distance in meters) pairs
 
+        Returns:
+            Response: Attractions with a `distance` field
+        """
+        attractions = self.get_queryset().in_bulk([attraction_id for attraction_id, _ in matches])
+        context = self.get_serializer_context()
+        context['distances'] = dict(matches)
+        ordered = [attractions[attraction_id] for attraction_id, _ in matches if attraction_id in attractions]
+        return Response({
+            'count': len(ordered),
+            'results': NearbyAttractionSerializer(ordered, many=True, context=context).data,
+        })
 
-class GuestReviewViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['get'])
+    @swagger_auto_schema(
+        operation_description="Get attractions within a radius of a point, nearest first",
+        manual_parameters=[
+            openapi.Parameter('lat', openapi.IN_QUERY, description="Latitude", type=openapi.TYPE_NUMBER, required=True),
+            openapi.Parameter('lng', openapi.IN_QUERY, description="Longitude", type=openapi.TYPE_NUMBER, required=True),
+            openapi.Parameter('radius', openapi.IN_QUERY, description="Radius in meters (default 1000, max 50000)", type=openapi.TYPE_NUMBER, required=False),
+            openapi.Parameter('limit', openapi.IN_QUERY, description="Maximum results (default 20, max 100)", type=openapi.TYPE_INTEGER, required=False),
+        ],
+        responses={200: NearbyAttractionSerializer(many=True)}
+    )
+    def nearby(self, request):
+        """Get attractions near a point"""
+        try:
+            latitude = float(request.query_params['lat'])
+            longitude = float(request.query_params['lng'])
+            radius = float(request.query_params.get('radius', self.nearby_default_radius))
+            limit = int(request.query_params.get('limit', self.nearby_default_limit))
+        except (KeyError, ValueError):
+            return Response(
+                {"error": "lat and lng are required, radius and limit must be numbers"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180) or radius <= 0 or limit <= 0:
+            return Response(
+                {"error": "Coordinates out of range or non-positive radius/limit"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        matches = Attraction.find_nearby(
+            latitude, longitude,
+            min(radius, self.nearby_max_radius),
+            min(limit, self.nearby_max_limit),
+            queryset=self.get_queryset()
+        )
+        return self.distance_response(matches)
+
+    @action(detail=True, methods=['get'])
+    @swagger_auto_schema(
+        operation_description="Get the attractions closest to a specific attraction",
+        responses={200: NearbyAttractionSerializer(many=True)}
+    )
+    def neighbors(self, request, *args, **kwargs):
+        """Get the precomputed nearest attractions, computed on the fly if not built yet"""
+        attraction = self.get_object()
+        matches = list(attraction.neighbors.values_list('neighbor_id', 'distance'))
+        if not matches and attraction.geohash:
+            lat_deg, _ = geo.cell_size(AttractionNeighbor.CANDIDATE_PRECISION)
+            matches = [
+                match for match in Attraction.find_nearby(
+                    attraction.latitude, attraction.longitude,
+                    lat_deg * geo.METERS_PER_DEGREE
+                )
+                if match[0] != attraction.pk
+            ][:10]
+        return self.distance_response(matches)
+
+
+class GuestReviewViewSet(PaginatedActionMixin, viewsets.ModelViewSet):
     """Guest Review Viewset"""
     queryset = GuestReview.objects.all()
     serializer_class = GuestReviewSerializer
     authentication_classes = [TokenAuthentication, SessionAuthentication]
+    pagination_class = ReviewPagination
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
@@ -204,10 +494,21 @@ class GuestReviewViewSet(viewsets.ModelViewSet):
             return GuestReview.objects.all()
         return GuestReview.objects.filter(user=user)
 
+    @transaction.atomic
     def perform_create(self, serializer):
         """Ensure review is associated with the current user"""
         serializer.save(user=self.request.user)
     
+    @transaction.atomic
+    def perform_update(self, serializer):
+        """Save the review and its rating summary update together"""
+        serializer.save()
+    
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        """Delete the review and its rating summary update together"""
+        instance.delete()
+    
     @swagger_auto_schema(
         operation_description="Get a list of reviews",
         responses={200: GuestReviewSerializer(many=True)},
@@ -273,9 +574,8 @@ class GuestReviewViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_401_UNAUTHORIZED
             )
             
-        reviews = GuestReview.objects.filter(user=request.user)
-        serializer = GuestReviewSerializer(reviews, many=True)
-        return Response(serializer.data)
+        reviews = GuestReview.objects.filter(user=request.user).select_related('user')
+        return self.paginated_response(reviews, GuestReviewSerializer)
     
     @action(detail=False, methods=['get'])
     @swagger_auto_schema(
@@ -312,7 +612,6 @@ class GuestReviewViewSet(viewsets.ModelViewSet):
         reviews = GuestReview.objects.filter(
             attraction=attraction,
             is_published=True
-        )
-        serializer = GuestReviewSerializer(reviews, many=True)
-        return Response(serializer.data)
+        ).select_related('user')
+        return self.paginated_response(reviews, GuestReviewSerializer)
 
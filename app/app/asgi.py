@@ -14,3 +14,7 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings")
 
 application = get_asgi_application()
+
+# Build the catalog database singletons in the web server only, so their caches
+# are warmed from the local snapshot at startup
+import modelCore.views  # noqa: E402,F401
@@ -1,7 +1,18 @@
+import zlib
 from django.http import JsonResponse
 from django.conf import settings
+from django.utils.cache import patch_vary_headers
 from rest_framework.authtoken.models import Token
 
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+GZIP_LEVEL = 6
+# 動態內容使用中等壓縮等級，兼顧速度和壓縮率
+BROTLI_QUALITY = 5
+
 class TokenAuthMiddleware:
     """
     自定義中間件，用於在整個應用中強制要求認證
@@ -54,6 +65,7 @@ class TokenAuthMiddleware:
                 '/api/parks/',
                 '/api/attractions/',
                 '/api/ticket-types/',
+                '/api/search/',
             ]
             
             for path in public_api_paths:
@@ -92,4 +104,154 @@ class TokenAuthMiddleware:
             return JsonResponse({
                 'detail': '無效的認證頭格式',
                 'code': 'invalid_header_format'
-            }, status=401) 
\ No newline at end of file
+            }, status=401)
+
+class GzipStream:
+    """增量 gzip 壓縮，每個分塊都會刷新，客戶端可以立即解壓"""
+
+    def __init__(self):
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def process(self, data):
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush()
+
+class BrotliStream:
+    """增量 brotli 壓縮，每個分塊都會刷新"""
+
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def process(self, data):
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+def parse_accept_encoding(header):
+    """
+    解析 Accept-Encoding 請求頭
+    
+    Returns:
+        dict: 編碼名稱到權重 q 的映射
+    """
+    weights = {}
+    for part in header.split(','):
+        coding, _, params = part.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        for param in params.split(';'):
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding] = weight
+    return weights
+
+def choose_encoding(header):
+    """
+    根據 Accept-Encoding 選擇壓縮編碼，權重相同時優先使用 brotli
+    
+    Returns:
+        str: 'br'、'gzip'，客戶端不接受任何可用編碼時為 None
+    """
+    weights = parse_accept_encoding(header)
+    fallback = weights.get('*', 0.0)
+    available = ('br', 'gzip') if brotli is not None else ('gzip',)
+    best, best_weight = None, 0.0
+    for coding in available:
+        weight = weights.get(coding, fallback)
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+class CompressionMiddleware:
+    """
+    按客戶端的 Accept-Encoding 壓縮響應
+    
+    只壓縮 COMPRESSION_CONTENT_TYPES 中的類型（JSON、NDJSON、CSV 等）。
+    HTML 頁面包含 CSRF 令牌，不壓縮以避免 BREACH 攻擊。
+    小於 COMPRESSION_MIN_SIZE 的響應不壓縮，流式響應逐塊壓縮。
+    安裝了 brotli 時優先使用 br，否則使用 gzip。
+    """
+
+    stream_classes = {
+        'gzip': GzipStream,
+        'br': BrotliStream,
+    }
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = settings.COMPRESSION_MIN_SIZE
+        self.content_types = tuple(settings.COMPRESSION_CONTENT_TYPES)
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not self.is_compressible(response):
+            return response
+
+        # 同一個 URL 的響應會因 Accept-Encoding 不同而不同
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        stream_class = self.stream_classes[encoding]
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = self.compress_async(stream_class(), response.streaming_content)
+            else:
+                response.streaming_content = self.compress_stream(stream_class(), response.streaming_content)
+            del response.headers['Content-Length']
+        else:
+            if len(response.content) < self.min_size:
+                return response
+            stream = stream_class()
+            compressed = stream.process(response.content) + stream.finish()
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # 壓縮後的內容和原始內容不再逐字節相同
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    def is_compressible(self, response):
+        if response.has_header('Content-Encoding'):
+            return False
+        if response.status_code < 200 or response.status_code in (204, 304):
+            return False
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type not in self.content_types:
+            return False
+        # 已知長度的流式響應同樣遵循大小閾值
+        length = response.get('Content-Length')
+        if response.streaming and length and length.isdigit() and int(length) < self.min_size:
+            return False
+        return True
+
+    @staticmethod
+    def compress_stream(stream, chunks):
+        for chunk in chunks:
+            data = stream.process(chunk)
+            if data:
+                yield data
+        yield stream.finish()
+
+    @staticmethod
+    async def compress_async(stream, chunks):
+        async for chunk in chunks:
+            data = stream.process(chunk)
+            if data:
+                yield data
+        yield stream.finish()
@@ -76,6 +76,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    # 按 Accept-Encoding 壓縮 API 響應，需放在讀寫響應內容的中間件之前
+    "app.middleware.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     # "corsheaders.middleware.CorsMiddleware",  # CORS middleware
     "django.middleware.common.CommonMiddleware",
@@ -89,6 +91,9 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = "app.urls"
 
+# 測試運行器，測試期間使用 app.test_runner.TEST_SETTINGS 覆蓋的設置
+TEST_RUNNER = "app.test_runner.TestRunner"
+
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
@@ -168,6 +173,53 @@ AUTH_USER_MODEL="modelCore.User"
 # Park API 設置
 PARK_API_BASE_URL = 'https://api.themeparks.wiki/v1'
 PARK_API_KEY = ''  # 如果需要 API 密鑰，請在此處設置
+# 公園/目的地 API 的數據來源：'database' 從本地表讀取並由 refresh_catalog 命令同步上游，'api' 在請求中直接調用上游
+PARK_DATA_SOURCE = 'database'
+# refresh_catalog 命令同步上游數據的間隔（秒），0 表示只同步一次
+PARK_REFRESH_INTERVAL = 600
+# 公園實體緩存時間（毫秒）
+CATALOG_CACHE_ENTITIES_TTL = 60000
+# 目錄緩存的本地快照目錄，進程啟動時加載，每次刷新緩存時寫入
+CATALOG_CACHE_SNAPSHOT_DIR = BASE_DIR / 'cache'
+# 快照條目的有效期（毫秒），與實體緩存時間相同：超過 TTL 的條目在內存中也已過期，啟動時不加載。
+# 加載的條目從啟動時重新計算 TTL，因此 'api' 模式下返回的上游數據最多是兩個 TTL 之前獲取的
+CATALOG_CACHE_SNAPSHOT_MAX_AGE = CATALOG_CACHE_ENTITIES_TTL
+# 各進程定期寫入緩存統計的目錄，供 cache_stats 命令匯總
+CATALOG_CACHE_STATS_DIR = BASE_DIR / 'cache' / 'stats'
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # 目錄響應緩存和版本計數器，需要在所有進程（包括 sync_entities 命令）之間共享，
+    # 並且 incr 必須是原子操作，否則並發遞增的版本號會互相覆蓋
+    'catalog': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': 'redis://127.0.0.1:6379/1',
+    },
+}
+# 目錄響應緩存和版本計數器使用的緩存
+CATALOG_CACHE_ALIAS = 'catalog'
+# 匿名目錄 GET 響應的緩存時間（秒）
+CATALOG_RESPONSE_CACHE_TIMEOUT = 300
+# 目錄列表使用 values() 快速序列化，輸出與序列化器相同
+CATALOG_VALUES_SERIALIZATION = True
+
+# 每個進程一次預留的訂單/票券編號數量
+NUMBER_SEQUENCE_BLOCK_SIZE = 100
+
+# 小於此大小（字節）的響應不壓縮
+COMPRESSION_MIN_SIZE = 1024
+# 需要壓縮的響應類型，HTML 含 CSRF 令牌，不壓縮以避免 BREACH 攻擊
+COMPRESSION_CONTENT_TYPES = [
+    'application/json',
+    'application/x-ndjson',
+    'application/javascript',
+    'text/csv',
+    'text/plain',
+    'text/css',
+    'image/svg+xml',
+]
 
 # REST Framework 設置
 REST_FRAMEWORK = {
@@ -186,6 +238,11 @@ REST_FRAMEWORK = {
     'DEFAULT_VERSIONING_CLASS': 'rest_framework.versioning.URLPathVersioning',
     'NON_FIELD_ERRORS_KEY': 'error',
     'TEST_REQUEST_DEFAULT_FORMAT': 'json',
+    # 安裝了 orjson 時使用更快的 JSON 渲染器，輸出與默認渲染器相同
+    'DEFAULT_RENDERER_CLASSES': [
+        'modelCore.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
 # drf-yasg 設置
@@ -244,4 +301,4 @@ LOGGING = {
     },
 }
 
-SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
\ No newline at end of file
+SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
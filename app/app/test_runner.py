@@ -0,0 +1,31 @@
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+# 測試期間覆蓋的設置：不同步上游數據，緩存使用進程內存，不與開發服務器共享
+TEST_SETTINGS = {
+    'PARK_REFRESH_INTERVAL': 0,
+    'CACHES': {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+        'catalog': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'catalog',
+        },
+    },
+}
+
+class TestRunner(DiscoverRunner):
+    """
+    在整個測試運行期間應用 TEST_SETTINGS
+    不依賴命令行參數，manage.py test、python -m django test 等入口都會使用
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.test_settings = override_settings(**TEST_SETTINGS)
+        self.test_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.test_settings.disable()
+        super().teardown_test_environment(**kwargs)
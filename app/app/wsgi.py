@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings")
 
 application = get_wsgi_application()
+
+# Build the catalog database singletons in the web server only, so their caches
+# are warmed from the local snapshot before uwsgi forks its workers
+import modelCore.views  # noqa: E402,F401
@@ -12,7 +12,7 @@ PROJECT_PATH='/usr/local/apps/park/app'
 echo "Installing dependencies..."
 apt-get update
 echo "Hello..."
-apt-get install -y python3-dev python3-venv sqlite python3-pip supervisor nginx git
+apt-get install -y python3-dev python3-venv sqlite python3-pip supervisor nginx git redis-server
 
 # 處理已存在的目錄
 if [ -d "$PROJECT_BASE_PATH" ]; then
@@ -66,7 +66,7 @@ $PROJECT_BASE_PATH/env/bin/python3 manage.py collectstatic --noinput
 cp $PROJECT_PATH/deploy/supervisor_profiles_api.conf /etc/supervisor/conf.d/park_profiles_api.conf
 supervisorctl reread
 supervisorctl update
-supervisorctl restart park_profiles_api
+supervisorctl restart park_profiles_api park_catalog_refresher
 
 # Configure nginx
 cp $PROJECT_PATH/deploy/nginx_profiles_api.conf /etc/nginx/sites-available/park_profiles_api.conf
@@ -5,9 +5,21 @@ set -e
 PROJECT_PATH='/usr/local/apps/park'
 
 git pull
+
+# The catalog cache lives in Redis, install it on hosts set up before it was needed
+if ! command -v redis-server > /dev/null; then
+    apt-get update
+    apt-get install -y redis-server
+fi
+systemctl enable --now redis-server
+redis-cli ping
+
 $PROJECT_PATH/env/bin/python3 -m pip install -r $PROJECT_PATH/requirements.txt
 $PROJECT_PATH/env/bin/python3 manage.py migrate
 $PROJECT_PATH/env/bin/python3 manage.py collectstatic --noinput
-supervisorctl restart park_profiles_api
+$PROJECT_PATH/env/bin/python3 manage.py warm_catalog_cache
+$PROJECT_PATH/env/bin/python3 manage.py build_attraction_neighbors
+$PROJECT_PATH/env/bin/python3 manage.py rebuild_search_index
+supervisorctl restart park_profiles_api park_catalog_refresher
 
 echo "DONE! :)"
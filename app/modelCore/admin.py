@@ -1,8 +1,26 @@
 from django.contrib import admin
 from .models import (
-    User, Destination, Park, Attraction, GuestReview,
+    User, Destination, Park, Attraction, GuestReview, AttractionRatingSummary,
     TicketType, Order, OrderItem, Ticket
 )
+from . import search
+
+class FullTextSearchAdminMixin:
+    """
+    Add full-text index matches to the changelist search box results
+
+    The default search_fields lookups still apply; rows the index matches
+    (CJK substrings, NFKC-normalized and prefix terms) are added to them.
+    """
+    search_kind = None
+
+    def get_search_results(self, request, queryset, search_term):
+        results, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if search_term and search.fts_available():
+            ids = search.get_backend().matching_ids(search_term, self.search_kind)
+            if ids:
+                results |= queryset.filter(pk__in=ids)
+        return results, may_have_duplicates
 
 @admin.register(User)
 class UserAdmin(admin.ModelAdmin):
@@ -11,19 +29,22 @@ class UserAdmin(admin.ModelAdmin):
     search_fields = ['email', 'name']
 
 @admin.register(Destination)
-class DestinationAdmin(admin.ModelAdmin):
+class DestinationAdmin(FullTextSearchAdminMixin, admin.ModelAdmin):
+    search_kind = 'destination'
     list_display = ['id', 'name', 'slug', 'created_at', 'updated_at']
     list_filter = ['created_at']
     search_fields = ['name', 'slug']
 
 @admin.register(Park)
-class ParkAdmin(admin.ModelAdmin):
+class ParkAdmin(FullTextSearchAdminMixin, admin.ModelAdmin):
+    search_kind = 'park'
     list_display = ['id', 'name', 'destination', 'created_at', 'updated_at']
     list_filter = ['destination', 'created_at']
     search_fields = ['name']
 
 @admin.register(Attraction)
-class AttractionAdmin(admin.ModelAdmin):
+class AttractionAdmin(FullTextSearchAdminMixin, admin.ModelAdmin):
+    search_kind = 'attraction'
     list_display = ['id', 'name', 'park', 'attraction_type', 'entity_type', 'created_at', 'updated_at']
     list_filter = ['park', 'attraction_type', 'entity_type', 'created_at']
     search_fields = ['name', 'description']
@@ -35,6 +56,13 @@ class GuestReviewAdmin(admin.ModelAdmin):
     search_fields = ['user__name', 'attraction__name', 'content']
     list_editable = ['is_published']
 
+@admin.register(AttractionRatingSummary)
+class AttractionRatingSummaryAdmin(admin.ModelAdmin):
+    list_display = ['attraction', 'review_count', 'avg_rating', 'rating_1', 'rating_2', 'rating_3', 'rating_4', 'rating_5', 'updated_at']
+    search_fields = ['attraction__name']
+    list_select_related = ['attraction']
+    readonly_fields = ['review_count', 'rating_sum', 'avg_rating', 'rating_1', 'rating_2', 'rating_3', 'rating_4', 'rating_5']
+
 @admin.register(TicketType)
 class TicketTypeAdmin(admin.ModelAdmin):
     list_display = ['name', 'park', 'price', 'is_active', 'created_at']
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ModelcoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "modelCore"
+
+    def ready(self):
+        from . import signals  # noqa: F401
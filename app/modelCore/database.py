@@ -1,28 +1,226 @@
 import asyncio
 import aiohttp
 import json
+import os
+import pickle
 import requests
+import tempfile
+import threading
 import time
 from abc import ABC, abstractmethod
 from functools import lru_cache
 from .models import Park, Destination
+from .records import ParkRecord, DestinationRecord
 from .services import ThemeParksService
 
+# 緩存實例註冊表，用於統計輸出
+Caches = {}
+
+# 實體缺少過濾路徑上的屬性時的標記
+_MISSING = object()
+
+class CacheStats:
+    """緩存統計，按鍵前綴（第一個 ':' 之前的部分）記錄命中、未命中、過期、淘汰和填充耗時"""
+    
+    COUNTERS = ('hits', 'misses', 'expirations', 'evictions', 'fills', 'fill_errors')
+    TIMERS = ('fill_time_ms', 'callback_time_ms')
+    
+    # 統計文件的寫入間隔（毫秒）
+    FLUSH_INTERVAL = 30000
+    
+    def __init__(self, cache_name, stats_dir=None):
+        """
+        初始化緩存統計
+        
+        Args:
+            cache_name (str): 緩存名稱
+            stats_dir (str, optional): 統計文件目錄，設置後會定期寫入本進程的統計，供 cache_stats 命令匯總
+        """
+        self.cache_name = cache_name
+        self.stats_dir = str(stats_dir) if stats_dir else None
+        self._prefixes = {}
+        self._lock = threading.Lock()
+        self._last_flush = 0
+    
+    @staticmethod
+    def prefix_of(key):
+        """
+        獲取鍵前綴
+        
+        Args:
+            key (str): 緩存鍵
+            
+        Returns:
+            str: 鍵前綴
+        """
+        return str(key).split(':', 1)[0]
+    
+    def _bucket(self, prefix):
+        bucket = self._prefixes.get(prefix)
+        if bucket is None:
+            bucket = dict.fromkeys(self.COUNTERS, 0)
+            bucket.update(dict.fromkeys(self.TIMERS, 0.0))
+            bucket['max_fill_time_ms'] = 0.0
+            self._prefixes[prefix] = bucket
+        return bucket
+    
+    def incr(self, key, counter, amount=1):
+        """
+        增加計數
+        
+        Args:
+            key (str): 緩存鍵
+            counter (str): 計數器名稱
+            amount (int): 增加的數量
+        """
+        with self._lock:
+            self._bucket(self.prefix_of(key))[counter] += amount
+        self.maybe_flush()
+    
+    def record_fill(self, key, fill_time_ms, callback_time_ms, error=False):
+        """
+        記錄一次緩存填充
+        
+        Args:
+            key (str): 緩存鍵
+            fill_time_ms (float): 填充總耗時（包括寫入快照）
+            callback_time_ms (float): 回調函數耗時
+            error (bool): 回調是否拋出異常
+        """
+        with self._lock:
+            bucket = self._bucket(self.prefix_of(key))
+            bucket['fill_errors' if error else 'fills'] += 1
+            bucket['fill_time_ms'] += fill_time_ms
+            bucket['callback_time_ms'] += callback_time_ms
+            bucket['max_fill_time_ms'] = max(bucket['max_fill_time_ms'], fill_time_ms)
+        self.maybe_flush()
+    
+    def reset(self):
+        """清空統計"""
+        with self._lock:
+            self._prefixes = {}
+    
+    def as_dict(self):
+        """
+        導出統計
+        
+        Returns:
+            dict: 包含總計和各鍵前綴的統計
+        """
+        with self._lock:
+            prefixes = {prefix: dict(bucket) for prefix, bucket in self._prefixes.items()}
+        return self.summarize(self.cache_name, prefixes)
+    
+    @classmethod
+    def summarize(cls, cache_name, prefixes):
+        """
+        根據各前綴的原始計數計算總計和派生指標
+        
+        Args:
+            cache_name (str): 緩存名稱
+            prefixes (dict): 前綴 -> 原始計數
+            
+        Returns:
+            dict: 統計結果
+        """
+        totals = dict.fromkeys(cls.COUNTERS, 0)
+        totals.update(dict.fromkeys(cls.TIMERS, 0.0))
+        totals['max_fill_time_ms'] = 0.0
+        for bucket in prefixes.values():
+            for name in cls.COUNTERS + cls.TIMERS:
+                totals[name] += bucket.get(name, 0)
+            totals['max_fill_time_ms'] = max(totals['max_fill_time_ms'], bucket.get('max_fill_time_ms', 0.0))
+            cls._add_derived(bucket)
+        cls._add_derived(totals)
+        return {'name': cache_name, 'totals': totals, 'prefixes': prefixes}
+    
+    @staticmethod
+    def _add_derived(bucket):
+        lookups = bucket['hits'] + bucket['misses'] + bucket['expirations']
+        fills = bucket['fills'] + bucket['fill_errors']
+        bucket['hit_rate'] = round(bucket['hits'] / lookups, 4) if lookups else None
+        bucket['avg_fill_time_ms'] = round(bucket['fill_time_ms'] / fills, 3) if fills else None
+    
+    def maybe_flush(self, force=False):
+        """
+        定期把本進程的統計寫入統計目錄
+        
+        Args:
+            force (bool): 忽略寫入間隔立即寫入
+        """
+        if not self.stats_dir:
+            return
+        now = time.time() * 1000
+        if not force and now - self._last_flush < self.FLUSH_INTERVAL:
+            return
+        self._last_flush = now
+        
+        with self._lock:
+            prefixes = {prefix: dict(bucket) for prefix, bucket in self._prefixes.items()}
+        path = os.path.join(self.stats_dir, f"{self.cache_name}.{os.getpid()}.json")
+        try:
+            os.makedirs(self.stats_dir, exist_ok=True)
+            with open(path, 'w') as f:
+                json.dump({'name': self.cache_name, 'pid': os.getpid(), 'updated_at': now, 'prefixes': prefixes}, f)
+        except Exception as e:
+            print(f"寫入緩存統計時出錯: {e}")
+    
+    @classmethod
+    def collect(cls, stats_dir):
+        """
+        匯總統計目錄中所有進程寫入的統計
+        
+        Args:
+            stats_dir (str): 統計文件目錄
+            
+        Returns:
+            list: 每個緩存的匯總統計
+        """
+        merged = {}
+        if not stats_dir or not os.path.isdir(str(stats_dir)):
+            return []
+        for filename in sorted(os.listdir(str(stats_dir))):
+            if not filename.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(str(stats_dir), filename)) as f:
+                    data = json.load(f)
+            except Exception:
+                continue
+            cache_prefixes = merged.setdefault(data['name'], {})
+            for prefix, bucket in data.get('prefixes', {}).items():
+                target = cache_prefixes.setdefault(prefix, {})
+                for name, value in bucket.items():
+                    if name == 'max_fill_time_ms':
+                        target[name] = max(target.get(name, 0.0), value)
+                    elif name in cls.COUNTERS or name in cls.TIMERS:
+                        target[name] = target.get(name, 0) + value
+        return [cls.summarize(name, prefixes) for name, prefixes in sorted(merged.items())]
+
 class Cache:
     """簡單的緩存類，用於緩存資料"""
     
-    def __init__(self, name, version=0):
+    def __init__(self, name, version=0, snapshot_dir=None, snapshot_max_age=None, stats_dir=None):
         """
         初始化緩存
         
         Args:
             name (str): 緩存名稱
             version (int): 緩存版本
+            snapshot_dir (str, optional): 快照目錄，設置後每次填充緩存都會寫入本地快照文件
+            snapshot_max_age (int, optional): 加載快照時允許的最大快照年齡（毫秒），None 表示不限制
+            stats_dir (str, optional): 統計文件目錄，參見 CacheStats
         """
         self.name = name
         self.version = version
         self._cache = {}
         self._cache_times = {}
+        self.snapshot_path = None
+        self.snapshot_max_age = snapshot_max_age
+        if snapshot_dir:
+            self.snapshot_path = os.path.join(str(snapshot_dir), f"{self.name}_{self.version}.snapshot")
+        self.stats = CacheStats(f"{self.name}_{self.version}", stats_dir)
+        Caches[self.stats.cache_name] = self
     
     def wrap(self, key, callback, ttl=60000):
         """
@@ -40,14 +238,32 @@ class Cache:
         
         # 檢查緩存是否存在且未過期
         now = time.time() * 1000  # 轉換為毫秒
-        if full_key in self._cache and (now - self._cache_times.get(full_key, 0)) < ttl:
-            return self._cache[full_key]
+        if full_key in self._cache:
+            if (now - self._cache_times.get(full_key, 0)) < ttl:
+                self.stats.incr(key, 'hits')
+                return self._cache[full_key]
+            self.stats.incr(key, 'expirations')
+        else:
+            self.stats.incr(key, 'misses')
         
         # 執行回調並緩存結果
-        result = callback()
+        start = time.perf_counter()
+        try:
+            result = callback()
+        except Exception:
+            elapsed = (time.perf_counter() - start) * 1000
+            self.stats.record_fill(key, elapsed, elapsed, error=True)
+            raise
+        callback_time = (time.perf_counter() - start) * 1000
+        
         self._cache[full_key] = result
         self._cache_times[full_key] = now
         
+        if self.snapshot_path:
+            self.save_snapshot()
+        
+        self.stats.record_fill(key, (time.perf_counter() - start) * 1000, callback_time)
+        
         return result
     
     def clear(self, key=None):
@@ -57,7 +273,10 @@ class Cache:
         Args:
             key (str, optional): 要清除的特定鍵，如果為 None 則清除所有緩存
         """
+        prefix_len = len(f"{self.name}_{self.version}_")
         if key is None:
+            for full_key in self._cache:
+                self.stats.incr(full_key[prefix_len:], 'evictions')
             self._cache = {}
             self._cache_times = {}
         else:
@@ -65,6 +284,75 @@ class Cache:
             if full_key in self._cache:
                 del self._cache[full_key]
                 del self._cache_times[full_key]
+                self.stats.incr(key, 'evictions')
+    
+    def save_snapshot(self):
+        """
+        將緩存內容以 pickle 二進制格式寫入快照文件
+        
+        先寫入臨時文件再原子替換，並發的進程不會讀到寫了一半的快照
+        
+        Returns:
+            bool: 是否寫入成功
+        """
+        if not self.snapshot_path:
+            return False
+        
+        snapshot = {
+            'name': self.name,
+            'version': self.version,
+            'entries': {key: (self._cache_times[key], value) for key, value in self._cache.items()},
+        }
+        
+        directory = os.path.dirname(self.snapshot_path)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, self.snapshot_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            return True
+        except Exception as e:
+            print(f"寫入緩存快照時出錯: {e}")
+            return False
+    
+    def load_snapshot(self):
+        """
+        從快照文件加載緩存
+        
+        加載的條目從當前時間重新計算 TTL，因此新啟動的進程第一個請求即可命中緩存；
+        超過 snapshot_max_age 的條目會被忽略
+        
+        Returns:
+            int: 加載的條目數量
+        """
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return 0
+        
+        try:
+            with open(self.snapshot_path, 'rb') as f:
+                snapshot = pickle.load(f)
+        except Exception as e:
+            print(f"讀取緩存快照時出錯: {e}")
+            return 0
+        
+        if snapshot.get('name') != self.name or snapshot.get('version') != self.version:
+            return 0
+        
+        now = time.time() * 1000
+        loaded = 0
+        for key, (saved_at, value) in snapshot.get('entries', {}).items():
+            if self.snapshot_max_age is not None and now - saved_at > self.snapshot_max_age:
+                continue
+            self._cache[key] = value
+            self._cache_times[key] = now
+            loaded += 1
+        
+        return loaded
 
 class HTTP:
     """簡單的 HTTP 客戶端，用於發送 API 請求"""
@@ -137,6 +425,13 @@ class Database:
         self.entities = []
         self.api_base_url = self.config.get('api_base_url', ThemeParksService.BASE_URL)
         self.api_key = self.config.get('api_key', '')
+        
+        # 初始化與刷新的並發控制，鎖和 future 都綁定在創建它們的事件循環上
+        self._lock = None
+        self._lock_loop = None
+        self._init_future = None
+        self._refresh_future = None
+        self._refresh_task = None
     
     def log(self, *args):
         """
@@ -165,13 +460,114 @@ class Database:
             Databases[class_name] = cls(options)
         return Databases[class_name]
     
+    def _get_lock(self):
+        """
+        獲取當前事件循環的初始化鎖
+        
+        如果事件循環已更換（例如多次調用 asyncio.run），則重新創建鎖並丟棄舊循環上的 future
+        
+        Returns:
+            asyncio.Lock: 初始化鎖
+        """
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+            self._init_future = None
+            self._refresh_future = None
+        return self._lock
+    
     async def init(self):
-        """初始化數據庫連接並獲取數據"""
-        if not self.initialized:
+        """
+        初始化數據庫連接並獲取數據
+        
+        並發調用的協程會共享同一個進行中的加載 future，因此冷啟動時只會觸發一次完整的實體加載。
+        如果加載失敗，下一次調用會重新嘗試。
+        """
+        if self.initialized:
+            return self
+        
+        async with self._get_lock():
+            if self.initialized:
+                return self
+            if self._init_future is None:
+                self._init_future = asyncio.ensure_future(self._load())
+            future = self._init_future
+        
+        # shield 確保某個調用者被取消時不會中斷其他協程共享的加載
+        await asyncio.shield(future)
+        return self
+    
+    async def _load(self):
+        """執行實際的初始化和實體加載，只由 init 調度"""
+        try:
             await self._init()
-            self.entities = await self._getEntities()
+            entities = await self._getEntities()
+            # 整個列表構建完成後再一次性替換，讀取方不會看到半成品
+            self.entities = entities
             self.initialized = True
-        return self
+            
+            refresh_interval = self.config.get('refreshInterval')
+            if refresh_interval:
+                self.start_refresh(refresh_interval)
+        except Exception:
+            self._init_future = None
+            raise
+    
+    async def refresh(self):
+        """
+        重新獲取所有實體並原子替換 self.entities
+        
+        並發調用共享同一次刷新；如果刷新結果為空（例如上游 API 失敗），則保留現有數據。
+        
+        Returns:
+            list: 刷新後的實體列表
+        """
+        async with self._get_lock():
+            if self._refresh_future is None:
+                self._refresh_future = asyncio.ensure_future(self._getEntities())
+            future = self._refresh_future
+        
+        try:
+            entities = await asyncio.shield(future)
+        finally:
+            if self._refresh_future is future:
+                self._refresh_future = None
+        
+        if entities or not self.entities:
+            self.entities = entities
+        return self.entities
+    
+    def start_refresh(self, interval):
+        """
+        啟動後台定期刷新任務
+        
+        Args:
+            interval (float): 刷新間隔（秒）
+        """
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        self._refresh_task = asyncio.ensure_future(self._refresh_loop(interval))
+    
+    def stop_refresh(self):
+        """停止後台定期刷新任務"""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+    
+    async def _refresh_loop(self, interval):
+        """
+        後台刷新循環
+        
+        Args:
+            interval (float): 刷新間隔（秒）
+        """
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                self.log(f"刷新實體時出錯: {e}")
     
     @abstractmethod
     async def _init(self):
@@ -203,10 +599,13 @@ class Database:
         if not self.initialized:
             await self.init()
         
+        # 取得當前列表的引用，刷新時的替換不會影響本次遍歷
+        entities = self.entities
+        
         if not filter_opt:
-            return self.entities[0] if self.entities else None
+            return entities[0] if entities else None
         
-        for entity in self.entities:
+        for entity in entities:
             match = True
             for key, value in filter_opt.items():
                 if not hasattr(entity, key) or getattr(entity, key) != value:
@@ -274,25 +673,16 @@ class ParkDatabase(Database):
             destination_data (dict, optional): API 返回的目的地數據
             
         Returns:
-            Park: 公園對象
+            ParkRecord: 公園記錄
         """
         try:
-            # 創建一個公園對象，但不保存到數據庫
-            park = Park(
+            # 緩存只需要 id/name/slug，使用輕量的記錄而不是未保存的模型實例
+            destination = DestinationRecord.from_data(destination_data) if destination_data else None
+            return ParkRecord(
                 id=park_data.get('id'),
                 name=park_data.get('name'),
+                destination=destination,
             )
-            
-            # 如果有目的地數據，設置目的地屬性
-            if destination_data:
-                destination = Destination(
-                    id=destination_data.get('id'),
-                    name=destination_data.get('name'),
-                    slug=destination_data.get('slug')
-                )
-                park.destination = destination
-            
-            return park
         except Exception as e:
             print(f"解析公園數據時出錯: {e}")
             return None
@@ -394,7 +784,15 @@ class SyncParkDatabase:
         self.config = options or {}
         self.useragent = self.config.get('useragent', "ThemeParkAPI/1.0")
         
-        self.cache = Cache(self.__class__.__name__, self.config.get('cacheVersion', 0))
+        self.cache = Cache(
+            self.__class__.__name__,
+            self.config.get('cacheVersion', 0),
+            snapshot_dir=self.config.get('snapshotDir'),
+            snapshot_max_age=self.config.get('snapshotMaxAge'),
+            stats_dir=self.config.get('statsDir'),
+        )
+        # 從本地快照預熱緩存，新啟動的進程無需等待上游 API
+        self.cache.load_snapshot()
         self.http = HTTP()
         
         if self.useragent:
@@ -404,6 +802,8 @@ class SyncParkDatabase:
         
         self.api_base_url = self.config.get('api_base_url', ThemeParksService.BASE_URL)
         self.api_key = self.config.get('api_key', '')
+        # 分組索引，鍵為分組路徑，值為 (建立索引時的實體列表, 分組)
+        self._group_index = {}
     
     def log(self, *args):
         """
@@ -423,25 +823,17 @@ class SyncParkDatabase:
             park_data (dict): API 返回的公園數據
             
         Returns:
-            Park: 公園對象
+            ParkRecord: 公園記錄
         """
         try:
-            # 創建一個公園對象，但不保存到數據庫
-            park = Park(
+            # 緩存只需要 id/name/slug，使用輕量的記錄而不是未保存的模型實例
+            destination_data = park_data.get('destination')
+            destination = DestinationRecord.from_data(destination_data) if destination_data else None
+            return ParkRecord(
                 id=park_data.get('id'),
                 name=park_data.get('name'),
+                destination=destination,
             )
-            
-            # 如果有目的地數據，設置目的地屬性
-            if 'destination' in park_data and park_data['destination']:
-                destination = Destination(
-                    id=park_data['destination'].get('id'),
-                    name=park_data['destination'].get('name'),
-                    slug=park_data['destination'].get('slug')
-                )
-                park.destination = destination
-            
-            return park
         except Exception as e:
             print(f"解析公園數據時出錯: {e}")
             return None
@@ -460,7 +852,7 @@ class SyncParkDatabase:
         def get_all_parks_callback():
             return self.get_all_parks()
         
-        entities = self.cache.wrap('entities', get_all_parks_callback, 60000)  # 緩存一分鐘
+        entities = self.cache.wrap('entities', get_all_parks_callback, self.config.get('entitiesTTL', 60000))  # 默認緩存一分鐘
         
         # 如果有過濾條件，則應用過濾
         if filter_obj:
@@ -468,6 +860,62 @@ class SyncParkDatabase:
         
         return entities
     
+    def getEntitiesGrouped(self, key='destination.id'):
+        """
+        按屬性分組獲取所有公園實體
+        
+        一次遍歷實體列表建立索引，索引跟隨實體緩存，緩存刷新後才重建
+        
+        Args:
+            key (str): 分組屬性，支持點號路徑，例如 'destination.id'
+            
+        Returns:
+            dict: 屬性值（字符串）到公園列表的映射，分組和組內順序與實體列表相同
+        """
+        entities = self.getEntities()
+        cached = self._group_index.get(key)
+        if cached is not None and cached[0] is entities:
+            return cached[1]
+        
+        groups = self.group_entities(entities, key)
+        self._group_index[key] = (entities, groups)
+        return groups
+    
+    @classmethod
+    def group_entities(cls, entities, key):
+        """
+        將實體按屬性分組，缺少該屬性或值為空的實體不在結果中
+        
+        Args:
+            entities (iterable): 實體列表
+            key (str): 分組屬性，支持點號路徑
+            
+        Returns:
+            dict: 屬性值（字符串）到實體列表的映射
+        """
+        groups = {}
+        for entity in entities:
+            value = cls._get_value(entity, key)
+            if value is _MISSING or value is None:
+                continue
+            groups.setdefault(str(value), []).append(entity)
+        return groups
+    
+    @staticmethod
+    def _get_value(entity, key):
+        """
+        按點號路徑獲取實體的屬性值
+        
+        Returns:
+            object: 屬性值，路徑上缺少屬性時返回 _MISSING
+        """
+        value = entity
+        for part in key.split('.'):
+            if value is None or not hasattr(value, part):
+                return _MISSING
+            value = getattr(value, part)
+        return value
+    
     def _match_filter(self, entity, filter_obj):
         """
         檢查實體是否匹配過濾條件
@@ -480,13 +928,13 @@ class SyncParkDatabase:
             bool: 是否匹配
         """
         for key, value in filter_obj.items():
+            # 獲取實體的屬性值，支持 'destination.id' 這樣的嵌套屬性
+            entity_value = self._get_value(entity, key)
+            
             # 如果實體沒有該屬性，則不匹配
-            if not hasattr(entity, key):
+            if entity_value is _MISSING:
                 return False
             
-            # 獲取實體的屬性值
-            entity_value = getattr(entity, key)
-            
             # 檢查值是否匹配
             if isinstance(value, dict):
                 # 處理特殊操作符
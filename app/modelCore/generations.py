@@ -0,0 +1,112 @@
+"""
+Per-model generation counters for cache invalidation
+
+Each catalog model has a counter in the shared catalog cache. Anything derived
+from a model's rows (cached responses, pre-rendered trees) includes the current
+generation in its cache key, so bumping the counter invalidates all of it at
+once without tracking individual keys. Counters start from a timestamp rather
+than 0, so a counter that was evicted never comes back with a value that was
+already used for a cached entry.
+
+If the cache backend is unreachable, bumps are skipped and `get_generations`
+returns None, which callers treat as "do not cache": writes and reads keep
+working, only uncached.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+try:
+    from redis.exceptions import RedisError
+except ImportError:  # redis is only needed for the Redis cache backend
+    RedisError = OSError
+
+# Errors raised by an unreachable cache backend
+CACHE_ERRORS = (RedisError, OSError)
+
+GENERATION_KEY = 'catalog:generation:{}'
+
+logger = logging.getLogger(__name__)
+
+_batch = threading.local()
+
+def get_cache():
+    """Cache holding generation counters and the entries keyed by them"""
+    return caches[getattr(settings, 'CATALOG_CACHE_ALIAS', 'default')]
+
+def _model_key(model):
+    return GENERATION_KEY.format(model._meta.label_lower)
+
+def get_generations(models):
+    """
+    Get the current generation of each model
+
+    Args:
+        models (iterable): Model classes
+
+    Returns:
+        tuple: Generations in the order of `models`, or None if the cache is unavailable
+    """
+    cache = get_cache()
+    keys = [_model_key(model) for model in models]
+    try:
+        values = cache.get_many(keys)
+        for key in keys:
+            if key not in values:
+                cache.add(key, time.time_ns())
+                values[key] = cache.get(key)
+    except CACHE_ERRORS as e:
+        logger.warning('Catalog cache unavailable, not caching: %s', e)
+        return None
+    if any(values[key] is None for key in keys):
+        return None
+    return tuple(values[key] for key in keys)
+
+def _bump(model):
+    cache = get_cache()
+    key = _model_key(model)
+    try:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns())
+    except CACHE_ERRORS as e:
+        logger.warning('Catalog cache unavailable, generation of %s not bumped: %s', model._meta.label, e)
+
+def bump_generation(model):
+    """
+    Invalidate everything cached from a model's rows
+
+    Inside `generation_batch()` the bump is deferred to the end of the batch.
+    Otherwise the counter is bumped now and again when the surrounding
+    transaction commits, so a response rendered from uncommitted rows in
+    between cannot be served under the new generation.
+
+    Args:
+        model (type): Model class whose rows changed
+    """
+    pending = getattr(_batch, 'models', None)
+    if pending is not None:
+        pending.add(model)
+        return
+    _bump(model)
+    transaction.on_commit(lambda: _bump(model))
+
+@contextmanager
+def generation_batch():
+    """Collect bumps made inside the block and apply each model's bump once at the end"""
+    if getattr(_batch, 'models', None) is not None:
+        yield
+        return
+    _batch.models = set()
+    try:
+        yield
+    finally:
+        models, _batch.models = _batch.models, None
+        for model in models:
+            bump_generation(model)
@@ -0,0 +1,142 @@
+"""
+Geohash and distance helpers for attraction location queries
+
+Attractions store the geohash of their coordinates in an indexed column.
+A geohash prefix is a grid cell, so "everything in a cell" is a range scan
+on that index (`geohash >= cell AND geohash < cell + '~'`) and works on any
+database, SQLite included. Nearby queries cover the search circle with the
+3x3 block of cells around the point, then compute exact haversine distances
+for the candidates.
+"""
+
+import math
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+EARTH_RADIUS_M = 6371008.8
+METERS_PER_DEGREE = math.pi * EARTH_RADIUS_M / 180
+GEOHASH_PRECISION = 9
+# Sorts after every geohash character, closes a prefix range
+PREFIX_END = '~'
+
+def encode(latitude, longitude, precision=GEOHASH_PRECISION):
+    """
+    Encode coordinates as a geohash
+
+    Args:
+        latitude (float): Latitude in degrees
+        longitude (float): Longitude in degrees
+        precision (int): Number of characters
+
+    Returns:
+        str: Geohash
+    """
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            mid = (lng_range[0] + lng_range[1]) / 2
+            if longitude >= mid:
+                bits = bits * 2 + 1
+                lng_range[0] = mid
+            else:
+                bits = bits * 2
+                lng_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                bits = bits * 2 + 1
+                lat_range[0] = mid
+            else:
+                bits = bits * 2
+                lat_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return ''.join(chars)
+
+def cell_size(precision):
+    """
+    Get the size of a geohash cell in degrees
+
+    Returns:
+        tuple: (latitude degrees, longitude degrees)
+    """
+    total_bits = precision * 5
+    lng_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lng_bits)
+
+def precision_for_radius(latitude, radius):
+    """
+    Get the finest precision whose cells are at least `radius` meters on each side
+
+    With cells that large, the 3x3 block around a point covers every point
+    within `radius` of it.
+
+    Returns:
+        int: Geohash precision, 0 if even one-character cells are too small
+    """
+    lng_scale = max(math.cos(math.radians(latitude)), 1e-6)
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        lat_deg, lng_deg = cell_size(precision)
+        if min(lat_deg * METERS_PER_DEGREE, lng_deg * METERS_PER_DEGREE * lng_scale) >= radius:
+            return precision
+    return 0
+
+def covering_cells(latitude, longitude, radius):
+    """
+    Get the geohash cells that cover a circle
+
+    Args:
+        latitude (float): Center latitude
+        longitude (float): Center longitude
+        radius (float): Radius in meters
+
+    Returns:
+        list: Sorted geohash prefixes, empty if the circle needs a full scan
+    """
+    precision = precision_for_radius(latitude, radius)
+    if precision == 0:
+        return []
+    lat_deg, lng_deg = cell_size(precision)
+    cells = set()
+    for dlat in (-1, 0, 1):
+        cell_lat = latitude + dlat * lat_deg
+        if cell_lat < -90 or cell_lat > 90:
+            continue
+        for dlng in (-1, 0, 1):
+            cell_lng = (longitude + dlng * lng_deg + 180) % 360 - 180
+            cells.add(encode(cell_lat, cell_lng, precision))
+    return sorted(cells)
+
+def haversine(latitude, longitude, latitudes, longitudes):
+    """
+    Great-circle distances from one point to many
+
+    Args:
+        latitude (float): Origin latitude
+        longitude (float): Origin longitude
+        latitudes (sequence): Target latitudes
+        longitudes (sequence): Target longitudes
+
+    Returns:
+        list: Distances in meters, in the order of the targets
+    """
+    lat1 = math.radians(latitude)
+    cos_lat1 = math.cos(lat1)
+    distances = []
+    for target_lat, target_lng in zip(latitudes, longitudes):
+        lat2 = math.radians(target_lat)
+        a = (
+            math.sin((lat2 - lat1) / 2) ** 2
+            + cos_lat1 * math.cos(lat2) * math.sin(math.radians(target_lng - longitude) / 2) ** 2
+        )
+        distances.append(2 * EARTH_RADIUS_M * math.asin(math.sqrt(min(a, 1.0))))
+    return distances
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from modelCore.models import AttractionNeighbor
+
+class Command(BaseCommand):
+    help = 'Precompute the nearest attractions of every attraction'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--k',
+            type=int,
+            default=10,
+            help='Number of neighbours to keep per attraction',
+        )
+
+    def handle(self, *args, **options):
+        count = AttractionNeighbor.rebuild(k=options['k'])
+        self.stdout.write(self.style.SUCCESS(f'Stored {count} attraction neighbours'))
@@ -0,0 +1,52 @@
+import json
+import os
+import shutil
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from modelCore.database import CacheStats
+
+class Command(BaseCommand):
+    help = 'Show catalog cache hit/miss/latency statistics aggregated across all worker processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Output raw JSON instead of a table',
+        )
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Delete collected statistics after printing them',
+        )
+
+    def handle(self, *args, **options):
+        stats_dir = getattr(settings, 'CATALOG_CACHE_STATS_DIR', None)
+        if not stats_dir:
+            self.stdout.write(self.style.ERROR('CATALOG_CACHE_STATS_DIR is not set'))
+            return
+        
+        caches = CacheStats.collect(stats_dir)
+        
+        if options.get('json'):
+            self.stdout.write(json.dumps(caches, indent=2))
+        elif not caches:
+            self.stdout.write('No cache statistics collected yet')
+        else:
+            for cache in caches:
+                self.stdout.write(self.style.SUCCESS(cache['name']))
+                rows = [('*', cache['totals'])] + sorted(cache['prefixes'].items())
+                for prefix, bucket in rows:
+                    hit_rate = '-' if bucket['hit_rate'] is None else f"{bucket['hit_rate']:.1%}"
+                    avg_fill = '-' if bucket['avg_fill_time_ms'] is None else f"{bucket['avg_fill_time_ms']:.1f}ms"
+                    self.stdout.write(
+                        f"  {prefix:<20} hits={bucket['hits']} misses={bucket['misses']} "
+                        f"expirations={bucket['expirations']} evictions={bucket['evictions']} "
+                        f"hit_rate={hit_rate} fills={bucket['fills']} errors={bucket['fill_errors']} "
+                        f"avg_fill={avg_fill} max_fill={bucket['max_fill_time_ms']:.1f}ms "
+                        f"callback_total={bucket['callback_time_ms']:.1f}ms"
+                    )
+        
+        if options.get('reset') and os.path.isdir(str(stats_dir)):
+            shutil.rmtree(str(stats_dir))
+            self.stdout.write('Statistics reset')
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from modelCore.models import AttractionRatingSummary, GuestReview
+from modelCore.generations import bump_generation
+
+class Command(BaseCommand):
+    help = 'Rebuild attraction rating summaries from published guest reviews'
+
+    def handle(self, *args, **options):
+        count = AttractionRatingSummary.rebuild()
+        # bulk_create skips signals, cached review stats have to be dropped explicitly
+        bump_generation(GuestReview)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt rating summaries for {count} attractions'))
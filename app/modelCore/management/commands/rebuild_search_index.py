@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from modelCore.search import fts_available, get_backend
+
+class Command(BaseCommand):
+    help = 'Rebuild the catalog full-text search index'
+
+    def handle(self, *args, **options):
+        if not fts_available():
+            self.stdout.write(self.style.WARNING('FTS5 index not available, search uses icontains'))
+            return
+        count = get_backend().rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} catalog entries'))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from modelCore.refresher import CatalogRefresher
+
+class Command(BaseCommand):
+    help = 'Sync destinations and parks from the ThemeParks API every PARK_REFRESH_INTERVAL seconds'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Sync once and exit')
+        parser.add_argument('--interval', type=float, help='Seconds between syncs, overrides PARK_REFRESH_INTERVAL')
+
+    def handle(self, *args, **options):
+        interval = 0 if options['once'] else options['interval']
+        refresher = CatalogRefresher(interval)
+        if refresher.interval:
+            self.stdout.write(f'Syncing the catalog every {refresher.interval:g} seconds')
+        try:
+            refresher.run()
+        except KeyboardInterrupt:
+            refresher.stop()
@@ -1,6 +1,8 @@
 from django.core.management.base import BaseCommand
 from modelCore.services import ThemeParksService
 from modelCore.models import Destination, Park, Attraction
+from modelCore.generations import generation_batch
+from modelCore.search import search_batch
 from django.db import transaction
 import time
 
@@ -32,15 +34,18 @@ class Command(BaseCommand):
         
         start_time = time.time()
         
-        if entity_id and entity_type:
-            # Sync specific entity
-            self.sync_specific_entity(entity_type, entity_id)
-        elif entity_type:
-            # Sync all entities of specific type
-            self.sync_entity_type(entity_type, force)
-        else:
-            # Sync all entities
-            self.sync_all_entities(force)
+        # Invalidate cached catalog responses and reindex the synced rows once
+        # at the end instead of per synced row
+        with generation_batch(), search_batch():
+            if entity_id and entity_type:
+                # Sync specific entity
+                self.sync_specific_entity(entity_type, entity_id)
+            elif entity_type:
+                # Sync all entities of specific type
+                self.sync_entity_type(entity_type, force)
+            else:
+                # Sync all entities
+                self.sync_all_entities(force)
         
         elapsed_time = time.time() - start_time
         self.stdout.write(self.style.SUCCESS(f'Sync completed, took {elapsed_time:.2f} seconds'))
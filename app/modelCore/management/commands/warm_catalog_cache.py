@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from modelCore.views import park_db
+
+class Command(BaseCommand):
+    help = 'Refresh the catalog caches from the ThemeParks API and write their local snapshots'
+
+    def handle(self, *args, **options):
+        if not park_db.cache.snapshot_path:
+            self.stdout.write(self.style.WARNING('CATALOG_CACHE_SNAPSHOT_DIR is not set, snapshot will not be written'))
+        
+        # Drop whatever was loaded from the old snapshot so the refill goes upstream
+        park_db.cache.clear()
+        parks = park_db.getEntities()
+        
+        self.stdout.write(self.style.SUCCESS(f'Cached {len(parks)} parks'))
+        if park_db.cache.snapshot_path:
+            self.stdout.write(f'Snapshot written to {park_db.cache.snapshot_path}')
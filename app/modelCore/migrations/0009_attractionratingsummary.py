@@ -0,0 +1,92 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def populate_rating_summaries(apps, schema_editor):
+    GuestReview = apps.get_model("modelCore", "GuestReview")
+    AttractionRatingSummary = apps.get_model("modelCore", "AttractionRatingSummary")
+
+    rows = (
+        GuestReview.objects.filter(is_published=True)
+        .values("attraction_id")
+        .annotate(
+            review_count=Count("id"),
+            rating_sum=Sum("rating"),
+            **{
+                f"rating_{rating}": Count("id", filter=Q(rating=rating))
+                for rating in range(1, 6)
+            },
+        )
+    )
+    AttractionRatingSummary.objects.bulk_create(
+        [
+            AttractionRatingSummary(
+                avg_rating=row["rating_sum"] / row["review_count"], **row
+            )
+            for row in rows
+        ]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("modelCore", "0008_cart_cartitem"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AttractionRatingSummary",
+            fields=[
+                (
+                    "attraction",
+                    models.OneToOneField(
+                        help_text="關聯的遊樂設施",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="rating_summary",
+                        serialize=False,
+                        to="modelCore.attraction",
+                    ),
+                ),
+                (
+                    "review_count",
+                    models.PositiveIntegerField(default=0, help_text="已發布評論數量"),
+                ),
+                (
+                    "rating_sum",
+                    models.PositiveIntegerField(default=0, help_text="已發布評論總分"),
+                ),
+                ("avg_rating", models.FloatField(default=0, help_text="平均評分")),
+                (
+                    "rating_1",
+                    models.PositiveIntegerField(default=0, help_text="1 星評論數量"),
+                ),
+                (
+                    "rating_2",
+                    models.PositiveIntegerField(default=0, help_text="2 星評論數量"),
+                ),
+                (
+                    "rating_3",
+                    models.PositiveIntegerField(default=0, help_text="3 星評論數量"),
+                ),
+                (
+                    "rating_4",
+                    models.PositiveIntegerField(default=0, help_text="4 星評論數量"),
+                ),
+                (
+                    "rating_5",
+                    models.PositiveIntegerField(default=0, help_text="5 星評論數量"),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "遊樂設施評分統計",
+                "verbose_name_plural": "遊樂設施評分統計",
+            },
+        ),
+        migrations.RunPython(populate_rating_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("modelCore", "0009_attractionratingsummary"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="attraction",
+            index=models.Index(fields=["name", "id"], name="attraction_name_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="guestreview",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="review_created_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,123 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def encode_geohash(latitude, longitude, precision=9):
+    # Frozen copy of modelCore.geo.encode
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            mid = (lng_range[0] + lng_range[1]) / 2
+            if longitude >= mid:
+                bits = bits * 2 + 1
+                lng_range[0] = mid
+            else:
+                bits = bits * 2
+                lng_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                bits = bits * 2 + 1
+                lat_range[0] = mid
+            else:
+                bits = bits * 2
+                lat_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return "".join(chars)
+
+
+def populate_geohash(apps, schema_editor):
+    Attraction = apps.get_model("modelCore", "Attraction")
+
+    attractions = list(
+        Attraction.objects.filter(latitude__isnull=False, longitude__isnull=False)
+    )
+    for attraction in attractions:
+        attraction.geohash = encode_geohash(attraction.latitude, attraction.longitude)
+    Attraction.objects.bulk_update(attractions, ["geohash"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("modelCore", "0010_attraction_name_id_idx_review_created_id_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="attraction",
+            name="geohash",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                help_text="經緯度的 geohash，保存時自動計算，用於附近查詢",
+                max_length=9,
+                null=True,
+            ),
+        ),
+        migrations.CreateModel(
+            name="AttractionNeighbor",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "rank",
+                    models.PositiveSmallIntegerField(
+                        help_text="按距離排序的名次，從 1 開始"
+                    ),
+                ),
+                ("distance", models.FloatField(help_text="距離（米）")),
+                (
+                    "attraction",
+                    models.ForeignKey(
+                        help_text="吸引設施",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="neighbors",
+                        to="modelCore.attraction",
+                    ),
+                ),
+                (
+                    "neighbor",
+                    models.ForeignKey(
+                        help_text="附近的吸引設施",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="modelCore.attraction",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "吸引設施最近鄰",
+                "verbose_name_plural": "吸引設施最近鄰",
+                "ordering": ["attraction", "rank"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("attraction", "rank"),
+                        name="attraction_neighbor_rank_unique",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(populate_geohash, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+from django.db import OperationalError, migrations
+
+
+def create_search_index(apps, schema_editor):
+    # The index is filled by the rebuild_search_index command
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    try:
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS modelCore_catalog_search USING fts5("
+            "kind UNINDEXED, object_id UNINDEXED, name UNINDEXED, context UNINDEXED, "
+            "name_tokens, body_tokens, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+    except OperationalError:
+        # SQLite built without FTS5, search falls back to icontains
+        pass
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS modelCore_catalog_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("modelCore", "0011_attraction_geohash_attractionneighbor"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("modelCore", "0012_catalog_search_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NumberSequence",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(help_text="序列名稱", max_length=50, unique=True),
+                ),
+                (
+                    "next_value",
+                    models.BigIntegerField(default=0, help_text="下一個可分配的值"),
+                ),
+            ],
+            options={
+                "verbose_name": "編號序列",
+                "verbose_name_plural": "編號序列",
+            },
+        ),
+    ]
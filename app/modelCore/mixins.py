@@ -0,0 +1,465 @@
+import hashlib
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Count, Max
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from .generations import CACHE_ERRORS, get_cache, get_generations
+from .values import ValuesPlan
+
+class ConditionalGetMixin:
+    """
+    ETag / Last-Modified support for read-only catalog actions
+
+    Validators are derived from one aggregate query over the filtered queryset:
+    the row count and the latest of `conditional_timestamp_fields`. Add related
+    timestamps (e.g. 'park__updated_at') for data the serializer pulls in from
+    other tables. The ETag also covers the generations of the view's cache
+    models (see CachedResponseMixin), so deleting a related row or changing one
+    within the same second as the latest timestamp still changes it. When the
+    client's If-None-Match / If-Modified-Since still match, a 304 is returned
+    without running the action or serializing anything.
+    """
+    conditional_actions = ('list', 'retrieve')
+    conditional_timestamp_fields = ('updated_at',)
+
+    def get_conditional_queryset(self):
+        """Queryset the current action reads, without pagination"""
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.action == 'retrieve':
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            queryset = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        return queryset
+
+    def get_conditional_models(self):
+        """Models whose generations go into the ETag, the response cache models by default"""
+        get_cache_models = getattr(self, 'get_cache_models', None)
+        return get_cache_models() if get_cache_models is not None else ()
+
+    def get_conditional_validators(self, request):
+        """
+        Compute the ETag and Last-Modified timestamp for the current request
+
+        Returns:
+            tuple: (etag, last_modified), or (None, None) if there is nothing to validate
+        """
+        aggregates = {
+            f'max_{i}': Max(field) for i, field in enumerate(self.conditional_timestamp_fields)
+        }
+        values = self.get_conditional_queryset().order_by().aggregate(
+            row_count=Count('pk', distinct=True),
+            **aggregates
+        )
+        row_count = values.pop('row_count')
+        if self.action == 'retrieve' and not row_count:
+            return None, None
+
+        timestamps = [value for value in values.values() if value is not None]
+        latest = max(timestamps) if timestamps else None
+        last_modified = int(latest.timestamp()) if latest else None
+
+        accepted_media_type = getattr(request, 'accepted_media_type', '')
+        version = getattr(request, 'version', None)
+        models = self.get_conditional_models()
+        generations = get_generations(models) if models else ()
+        if generations is None:
+            # Without the counters a related delete could go unnoticed, do not validate
+            return None, None
+        digest = hashlib.md5(
+            f'{row_count}:{latest.isoformat() if latest else ""}:{accepted_media_type}:{version}:{generations}'.encode()
+        ).hexdigest()
+        return f'W/"{digest}"', last_modified
+
+    def conditional_response(self, request, handler, *args, **kwargs):
+        """
+        Run `handler` unless the client's cached copy is still valid
+
+        Args:
+            request (Request): Current request
+            handler (callable): Action implementation producing the full response
+
+        Returns:
+            Response: 304 Not Modified or the handler's response with validators attached
+        """
+        if request.method not in ('GET', 'HEAD') or self.action not in self.conditional_actions:
+            return handler(request, *args, **kwargs)
+
+        etag, last_modified = self.get_conditional_validators(request)
+        if etag is None:
+            return handler(request, *args, **kwargs)
+
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        response = not_modified if not_modified is not None else handler(request, *args, **kwargs)
+
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(request, super().retrieve, *args, **kwargs)
+
+class CachedResponseMixin:
+    """
+    Full-response cache for anonymous catalog reads
+
+    Rendered responses are stored in the catalog cache keyed by path, query
+    parameters sorted by name, API version, accepted media type and the
+    generations of `cache_models`. Saving or deleting a row of any of those
+    models bumps its generation (see modelCore.signals), which retires every
+    key built from it.
+    A hit returns the stored bytes without touching the database or a
+    serializer. Actions reading more models than the list override
+    `get_cache_models()`. Place before ConditionalGetMixin so hits also skip the
+    validator query; stored ETag / Last-Modified headers still produce 304s.
+    While the cache backend is unavailable every request runs uncached.
+    """
+    cache_actions = ('list', 'retrieve', 'batch')
+    cache_models = ()
+    response_cache_prefix = 'catalog:response'
+
+    _response_cache_key = None
+
+    def get_cache_models(self):
+        """Models whose changes invalidate responses of the current action"""
+        return self.cache_models
+
+    def get_response_cache_key(self, request):
+        """
+        Build the cache key for the current request, or None if it should not be cached
+        """
+        cache_models = self.get_cache_models()
+        if (
+            request.method != 'GET'
+            or self.action not in self.cache_actions
+            or not cache_models
+            or request.user.is_authenticated
+        ):
+            return None
+        generations = get_generations(cache_models)
+        if generations is None:
+            return None
+        # Parameter order does not matter, the order of a repeated parameter's values may (batch ids)
+        params = sorted((name, request.query_params.getlist(name)) for name in request.query_params)
+        parts = [
+            request.path,
+            repr(params),
+            str(getattr(request, 'version', None)),
+            getattr(request, 'accepted_media_type', ''),
+            repr(generations),
+        ]
+        digest = hashlib.md5('|'.join(parts).encode()).hexdigest()
+        return f'{self.response_cache_prefix}:{digest}'
+
+    def cached_response(self, request, handler, *args, **kwargs):
+        """
+        Serve the stored response for this request, or run `handler` and store its result
+
+        Args:
+            request (Request): Current request
+            handler (callable): Action implementation producing the full response
+
+        Returns:
+            HttpResponse: Stored or freshly generated response
+        """
+        key = self.get_response_cache_key(request)
+        if key is None:
+            return handler(request, *args, **kwargs)
+
+        try:
+            entry = get_cache().get(key)
+        except CACHE_ERRORS:
+            return handler(request, *args, **kwargs)
+        if entry is None:
+            self._response_cache_key = key
+            return handler(request, *args, **kwargs)
+
+        not_modified = get_conditional_response(
+            request, etag=entry['headers'].get('ETag'), last_modified=entry['last_modified']
+        )
+        response = not_modified if not_modified is not None else HttpResponse(
+            entry['content'], content_type=entry['content_type']
+        )
+        for name, value in entry['headers'].items():
+            response[name] = value
+        return response
+
+    def store_response(self, key, response):
+        """Store a rendered 200 response under `key`"""
+        if response.status_code != 200:
+            return
+        headers = {name: response[name] for name in ('ETag', 'Last-Modified') if response.has_header(name)}
+        try:
+            get_cache().set(key, {
+                'content': response.content,
+                'content_type': response['Content-Type'],
+                'headers': headers,
+                'last_modified': parse_http_date_safe(headers.get('Last-Modified', '')),
+            }, getattr(settings, 'CATALOG_RESPONSE_CACHE_TIMEOUT', 300))
+        except CACHE_ERRORS:
+            pass
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        key, self._response_cache_key = self._response_cache_key, None
+        if key is not None and isinstance(response, Response):
+            response.add_post_render_callback(lambda rendered: self.store_response(key, rendered))
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(request, super().retrieve, *args, **kwargs)
+
+class SparseFieldsetViewMixin:
+    """
+    `?fields=` / `?omit=` support for read actions
+
+    Both parameters take comma separated serializer field names. The selection
+    is passed to the serializer (see modelCore.serializers.SparseFieldsetMixin)
+    and the queryset is pruned to match: `.only()` loads just the columns the
+    remaining fields read and `select_related` keeps only the relations they
+    traverse, and prefetches of unselected relations are dropped. If any
+    selected field cannot be mapped to model columns the queryset is left
+    as is.
+    """
+    fields_query_param = 'fields'
+    omit_query_param = 'omit'
+    sparse_actions = ('list', 'retrieve', 'batch')
+
+    def _parse_field_names(self, param):
+        names = set()
+        for value in self.request.query_params.getlist(param):
+            names.update(name.strip() for name in value.split(',') if name.strip())
+        return names
+
+    def get_sparse_fieldset(self):
+        """
+        Get the requested field selection
+
+        Returns:
+            tuple: (include, omit) sets, include is None when all fields are requested;
+                None when the request does not select fields
+        """
+        if getattr(self, 'swagger_fake_view', False) or self.action not in self.sparse_actions:
+            return None
+        include = self._parse_field_names(self.fields_query_param)
+        omit = self._parse_field_names(self.omit_query_param)
+        if not include and not omit:
+            return None
+        return (include or None), omit
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        fieldset = self.get_sparse_fieldset()
+        if fieldset is not None:
+            context['sparse_fieldset'] = fieldset
+        return context
+
+    def _source_columns(self, model, source):
+        """
+        Map a dotted serializer source to `.only()` paths and `select_related` paths
+
+        Returns:
+            tuple: (only, related) sets, or None if the source is not plain model columns
+        """
+        only, related, path = set(), set(), []
+        parts = source.split('.')
+        for i, part in enumerate(parts):
+            try:
+                field = model._meta.get_field(part)
+            except FieldDoesNotExist:
+                return None
+            last = i == len(parts) - 1
+            if field.is_relation and not field.concrete:
+                # Reverse relations of the root model are loaded by their own query
+                return (only, related) if i == 0 else None
+            path.append(part)
+            only.add('__'.join(path))
+            if last:
+                return only, related
+            if not field.is_relation:
+                return None
+            related.add('__'.join(path))
+            model = field.related_model
+        return only, related
+
+    def sparse_queryset(self, queryset):
+        """
+        Prune a queryset to the columns and relations of the selected fields
+
+        Args:
+            queryset (QuerySet): Queryset for the current action
+
+        Returns:
+            QuerySet: Pruned queryset, or `queryset` unchanged if it cannot be pruned
+        """
+        if self.get_sparse_fieldset() is None:
+            return queryset
+
+        serializer = self.get_serializer_class()(context=self.get_serializer_context())
+        relations = getattr(serializer, 'sparse_field_relations', {})
+        # Paginators read the ordering columns from the page's boundary rows
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        ordering += getattr(self.paginator, 'cursor_ordering', None) or []
+        only = {name.lstrip('-') for name in ordering if isinstance(name, str) and '__' not in name}
+        related = set()
+        sources = set()
+        for name, field in serializer.fields.items():
+            if isinstance(field, serializers.SerializerMethodField):
+                if name not in relations:
+                    return queryset
+                # Relations named in only() load all their columns
+                related.update(relations[name])
+                only.update(relations[name])
+                continue
+            columns = self._source_columns(queryset.model, field.source)
+            if columns is None:
+                return queryset
+            only.update(columns[0])
+            related.update(columns[1])
+            sources.add(field.source.split('.')[0])
+
+        # Drop prefetches of relations no selected field reads
+        prefetches = [
+            lookup for lookup in queryset._prefetch_related_lookups
+            if getattr(lookup, 'prefetch_to', lookup).split('__')[0] in sources
+        ]
+        queryset = queryset.select_related(None).prefetch_related(None)
+        if related:
+            queryset = queryset.select_related(*sorted(related))
+        if prefetches:
+            queryset = queryset.prefetch_related(*prefetches)
+        return queryset.only(*sorted(only))
+
+    def filter_queryset(self, queryset):
+        return self.sparse_queryset(super().filter_queryset(queryset))
+
+class ValuesListMixin:
+    """
+    Render `list` from `.values()` rows instead of model instances
+
+    The serializer is compiled into a ValuesPlan once per request; rows are
+    fetched with `.values()` for just the lookups it needs and rendered by the
+    plan's per-field converters. Output is the same as the regular serializer.
+    Falls back to the regular path when the serializer cannot be compiled or
+    CATALOG_VALUES_SERIALIZATION is off.
+    """
+    values_actions = ('list',)
+
+    def get_values_plan(self, queryset):
+        """Compile the current serializer, or return None to use the regular path"""
+        if (
+            not getattr(settings, 'CATALOG_VALUES_SERIALIZATION', True)
+            or self.action not in self.values_actions
+            or getattr(self, 'swagger_fake_view', False)
+        ):
+            return None
+        return ValuesPlan.compile(self.get_serializer(), queryset.model)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        plan = self.get_values_plan(queryset)
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+
+        lookups = list(plan.lookups)
+        # Cursor pagination reads its position from the ordering columns of the rows
+        for name in getattr(self.paginator, 'cursor_ordering', None) or ():
+            if name.lstrip('-') not in lookups:
+                lookups.append(name.lstrip('-'))
+        rows = queryset.values(*lookups)
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(plan.render_many(page))
+        return Response(plan.render_many(rows))
+
+class BatchRetrieveMixin:
+    """
+    `batch` action: retrieve many objects by id in one request
+
+    `GET <list url>/batch/?ids=a,b,c` resolves every id with one query on the
+    viewset's queryset, so annotations, `select_related` and `?fields=` apply
+    as for `retrieve`. Objects come back in the requested order (duplicates
+    removed) in the retrieve representation, together with the ids that were
+    not found; malformed ids count as not found. Anonymous responses go
+    through CachedResponseMixin when the viewset has it.
+    """
+    batch_query_param = 'ids'
+    batch_max_ids = 100
+
+    def get_batch_ids(self):
+        """Requested ids in order, without duplicates"""
+        ids = []
+        for value in self.request.query_params.getlist(self.batch_query_param):
+            ids.extend(part.strip() for part in value.split(',') if part.strip())
+        return list(dict.fromkeys(ids))
+
+    @action(detail=False, methods=['get'])
+    @swagger_auto_schema(
+        operation_description="Get several objects by id, reporting ids that were not found",
+        manual_parameters=[
+            openapi.Parameter(
+                'ids',
+                openapi.IN_QUERY,
+                description="Comma separated ids (max 100)",
+                type=openapi.TYPE_STRING,
+                required=True
+            ),
+        ]
+    )
+    def batch(self, request, *args, **kwargs):
+        cached_response = getattr(self, 'cached_response', None)
+        if cached_response is not None:
+            return cached_response(request, self.batch_response, *args, **kwargs)
+        return self.batch_response(request, *args, **kwargs)
+
+    def batch_response(self, request, *args, **kwargs):
+        ids = self.get_batch_ids()
+        if not ids:
+            return Response(
+                {"error": f"{self.batch_query_param} is required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(ids) > self.batch_max_ids:
+            return Response(
+                {"error": f"At most {self.batch_max_ids} ids per request"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        queryset = self.filter_queryset(self.get_queryset())
+        pk_field = queryset.model._meta.pk
+        keys = {}
+        for value in ids:
+            try:
+                keys[value] = pk_field.to_python(value)
+            except ValidationError:
+                continue
+        found = {obj.pk: obj for obj in queryset.filter(pk__in=set(keys.values()))}
+
+        objects = []
+        missing = []
+        for value in ids:
+            obj = found.get(keys[value]) if value in keys else None
+            if obj is None:
+                missing.append(value)
+            else:
+                objects.append(obj)
+        serializer = self.get_serializer(objects, many=True)
+        return Response({
+            'count': len(objects),
+            'results': serializer.data,
+            'missing': missing,
+        })
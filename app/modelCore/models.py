@@ -1,11 +1,15 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 # Create your models here.
 import pathlib
 import uuid
-import datetime
-import random
+from decimal import Decimal
+from django.db.models import F, Sum
 from django.utils import timezone
+from . import geo, numbering
+
+# 金額精度
+CENTS = Decimal('0.01')
 
 def image_upload_handler(instance,filename):
     fpath = pathlib.Path(filename)
@@ -219,12 +223,163 @@ class Attraction(models.Model):
     # 位置相關欄位
     longitude = models.FloatField(blank=True, null=True, help_text='經度')
     latitude = models.FloatField(blank=True, null=True, help_text='緯度')
+    geohash = models.CharField(
+        max_length=geo.GEOHASH_PRECISION, blank=True, null=True, db_index=True,
+        help_text='經緯度的 geohash，保存時自動計算，用於附近查詢'
+    )
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        self.geohash = self.compute_geohash()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'geohash'}
+        super().save(*args, **kwargs)
+    
+    def compute_geohash(self):
+        """根據經緯度計算 geohash，沒有坐標時返回 None"""
+        if self.latitude is None or self.longitude is None:
+            return None
+        return geo.encode(self.latitude, self.longitude)
+    
+    @classmethod
+    def find_nearby(cls, latitude, longitude, radius, limit=None, queryset=None):
+        """
+        查找指定點附近的吸引設施
+        
+        先用覆蓋搜索圓的 geohash 網格在索引上篩選候選，再計算精確的球面距離
+        
+        Args:
+            latitude (float): 中心點緯度
+            longitude (float): 中心點經度
+            radius (float): 搜索半徑（米）
+            limit (int, optional): 最多返回數量
+            queryset (QuerySet, optional): 候選範圍，默認為全部吸引設施
+            
+        Returns:
+            list: 按距離排序的 (吸引設施ID, 距離米) 列表
+        """
+        if queryset is None:
+            queryset = cls.objects.all()
+        queryset = queryset.filter(geohash__isnull=False)
+        
+        cells = geo.covering_cells(latitude, longitude, radius)
+        if cells:
+            condition = models.Q()
+            for cell in cells:
+                condition |= models.Q(geohash__gte=cell, geohash__lt=cell + geo.PREFIX_END)
+            queryset = queryset.filter(condition)
+        
+        candidates = list(queryset.order_by().values_list('id', 'latitude', 'longitude'))
+        distances = geo.haversine(
+            latitude, longitude,
+            [row[1] for row in candidates],
+            [row[2] for row in candidates]
+        )
+        matches = sorted(
+            ((row[0], distance) for row, distance in zip(candidates, distances) if distance <= radius),
+            key=lambda match: match[1]
+        )
+        return matches[:limit] if limit else matches
+
     class Meta:
         ordering = ['name']
+        indexes = [
+            # 遊標分頁按 (name, id) 排序
+            models.Index(fields=['name', 'id'], name='attraction_name_id_idx'),
+        ]
+
+class AttractionNeighbor(models.Model):
+    """
+    吸引設施的最近鄰
+    
+    預先計算每個吸引設施距離最近的 k 個吸引設施，供「附近還有什麼」直接讀取，
+    由 build_attraction_neighbors 命令重建
+    """
+    attraction = models.ForeignKey(
+        Attraction,
+        on_delete=models.CASCADE,
+        related_name='neighbors',
+        help_text='吸引設施'
+    )
+    neighbor = models.ForeignKey(
+        Attraction,
+        on_delete=models.CASCADE,
+        related_name='+',
+        help_text='附近的吸引設施'
+    )
+    rank = models.PositiveSmallIntegerField(help_text='按距離排序的名次，從 1 開始')
+    distance = models.FloatField(help_text='距離（米）')
+    
+    # 候選範圍：同一 geohash 網格及其周圍 8 格，約 5 公里
+    CANDIDATE_PRECISION = 5
+    
+    def __str__(self):
+        return f"{self.attraction} -> {self.neighbor} ({self.distance:.0f}m)"
+    
+    @classmethod
+    def rebuild(cls, k=10):
+        """
+        重新計算所有吸引設施的最近鄰
+        
+        按 geohash 網格分組，每個吸引設施只和周圍 3x3 網格內的吸引設施比較距離
+        
+        Args:
+            k (int): 每個吸引設施保存的最近鄰數量
+            
+        Returns:
+            int: 保存的最近鄰數量
+        """
+        rows = list(
+            Attraction.objects.filter(geohash__isnull=False)
+            .order_by('geohash')
+            .values_list('id', 'latitude', 'longitude', 'geohash')
+        )
+        buckets = {}
+        for row in rows:
+            buckets.setdefault(row[3][:cls.CANDIDATE_PRECISION], []).append(row)
+        
+        lat_deg, lng_deg = geo.cell_size(cls.CANDIDATE_PRECISION)
+        neighbors = []
+        for attraction_id, latitude, longitude, _ in rows:
+            cells = {
+                geo.encode(
+                    latitude + dlat * lat_deg,
+                    (longitude + dlng * lng_deg + 180) % 360 - 180,
+                    cls.CANDIDATE_PRECISION
+                )
+                for dlat in (-1, 0, 1) for dlng in (-1, 0, 1)
+                if -90 <= latitude + dlat * lat_deg <= 90
+            }
+            candidates = [
+                row for cell in cells for row in buckets.get(cell, ())
+                if row[0] != attraction_id
+            ]
+            distances = geo.haversine(
+                latitude, longitude,
+                [row[1] for row in candidates],
+                [row[2] for row in candidates]
+            )
+            nearest = sorted(zip(distances, (row[0] for row in candidates)))[:k]
+            neighbors.extend(
+                cls(attraction_id=attraction_id, neighbor_id=neighbor_id, rank=rank, distance=distance)
+                for rank, (distance, neighbor_id) in enumerate(nearest, start=1)
+            )
+        
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(neighbors, batch_size=1000)
+        return len(neighbors)
+    
+    class Meta:
+        ordering = ['attraction', 'rank']
+        verbose_name = '吸引設施最近鄰'
+        verbose_name_plural = '吸引設施最近鄰'
+        constraints = [
+            models.UniqueConstraint(fields=['attraction', 'rank'], name='attraction_neighbor_rank_unique'),
+        ]
 
 class GuestReview(models.Model):
     """
@@ -263,6 +418,117 @@ class GuestReview(models.Model):
         verbose_name = '遊客評論'
         verbose_name_plural = '遊客評論'
         unique_together = ['user', 'attraction', 'visit_date']
+        indexes = [
+            # 遊標分頁按 (created_at, id) 倒序排序
+            models.Index(fields=['-created_at', '-id'], name='review_created_id_idx'),
+        ]
+
+class AttractionRatingSummary(models.Model):
+    """
+    遊樂設施評分統計
+    
+    按遊樂設施匯總已發布評論的數量、總分、平均分和 1-5 星分佈，
+    評論新增、修改、發布/取消發布或刪除時增量更新，列表和詳情接口直接讀取
+    """
+    attraction = models.OneToOneField(
+        Attraction,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='rating_summary',
+        help_text='關聯的遊樂設施'
+    )
+    review_count = models.PositiveIntegerField(default=0, help_text='已發布評論數量')
+    rating_sum = models.PositiveIntegerField(default=0, help_text='已發布評論總分')
+    avg_rating = models.FloatField(default=0, help_text='平均評分')
+    rating_1 = models.PositiveIntegerField(default=0, help_text='1 星評論數量')
+    rating_2 = models.PositiveIntegerField(default=0, help_text='2 星評論數量')
+    rating_3 = models.PositiveIntegerField(default=0, help_text='3 星評論數量')
+    rating_4 = models.PositiveIntegerField(default=0, help_text='4 星評論數量')
+    rating_5 = models.PositiveIntegerField(default=0, help_text='5 星評論數量')
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    RATINGS = range(1, 6)
+    
+    def __str__(self):
+        return f"{self.attraction_id} - {self.review_count} 則評論"
+    
+    @property
+    def histogram(self):
+        """1-5 星分佈"""
+        return {str(rating): getattr(self, f'rating_{rating}') for rating in self.RATINGS}
+    
+    def add_rating(self, rating, delta):
+        """
+        增加或減少一則評論的統計
+        
+        Args:
+            rating (int): 評分
+            delta (int): 1 表示增加，-1 表示減少
+        """
+        field = f'rating_{rating}'
+        self.review_count = max(self.review_count + delta, 0)
+        self.rating_sum = max(self.rating_sum + delta * rating, 0)
+        setattr(self, field, max(getattr(self, field) + delta, 0))
+        self.avg_rating = self.rating_sum / self.review_count if self.review_count else 0
+    
+    @classmethod
+    def apply_review_change(cls, old=None, new=None):
+        """
+        在事務中根據評論變更前後的狀態更新統計
+        
+        Args:
+            old (tuple, optional): 變更前的 (attraction_id, rating, is_published)，新建評論時為 None
+            new (tuple, optional): 變更後的 (attraction_id, rating, is_published)，刪除評論時為 None
+        """
+        changes = []
+        if old and old[2]:
+            changes.append((old[0], old[1], -1))
+        if new and new[2]:
+            changes.append((new[0], new[1], 1))
+        if len(changes) == 2 and changes[0][:2] == changes[1][:2]:
+            return
+        
+        with transaction.atomic():
+            for attraction_id, rating, delta in changes:
+                if delta > 0:
+                    cls.objects.get_or_create(attraction_id=attraction_id)
+                # 刪除時不創建統計行，遊樂設施本身可能正在被級聯刪除
+                summary = cls.objects.select_for_update().filter(attraction_id=attraction_id).first()
+                if summary is None:
+                    continue
+                summary.add_rating(rating, delta)
+                summary.save()
+    
+    @classmethod
+    def rebuild(cls):
+        """
+        根據已發布的評論重新計算所有統計
+        
+        Returns:
+            int: 統計行數量
+        """
+        from django.db.models import Count, Sum, Q
+        
+        rows = GuestReview.objects.filter(is_published=True).values('attraction_id').annotate(
+            review_count=Count('id'),
+            rating_sum=Sum('rating'),
+            **{f'rating_{rating}': Count('id', filter=Q(rating=rating)) for rating in cls.RATINGS}
+        )
+        
+        summaries = []
+        for row in rows:
+            summary = cls(**row)
+            summary.avg_rating = summary.rating_sum / summary.review_count if summary.review_count else 0
+            summaries.append(summary)
+        
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(summaries)
+        return len(summaries)
+    
+    class Meta:
+        verbose_name = '遊樂設施評分統計'
+        verbose_name_plural = '遊樂設施評分統計'
 
 # 票券和訂單相關模型
 class TicketType(models.Model):
@@ -289,6 +555,44 @@ class TicketType(models.Model):
         verbose_name = '票券類型'
         verbose_name_plural = '票券類型'
 
+class NumberSequence(models.Model):
+    """
+    編號序列
+    
+    每個序列一行，保存下一個可分配的值。進程一次預留一段連續的值，
+    之後在內存中逐個分配，參見 modelCore.numbering
+    """
+    name = models.CharField(max_length=50, unique=True, help_text='序列名稱')
+    next_value = models.BigIntegerField(default=0, help_text='下一個可分配的值')
+    
+    def __str__(self):
+        return f"{self.name}: {self.next_value}"
+    
+    @classmethod
+    def reserve(cls, name, count):
+        """
+        預留一段連續的值
+        
+        UPDATE 會鎖住序列行，並發的預留依次進行，得到的區間不會重疊
+        
+        Args:
+            name (str): 序列名稱，不存在時自動創建
+            count (int): 預留的數量
+            
+        Returns:
+            int: 區間的第一個值，區間為 [返回值, 返回值 + count)
+        """
+        with transaction.atomic():
+            if not cls.objects.filter(name=name).update(next_value=F('next_value') + count):
+                cls.objects.get_or_create(name=name)
+                cls.objects.filter(name=name).update(next_value=F('next_value') + count)
+            end = cls.objects.filter(name=name).values_list('next_value', flat=True).get()
+        return end - count
+    
+    class Meta:
+        verbose_name = '編號序列'
+        verbose_name_plural = '編號序列'
+
 class Order(models.Model):
     """訂單模型"""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -333,16 +637,22 @@ class Order(models.Model):
     def save(self, *args, **kwargs):
         # 生成訂單編號
         if not self.order_number:
-            today = datetime.date.today().strftime('%Y%m%d')
-            random_str = ''.join(random.choices('0123456789', k=8))
-            self.order_number = f"ORD{today}{random_str}"
+            self.order_number = numbering.ORDER_NUMBERS.next()
         super().save(*args, **kwargs)
     
     def calculate_total(self):
-        """計算訂單總金額"""
-        total = sum(item.subtotal for item in self.items.all())
+        """
+        重新計算並保存訂單總金額
+        
+        用一次 SUM 聚合計算，只更新金額欄位
+        """
+        total = self.items.aggregate(
+            total=Sum(F('quantity') * F('unit_price'), output_field=models.DecimalField(max_digits=10, decimal_places=2))
+        )['total'] or Decimal('0')
+        # SQLite 不保留小數位數
+        total = total.quantize(CENTS)
         self.total_amount = total
-        self.save()
+        self.save(update_fields=['total_amount', 'updated_at'])
         return total
     
     class Meta:
@@ -400,9 +710,7 @@ class Ticket(models.Model):
     def save(self, *args, **kwargs):
         # 生成票券編號
         if not self.ticket_number:
-            today = datetime.date.today().strftime('%Y%m%d')
-            random_str = ''.join(random.choices('0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ', k=8))
-            self.ticket_number = f"TIX{today}{random_str}"
+            self.ticket_number = numbering.TICKET_NUMBERS.next()
             
         # 如果是新建票券且沒有QR碼，則生成QR碼
         if not self.pk and not self.qr_code:
@@ -410,6 +718,19 @@ class Ticket(models.Model):
             
         super().save(*args, **kwargs)
     
+    @classmethod
+    def generate_ticket_numbers(cls, count):
+        """
+        分配一批票券編號，批量創建票券前使用，不需要逐張保存
+        
+        Args:
+            count (int): 需要的編號數量
+            
+        Returns:
+            list: 票券編號列表
+        """
+        return numbering.TICKET_NUMBERS.take(count)
+    
     def generate_qr_code(self):
         """生成QR碼"""
         # 實際項目中應使用QR碼生成庫，此處僅為示例
@@ -433,7 +754,17 @@ class Cart(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
     def get_total_price(self):
-        return sum(item.get_subtotal() for item in self.items.all())
+        """
+        計算購物車總金額
+        
+        已預取購物車項目（及票券類型）時直接使用，否則用一次 SUM 聚合計算
+        """
+        if 'items' in getattr(self, '_prefetched_objects_cache', {}):
+            return sum(item.get_subtotal() for item in self.items.all())
+        total = self.items.aggregate(
+            total=Sum(F('quantity') * F('ticket_type__price'), output_field=models.DecimalField(max_digits=10, decimal_places=2))
+        )['total']
+        return total.quantize(CENTS) if total is not None else 0
 
     def __str__(self):
         return f"Cart for {self.user.email}"
@@ -0,0 +1,136 @@
+"""
+Order and ticket numbers, unique by construction
+
+A number is a prefix, today's date and 8 characters encoding a value from a
+NumberSequence row (`ORD2024010112345678`, `TIX20240101K3Z90QXA`). Each
+process reserves a block of values with one UPDATE and hands them out from
+memory, so most numbers cost no query, and a large order takes all its
+numbers in one call. Values are never handed out twice: blocks do not
+overlap, a block is dropped when the process forks (the child would share
+it with its parent), and a block reserved inside a transaction only joins
+the pool once that transaction commits, since a rollback also returns it
+to the sequence.
+
+The value is spread over the 8-character space with a multiplicative
+permutation, so consecutive numbers do not look consecutive and do not
+reveal order volume. The permutation is a bijection, numbers stay unique
+until the sequence passes the size of the space (10^8 orders, 36^8 tickets).
+"""
+
+import datetime
+import functools
+import os
+import threading
+from django.conf import settings
+from django.db import transaction
+
+DIGITS = '0123456789'
+ALPHANUMERIC = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+class NumberAllocator:
+    """
+    Hands out numbers of one sequence from blocks reserved in the database
+
+    Args:
+        sequence (str): NumberSequence name
+        prefix (str): Prefix of every number, e.g. 'ORD'
+        alphabet (str): Characters of the 8-character part
+        multiplier (int): Permutation multiplier, coprime with len(alphabet) ** 8
+        width (int): Length of the encoded part
+    """
+
+    def __init__(self, sequence, prefix, alphabet, multiplier, width=8):
+        self.sequence = sequence
+        self.prefix = prefix
+        self.alphabet = alphabet
+        self.multiplier = multiplier
+        self.width = width
+        self.space = len(alphabet) ** width
+        self._lock = threading.Lock()
+        self._pid = None
+        # Reserved, not yet used [start, end) ranges
+        self._blocks = []
+
+    @property
+    def block_size(self):
+        return getattr(settings, 'NUMBER_SEQUENCE_BLOCK_SIZE', 100)
+
+    def encode(self, value):
+        """Encode a sequence value as the fixed-width part of a number"""
+        value = (value * self.multiplier) % self.space
+        chars = []
+        for _ in range(self.width):
+            value, index = divmod(value, len(self.alphabet))
+            chars.append(self.alphabet[index])
+        return ''.join(reversed(chars))
+
+    def format(self, value, date=None):
+        date = date or datetime.date.today()
+        return f"{self.prefix}{date.strftime('%Y%m%d')}{self.encode(value)}"
+
+    def _take_cached(self, count):
+        values = []
+        with self._lock:
+            if self._pid != os.getpid():
+                # Blocks inherited from the parent process are the parent's
+                self._pid = os.getpid()
+                self._blocks = []
+            while self._blocks and len(values) < count:
+                start, end = self._blocks[0]
+                taken = min(end - start, count - len(values))
+                values.extend(range(start, start + taken))
+                if start + taken == end:
+                    self._blocks.pop(0)
+                else:
+                    self._blocks[0] = (start + taken, end)
+        return values
+
+    def _add_block(self, pid, start, end):
+        with self._lock:
+            if self._pid == pid and start < end:
+                self._blocks.append((start, end))
+
+    def take_values(self, count):
+        """
+        Get `count` unused sequence values
+
+        Served from the process's reserved blocks; when they run out one
+        block of at least the missing amount is reserved.
+        """
+        from .models import NumberSequence
+
+        values = self._take_cached(count)
+        missing = count - len(values)
+        if missing <= 0:
+            return values
+
+        size = max(missing, self.block_size)
+        start = NumberSequence.reserve(self.sequence, size)
+        values.extend(range(start, start + missing))
+
+        pid = os.getpid()
+        add_rest = functools.partial(self._add_block, pid, start + missing, start + size)
+        if transaction.get_connection().in_atomic_block:
+            # A rollback returns the block to the sequence, keep the rest only once it is committed
+            transaction.on_commit(add_rest)
+        else:
+            add_rest()
+        return values
+
+    def take(self, count):
+        """
+        Get `count` new numbers
+
+        Returns:
+            list: Numbers, all dated today
+        """
+        date = datetime.date.today()
+        return [self.format(value, date) for value in self.take_values(count)]
+
+    def next(self):
+        """Get one new number"""
+        return self.take(1)[0]
+
+# Multipliers are prime and coprime with 10 and 36
+ORDER_NUMBERS = NumberAllocator('order_number', 'ORD', DIGITS, 48271)
+TICKET_NUMBERS = NumberAllocator('ticket_number', 'TIX', ALPHANUMERIC, 2147483647)
@@ -0,0 +1,241 @@
+from base64 import b64decode, b64encode
+import binascii
+import json
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination, CursorPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+class PaginatedActionMixin:
+    """Viewset helpers for custom list actions that should paginate like `list`"""
+
+    def paginate_action(self, queryset, pagination_class=None):
+        """
+        Paginate a custom action's queryset
+
+        Args:
+            queryset (QuerySet): Queryset to paginate
+            pagination_class (type, optional): Paginator to use instead of the viewset's
+
+        Returns:
+            tuple: (paginator, page), both None if pagination is disabled
+        """
+        paginator = pagination_class() if pagination_class is not None else self.paginator
+        if paginator is None:
+            return None, None
+        return paginator, paginator.paginate_queryset(queryset, self.request, view=self)
+
+    def paginated_response(self, queryset, serializer_class, pagination_class=None):
+        """
+        Serialize one page of a custom action's queryset
+
+        Args:
+            queryset (QuerySet): Queryset to paginate and serialize
+            serializer_class (type): Serializer for the items
+            pagination_class (type, optional): Paginator to use instead of the viewset's
+
+        Returns:
+            Response: Paginated response
+        """
+        paginator, page = self.paginate_action(queryset, pagination_class)
+        context = self.get_serializer_context()
+        if paginator is None:
+            return Response(serializer_class(queryset, many=True, context=context).data)
+        return paginator.get_paginated_response(serializer_class(page, many=True, context=context).data)
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Cursor pagination positioned on the whole ordering tuple
+
+    DRF's CursorPagination stores only the first ordering field plus an
+    offset among rows sharing its value. This cursor stores the value of
+    every ordering field and pages with a lexicographic comparison, e.g.
+    `name > n OR (name = n AND id > i)` for ('name', 'id'), so each page is
+    one range scan of the matching index however many rows share a name.
+    `ordering` must end with a unique field.
+    """
+
+    def decode_cursor(self, request):
+        """
+        Read the cursor of the request
+
+        Returns:
+            tuple: (position, reverse), or None on the first page
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            data = json.loads(b64decode(encoded.encode('ascii')).decode('utf-8'))
+            position, reverse = data['p'], bool(data.get('r'))
+            if not isinstance(position, list) or len(position) != len(self.ordering):
+                raise ValueError
+        except (TypeError, KeyError, ValueError, UnicodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, cursor):
+        position, reverse = cursor
+        data = {'p': position}
+        if reverse:
+            data['r'] = 1
+        encoded = b64encode(json.dumps(data, separators=(',', ':')).encode('utf-8')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def _position_from_row(self, row):
+        position = []
+        for field in self.ordering:
+            name = field.lstrip('-')
+            value = row[name] if isinstance(row, dict) else getattr(row, name)
+            position.append(str(value))
+        return position
+
+    @staticmethod
+    def after(ordering, position):
+        """
+        Condition selecting the rows after `position` in `ordering`
+
+        Returns:
+            Q: OR of one term per field, each matching the fields before it exactly
+        """
+        condition = Q()
+        for i, field in enumerate(ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            equal = {f.lstrip('-'): value for f, value in zip(ordering[:i], position)}
+            condition |= Q(**equal, **{f'{name}__{lookup}': position[i]})
+        return condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+        position, self.reverse = self.cursor or (None, False)
+
+        ordering = list(self.ordering)
+        if self.reverse:
+            # Previous pages are read backwards from the cursor, then flipped
+            ordering = [field[1:] if field.startswith('-') else f'-{field}' for field in ordering]
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            try:
+                queryset = queryset.filter(self.after(ordering, position))
+            except (ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if self.reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        position = self._position_from_row(self.page[-1]) if self.page else self.cursor[0]
+        return self.encode_cursor((position, False))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        position = self._position_from_row(self.page[0]) if self.page else self.cursor[0]
+        return self.encode_cursor((position, True))
+
+class KeysetSelectablePagination(PageNumberPagination):
+    """
+    Page-number pagination that switches to keyset (cursor) pagination on request
+
+    Cursor mode is used when the request carries a `cursor` parameter or
+    `pagination=cursor`, or by default when `default_mode` is 'cursor'
+    (`pagination=page` forces page numbers). Cursor pages compare the whole
+    `cursor_ordering` tuple (see KeysetCursorPagination) instead of using
+    OFFSET and skip the COUNT(*) query, so deep pages cost the same as the
+    first one. Subclasses set `cursor_ordering` to an indexed, unique-ending
+    ordering.
+    """
+    cursor_ordering = None
+    default_mode = 'page'
+    mode_query_param = 'pagination'
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    cursor_paginator = None
+
+    def use_cursor(self, request):
+        """Whether this request should be paginated with a cursor"""
+        if self.cursor_query_param in request.query_params:
+            return True
+        mode = request.query_params.get(self.mode_query_param, self.default_mode)
+        return mode == 'cursor'
+
+    def get_cursor_paginator(self):
+        """Build the cursor paginator for this request"""
+        paginator = KeysetCursorPagination()
+        paginator.ordering = self.cursor_ordering
+        paginator.cursor_query_param = self.cursor_query_param
+        paginator.page_size = self.page_size
+        paginator.page_size_query_param = self.page_size_query_param
+        paginator.max_page_size = self.max_page_size
+        return paginator
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if self.cursor_ordering and self.use_cursor(request):
+            self.cursor_paginator = self.get_cursor_paginator()
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_html_context(self):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_html_context()
+        return super().get_html_context()
+
+    def to_html(self):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.to_html()
+        return super().to_html()
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        if self.cursor_ordering:
+            parameters += [
+                {
+                    'name': self.mode_query_param,
+                    'required': False,
+                    'in': 'query',
+                    'description': "Pagination mode, 'page' or 'cursor'",
+                    'schema': {'type': 'string', 'enum': ['page', 'cursor']},
+                },
+                {
+                    'name': self.cursor_query_param,
+                    'required': False,
+                    'in': 'query',
+                    'description': 'The pagination cursor value.',
+                    'schema': {'type': 'string'},
+                },
+            ]
+        return parameters
+
+class AttractionPagination(KeysetSelectablePagination):
+    """Attraction list pagination, cursor ordering matches the (name, id) index"""
+    cursor_ordering = ('name', 'id')
+
+class ReviewPagination(KeysetSelectablePagination):
+    """Review list pagination, cursor ordering matches the (created_at, id) index"""
+    cursor_ordering = ('-created_at', '-id')
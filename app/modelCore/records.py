@@ -0,0 +1,109 @@
+from abc import ABC, abstractmethod
+
+class CatalogRecord(ABC):
+    """
+    Lightweight read-only record for catalog data held in process caches
+
+    Unsaved Django model instances carry a `_state` object, field caches and a
+    per-instance `__dict__`. Cached catalog entries only need a few attributes,
+    so records use `__slots__` instead. Serializers detect records and build
+    their output from `as_representation()` instead of walking model fields.
+    """
+
+    __slots__ = ()
+
+    # Model fields that cached upstream data never has
+    image = None
+    created_at = None
+    updated_at = None
+
+    @property
+    def pk(self):
+        return self.id
+
+    @abstractmethod
+    def as_representation(self):
+        """
+        Get the serialized form of this record, keyed by serializer field name
+
+        Returns:
+            dict: Field name -> representation
+        """
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__
+        )
+
+    def __hash__(self):
+        return hash((type(self), self.id))
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}: {self.name}>"
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+class DestinationRecord(CatalogRecord):
+    """Cached destination"""
+
+    __slots__ = ('id', 'name', 'slug')
+
+    def __init__(self, id, name, slug=None):
+        self.id = id
+        self.name = name
+        self.slug = slug
+
+    @classmethod
+    def from_data(cls, data):
+        """
+        Build a record from destination data returned by the API
+
+        Args:
+            data (dict): Destination data
+
+        Returns:
+            DestinationRecord: Destination record
+        """
+        return cls(id=data.get('id'), name=data.get('name'), slug=data.get('slug'))
+
+    def as_representation(self):
+        return {
+            'id': None if self.id is None else str(self.id),
+            'name': self.name,
+            'slug': self.slug,
+            'image': None,
+            'created_at': None,
+            'updated_at': None,
+        }
+
+class ParkRecord(CatalogRecord):
+    """Cached park, optionally linked to its DestinationRecord"""
+
+    __slots__ = ('id', 'name', 'destination')
+
+    def __init__(self, id, name, destination=None):
+        self.id = id
+        self.name = name
+        self.destination = destination
+
+    @property
+    def destination_id(self):
+        return self.destination.id if self.destination is not None else None
+
+    def as_representation(self):
+        destination = self.destination
+        return {
+            'id': None if self.id is None else str(self.id),
+            'name': self.name,
+            'destination': self.destination_id,
+            'destination_name': destination.name if destination is not None else None,
+            'destination_slug': destination.slug if destination is not None else None,
+            'image': None,
+            'created_at': None,
+            'updated_at': None,
+        }
@@ -0,0 +1,59 @@
+import threading
+from django.conf import settings
+from django.db import connection
+from .services import ThemeParksService
+
+class CatalogRefresher:
+    """
+    Keeps the local Destination/Park tables in sync with the ThemeParks API
+
+    Runs in its own process (the refresh_catalog management command, kept
+    alive by supervisor), never from the request path, so there is one
+    sync loop per deployment rather than one per web worker.
+    """
+
+    def __init__(self, interval=None):
+        """
+        Args:
+            interval (float, optional): Seconds between two upstream syncs,
+                defaults to PARK_REFRESH_INTERVAL; 0 syncs once and returns
+        """
+        if interval is None:
+            interval = getattr(settings, 'PARK_REFRESH_INTERVAL', 600)
+        self.interval = interval
+        self._stop = threading.Event()
+
+    def log(self, *args):
+        """Print log message"""
+        print(f"[{self.__class__.__name__}]", *args)
+
+    def stop(self):
+        """Ask the loop to exit after the current sync"""
+        self._stop.set()
+
+    def refresh_once(self):
+        """
+        Sync destinations and parks from upstream into the database once
+
+        Returns:
+            bool: Whether synchronization was successful
+        """
+        try:
+            success, message = ThemeParksService.sync_destinations()
+            if not success:
+                self.log(message)
+            return success
+        finally:
+            # This runs outside the request cycle, so release the connection between syncs ourselves
+            connection.close()
+
+    def run(self):
+        """Sync immediately, then every `interval` seconds until stopped"""
+        while not self._stop.is_set():
+            try:
+                self.refresh_once()
+            except Exception as e:
+                self.log(f"Error refreshing catalog: {e}")
+            if not self.interval:
+                return
+            self._stop.wait(self.interval)
@@ -0,0 +1,365 @@
+"""
+Full-text search over destinations, parks and attractions
+
+Text is tokenized in Python before it reaches the index: Latin words are kept
+whole and CJK runs are split into overlapping bigrams plus their final
+character, so "加勒比海盜" is searchable by any substring of two or more
+characters as well as single characters. On SQLite the tokens are stored in
+an FTS5 table (created by migration 0012, filled by the rebuild_search_index
+command) and ranked with bm25, with name matches weighted above description
+matches. Other databases, or SQLite builds without FTS5, fall back to
+`icontains` filters.
+
+The index is kept current by signals (see modelCore.signals). Bulk imports
+wrap their work in `search_batch()`, which skips per-row updates and
+reindexes the rows it touched once at the end.
+"""
+
+import re
+import threading
+from abc import ABC, abstractmethod
+import unicodedata
+from contextlib import contextmanager
+from django.db import connection, transaction
+from django.db.models import Q
+
+TABLE = 'modelCore_catalog_search'
+
+# Kana, CJK ideographs and Hangul
+CJK = '\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af'
+CJK_RE = re.compile(rf'[{CJK}]')
+TOKEN_RE = re.compile(rf'[{CJK}]+|(?:(?![{CJK}])[^\W_])+')
+
+# Name matches rank above description matches
+NAME_WEIGHT = 10.0
+BODY_WEIGHT = 1.0
+
+_batch = threading.local()
+
+def normalize(text):
+    return unicodedata.normalize('NFKC', text or '').lower()
+
+def _cjk_tokens(run):
+    if len(run) == 1:
+        return [run]
+    return [run[i:i + 2] for i in range(len(run) - 1)] + [run[-1]]
+
+def tokenize(text):
+    """
+    Split text into index tokens
+
+    Args:
+        text (str): Text to index
+
+    Returns:
+        list: Tokens, CJK runs as bigrams followed by the run's last character
+    """
+    tokens = []
+    for match in TOKEN_RE.finditer(normalize(text)):
+        run = match.group()
+        if CJK_RE.match(run):
+            tokens.extend(_cjk_tokens(run))
+        else:
+            tokens.append(run)
+    return tokens
+
+def build_match_query(query):
+    """
+    Build an FTS5 MATCH expression for a user query
+
+    Every term must match. CJK terms are matched by their bigrams (a single
+    character matches any token starting with it) and the last Latin word is
+    matched as a prefix, so results update while the user is typing.
+
+    Returns:
+        str: MATCH expression, empty if the query has no searchable terms
+    """
+    terms = []
+    runs = [match.group() for match in TOKEN_RE.finditer(normalize(query))]
+    for i, run in enumerate(runs):
+        is_cjk = bool(CJK_RE.match(run))
+        if is_cjk and len(run) > 1:
+            terms.extend(f'"{token}"' for token in (run[j:j + 2] for j in range(len(run) - 1)))
+        elif is_cjk or i == len(runs) - 1:
+            terms.append(f'"{run}"*')
+        else:
+            terms.append(f'"{run}"')
+    return ' '.join(terms)
+
+class CatalogDocument:
+    """How one catalog model is indexed"""
+
+    def __init__(self, kind, model_path, body_field=None, context_field=None):
+        self.kind = kind
+        self.model_path = model_path
+        self.body_field = body_field
+        self.context_field = context_field
+
+    @property
+    def model(self):
+        from django.apps import apps
+        return apps.get_model(*self.model_path.split('.'))
+
+    def queryset(self):
+        queryset = self.model.objects.all()
+        if self.context_field and '__' in self.context_field:
+            queryset = queryset.select_related(self.context_field.rsplit('__', 1)[0])
+        return queryset
+
+    def context(self, instance):
+        value = instance
+        for part in (self.context_field or '').split('__'):
+            if not part or value is None:
+                break
+            value = getattr(value, part, None)
+        return value or ''
+
+    def body(self, instance):
+        return getattr(instance, self.body_field, '') if self.body_field else ''
+
+DOCUMENTS = {
+    'destination': CatalogDocument('destination', 'modelCore.Destination', context_field='slug'),
+    'park': CatalogDocument('park', 'modelCore.Park', context_field='destination__name'),
+    'attraction': CatalogDocument('attraction', 'modelCore.Attraction', body_field='description', context_field='park__name'),
+}
+
+def document_for(model):
+    """Get the CatalogDocument of a model class, or None if it is not indexed"""
+    for document in DOCUMENTS.values():
+        if document.model is model:
+            return document
+    return None
+
+class SearchBackend(ABC):
+    """Interface of catalog search backends"""
+
+    def index(self, document, instances):
+        pass
+
+    def remove(self, document, pks):
+        pass
+
+    def rebuild(self):
+        return 0
+
+    def matching_ids(self, query, kind):
+        """
+        Get the ids of every indexed document of one kind matching a query, unranked
+
+        Backends without an index match nothing here, `icontains` lookups cover them.
+
+        Returns:
+            list: Object ids as strings
+        """
+        return []
+
+    @abstractmethod
+    def search(self, query, kinds=None, limit=20):
+        """
+        Search the catalog
+
+        Args:
+            query (str): User query
+            kinds (iterable, optional): Document kinds to search, default all
+            limit (int): Maximum number of results
+
+        Returns:
+            list: Dicts with type, id, name, context and score, best first
+        """
+
+class LikeSearchBackend(SearchBackend):
+    """Fallback backend filtering with icontains, no index to maintain"""
+
+    def search(self, query, kinds=None, limit=20):
+        terms = [term for term in normalize(query).split() if term]
+        if not terms:
+            return []
+        results = []
+        for kind in kinds or DOCUMENTS:
+            document = DOCUMENTS[kind]
+            condition = Q()
+            for term in terms:
+                term_condition = Q(name__icontains=term)
+                if document.body_field:
+                    term_condition |= Q(**{f'{document.body_field}__icontains': term})
+                condition &= term_condition
+            for instance in document.queryset().filter(condition)[:limit]:
+                name = normalize(instance.name)
+                score = sum(NAME_WEIGHT if term in name else BODY_WEIGHT for term in terms)
+                results.append({
+                    'type': kind,
+                    'id': str(instance.pk),
+                    'name': instance.name,
+                    'context': str(document.context(instance)),
+                    'score': score,
+                })
+        results.sort(key=lambda result: -result['score'])
+        return results[:limit]
+
+class SQLiteFTSBackend(SearchBackend):
+    """FTS5 backend, the table stores pre-tokenized text"""
+
+    def _rows(self, document, instances):
+        return [
+            (
+                document.kind,
+                str(instance.pk),
+                instance.name,
+                str(document.context(instance)),
+                ' '.join(tokenize(instance.name)),
+                ' '.join(tokenize(document.body(instance))),
+            )
+            for instance in instances
+        ]
+
+    def index(self, document, instances):
+        rows = self._rows(document, instances)
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {TABLE} WHERE kind = %s AND object_id = %s',
+                [(row[0], row[1]) for row in rows]
+            )
+            cursor.executemany(
+                f'INSERT INTO {TABLE} (kind, object_id, name, context, name_tokens, body_tokens) '
+                'VALUES (%s, %s, %s, %s, %s, %s)',
+                rows
+            )
+
+    def remove(self, document, pks):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {TABLE} WHERE kind = %s AND object_id = %s',
+                [(document.kind, str(pk)) for pk in pks]
+            )
+
+    def rebuild(self):
+        count = 0
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(f'DELETE FROM {TABLE}')
+            for document in DOCUMENTS.values():
+                instances = list(document.queryset())
+                self.index(document, instances)
+                count += len(instances)
+        return count
+
+    def matching_ids(self, query, kind):
+        match = build_match_query(query)
+        if not match:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT object_id FROM {TABLE} WHERE {TABLE} MATCH %s AND kind = %s',
+                [match, kind]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def search(self, query, kinds=None, limit=20):
+        match = build_match_query(query)
+        if not match:
+            return []
+        kinds = list(kinds or DOCUMENTS)
+        placeholders = ', '.join(['%s'] * len(kinds))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT kind, object_id, name, context, '
+                f'bm25({TABLE}, 0, 0, 0, 0, {NAME_WEIGHT}, {BODY_WEIGHT}) AS score '
+                f'FROM {TABLE} WHERE {TABLE} MATCH %s AND kind IN ({placeholders}) '
+                'ORDER BY score LIMIT %s',
+                [match, *kinds, limit]
+            )
+            rows = cursor.fetchall()
+        return [
+            {'type': kind, 'id': object_id, 'name': name, 'context': context, 'score': round(-score, 4)}
+            for kind, object_id, name, context, score in rows
+        ]
+
+# Database name -> whether it has the FTS5 table, cleared after migrations
+_fts_tables = {}
+
+def fts_available():
+    """Whether the FTS5 table exists in the current database, looked up once per database"""
+    if connection.vendor != 'sqlite':
+        return False
+    name = str(connection.settings_dict['NAME'])
+    if name not in _fts_tables:
+        _fts_tables[name] = TABLE in connection.introspection.table_names()
+    return _fts_tables[name]
+
+def reset_fts_available(**kwargs):
+    """Forget the looked up FTS5 tables, migrations may have created or dropped them"""
+    _fts_tables.clear()
+
+def get_backend():
+    """Get the search backend for the current database"""
+    return SQLiteFTSBackend() if fts_available() else LikeSearchBackend()
+
+def _dependents(document):
+    """Documents showing a `document` instance's name as their context"""
+    return [
+        other for other in DOCUMENTS.values()
+        if other.context_field and other.context_field.startswith(f'{document.kind}__')
+    ]
+
+def index_instance(instance, deleted=False):
+    """
+    Update the index for one saved or deleted catalog instance
+
+    Inside `search_batch()` the instance is only recorded, the batch
+    reindexes everything it recorded once at the end.
+    """
+    document = document_for(type(instance))
+    if document is None:
+        return
+    if getattr(_batch, 'active', False):
+        _batch.touched.setdefault(document.kind, set()).add(instance.pk)
+        return
+    backend = get_backend()
+    if deleted:
+        backend.remove(document, [instance.pk])
+        return
+    backend.index(document, [instance])
+    for other in _dependents(document):
+        backend.index(other, list(other.queryset().filter(**{document.kind: instance})))
+
+def reindex(touched, chunk_size=500):
+    """
+    Reindex the given rows and the rows showing their names as context
+
+    Args:
+        touched (dict): Document kind to pks, deleted pks are removed from the index
+        chunk_size (int): Pks per query
+    """
+    backend = get_backend()
+    for kind, pks in touched.items():
+        document = DOCUMENTS[kind]
+        pks = list(pks)
+        for i in range(0, len(pks), chunk_size):
+            chunk = pks[i:i + chunk_size]
+            backend.remove(document, chunk)
+            backend.index(document, list(document.queryset().filter(pk__in=chunk)))
+            for other in _dependents(document):
+                backend.index(other, list(other.queryset().filter(**{f'{document.kind}__in': chunk})))
+
+@contextmanager
+def search_batch():
+    """
+    Skip per-row index updates inside the block and reindex the touched rows once at the end
+
+    Nothing is reindexed if the block raises; rebuild_search_index repairs
+    the index after a failed partial sync.
+    """
+    if getattr(_batch, 'active', False):
+        yield
+        return
+    _batch.active = True
+    _batch.touched = {}
+    try:
+        yield
+        touched = _batch.touched
+    finally:
+        _batch.active = False
+        _batch.touched = {}
+    reindex(touched)
@@ -1,9 +1,49 @@
+from django.db import transaction
 from rest_framework import serializers
 from .models import (
     Park, Destination, TicketType, Order, OrderItem, Ticket, CartItem, Cart
 )
+from .records import CatalogRecord
+
+class CatalogRecordMixin:
+    """Serialize cached CatalogRecord instances directly, model instances as usual"""
+    
+    def to_representation(self, instance):
+        if isinstance(instance, CatalogRecord):
+            data = instance.as_representation()
+            return {name: data.get(name) for name in self.fields if not self.fields[name].write_only}
+        return super().to_representation(instance)
+
+class SparseFieldsetMixin:
+    """
+    Limit the top-level serializer to the fields selected by the view
+
+    The view puts `(include, omit)` into the context as 'sparse_fieldset'
+    (see modelCore.mixins.SparseFieldsetViewMixin). Unselected fields are
+    dropped before serialization, so their method fields are never called.
+    Nested serializers keep all their fields.
+
+    `sparse_field_relations` maps method fields to the relations they read,
+    letting the view keep those relations joined when the fields are requested.
+    """
+    sparse_field_relations = {}
+    
+    def get_fields(self):
+        fields = super().get_fields()
+        root = self.parent
+        if isinstance(root, serializers.ListSerializer):
+            root = root.parent
+        fieldset = self.context.get('sparse_fieldset')
+        if root is not None or not fieldset:
+            return fields
+        
+        include, omit = fieldset
+        for name in list(fields):
+            if (include is not None and name not in include) or name in omit:
+                fields.pop(name)
+        return fields
 
-class DestinationSerializer(serializers.ModelSerializer):
+class DestinationSerializer(CatalogRecordMixin, serializers.ModelSerializer):
     """Destination serializer"""
     
     class Meta:
@@ -11,7 +51,7 @@ class DestinationSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'slug', 'image', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
 
-class ParkSerializer(serializers.ModelSerializer):
+class ParkSerializer(CatalogRecordMixin, serializers.ModelSerializer):
     """Park serializer"""
     destination_name = serializers.CharField(source='destination.name', read_only=True)
     destination_slug = serializers.CharField(source='destination.slug', read_only=True)
@@ -22,7 +62,7 @@ class ParkSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at'] 
 
 # Ticket and order related serializers
-class TicketTypeSerializer(serializers.ModelSerializer):
+class TicketTypeSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Ticket type serializer"""
     park_name = serializers.CharField(source='park.name', read_only=True)
     
@@ -31,7 +71,7 @@ class TicketTypeSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'description', 'price', 'park', 'park_name', 'is_active', 'image', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
 
-class TicketTypeListSerializer(serializers.ModelSerializer):
+class TicketTypeListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Ticket type list serializer"""
     park_name = serializers.CharField(source='park.name', read_only=True)
     
@@ -116,38 +156,50 @@ class OrderCreateSerializer(serializers.ModelSerializer):
         items_data = validated_data.pop('items')
         user = self.context['request'].user
         
-        # Create order
-        order = Order.objects.create(
-            user=user,
-            total_amount=0,  # Set to 0 initially, will be calculated later
-            status=Order.PENDING,
-            **validated_data
-        )
+        # Items use the current price of each ticket type, so the total is known up front
+        total = sum(item_data['quantity'] * item_data['ticket_type'].price for item_data in items_data)
         
-        # Create order items
-        for item_data in items_data:
-            ticket_type = item_data['ticket_type']
-            # Use the current price of the ticket type
-            OrderItem.objects.create(
-                order=order,
-                ticket_type=ticket_type,
-                quantity=item_data['quantity'],
-                unit_price=ticket_type.price
+        with transaction.atomic():
+            # Create order
+            order = Order.objects.create(
+                user=user,
+                total_amount=total,
+                status=Order.PENDING,
+                **validated_data
             )
-        
-        # Calculate total amount
-        order.calculate_total()
-        
-        # Generate tickets
-        self.generate_tickets(order)
+            
+            # Create order items in one INSERT, using the current price of each ticket type
+            items = OrderItem.objects.bulk_create([
+                OrderItem(
+                    order=order,
+                    ticket_type=item_data['ticket_type'],
+                    quantity=item_data['quantity'],
+                    unit_price=item_data['ticket_type'].price
+                )
+                for item_data in items_data
+            ])
+            
+            # Generate tickets
+            self.generate_tickets(items)
         
         return order
     
-    def generate_tickets(self, order):
-        """Generate tickets for the order"""
-        for item in order.items.all():
+    def generate_tickets(self, items):
+        """
+        Generate tickets for the order items in one INSERT
+
+        bulk_create skips Ticket.save, so ticket numbers are allocated up
+        front and QR codes are generated here.
+        """
+        numbers = iter(Ticket.generate_ticket_numbers(sum(item.quantity for item in items)))
+        tickets = []
+        for item in items:
             for _ in range(item.quantity):
-                Ticket.objects.create(order_item=item)
+                ticket = Ticket(order_item=item, ticket_number=next(numbers))
+                ticket.generate_qr_code()
+                tickets.append(ticket)
+        Ticket.objects.bulk_create(tickets)
+        return tickets
 
 class OrderDetailSerializer(OrderSerializer):
     """Order detail serializer"""
@@ -2,6 +2,8 @@ import requests
 import uuid
 from .models import Destination, Park, Attraction
 from django.db import transaction
+from .generations import generation_batch
+from .search import search_batch
 
 class ThemeParksService:
     """Theme Parks API Service Class"""
@@ -173,7 +175,7 @@ class ThemeParksService:
             response.raise_for_status()
             destinations_data = response.json().get('destinations', [])
 
-            with transaction.atomic():
+            with generation_batch(), search_batch(), transaction.atomic():
                 # Iterate through all destinations
                 for dest_data in destinations_data:
                     # Create or update destination
@@ -0,0 +1,63 @@
+from django.db.models.signals import pre_save, post_save, post_delete, post_migrate
+from django.dispatch import receiver
+from .models import GuestReview, AttractionRatingSummary, Destination, Park, Attraction, TicketType
+from .generations import bump_generation
+from . import search
+
+CATALOG_MODELS = (Destination, Park, Attraction, TicketType, GuestReview)
+
+def _rating_state(review):
+    return (review.attraction_id, review.rating, review.is_published)
+
+@receiver(pre_save, sender=GuestReview)
+def remember_review_state(sender, instance, **kwargs):
+    """Record the stored state of a review before it is overwritten"""
+    instance._rating_state = None
+    if not instance._state.adding:
+        instance._rating_state = GuestReview.objects.filter(pk=instance.pk).values_list(
+            'attraction_id', 'rating', 'is_published'
+        ).first()
+
+@receiver(post_save, sender=GuestReview)
+def update_rating_summary_on_save(sender, instance, raw=False, **kwargs):
+    """Apply a created, edited, published or unpublished review to its attraction's rating summary"""
+    if raw:
+        return
+    AttractionRatingSummary.apply_review_change(
+        old=getattr(instance, '_rating_state', None),
+        new=_rating_state(instance),
+    )
+    instance._rating_state = _rating_state(instance)
+
+@receiver(post_delete, sender=GuestReview)
+def update_rating_summary_on_delete(sender, instance, **kwargs):
+    """Remove a deleted review from its attraction's rating summary"""
+    AttractionRatingSummary.apply_review_change(old=_rating_state(instance))
+
+def bump_catalog_generation(sender, raw=False, **kwargs):
+    """Invalidate cached catalog data after a row is saved or deleted (API, admin or sync)"""
+    if raw:
+        return
+    bump_generation(sender)
+
+for model in CATALOG_MODELS:
+    post_save.connect(bump_catalog_generation, sender=model, dispatch_uid=f'catalog_generation_save_{model.__name__}')
+    post_delete.connect(bump_catalog_generation, sender=model, dispatch_uid=f'catalog_generation_delete_{model.__name__}')
+
+@receiver(post_save, sender=Destination)
+@receiver(post_save, sender=Park)
+@receiver(post_save, sender=Attraction)
+def update_search_index(sender, instance, raw=False, **kwargs):
+    """Index a saved destination, park or attraction"""
+    if raw:
+        return
+    search.index_instance(instance)
+
+@receiver(post_delete, sender=Destination)
+@receiver(post_delete, sender=Park)
+@receiver(post_delete, sender=Attraction)
+def remove_from_search_index(sender, instance, **kwargs):
+    """Remove a deleted destination, park or attraction from the index"""
+    search.index_instance(instance, deleted=True)
+
+post_migrate.connect(search.reset_fts_available, dispatch_uid='catalog_search_reset_fts_available')
@@ -0,0 +1,175 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from modelCore.models import Destination, Park, Attraction, GuestReview, User
+import uuid
+
+class AttractionApiTestMixin:
+    """建立測試用的目的地、公園、吸引設施和評論"""
+
+    def create_catalog(self, attraction_count=5):
+        self.destination = Destination.objects.create(
+            id=uuid.uuid4(),
+            name='測試目的地',
+            slug='test-destination'
+        )
+        self.park = Park.objects.create(
+            id=uuid.uuid4(),
+            name='測試公園',
+            destination=self.destination
+        )
+        self.attractions = [
+            Attraction.objects.create(
+                id=uuid.uuid4(),
+                name=f'測試吸引設施 {i}',
+                park=self.park,
+                description=f'描述 {i}',
+                latitude=35.0 + i * 0.001,
+                longitude=139.0 + i * 0.001,
+            )
+            for i in range(attraction_count)
+        ]
+        self.users = [
+            User.objects.create_user(email=f'user{i}@example.com', password='password', name=f'user{i}')
+            for i in range(3)
+        ]
+
+    def add_review(self, attraction, user, rating, is_published=True):
+        return GuestReview.objects.create(
+            attraction=attraction,
+            user=user,
+            rating=rating,
+            content='評論內容',
+            is_published=is_published,
+        )
+
+class AttractionReviewStatsTest(AttractionApiTestMixin, TestCase):
+    """測試吸引設施列表的評論統計"""
+
+    def setUp(self):
+        self.create_catalog()
+        first = self.attractions[0]
+        self.add_review(first, self.users[0], 5)
+        self.add_review(first, self.users[1], 4)
+        self.add_review(first, self.users[2], 1, is_published=False)
+
+    def test_list_review_stats(self):
+        """測試列表返回已發布評論的數量和平均評分"""
+        response = self.client.get('/api/attractions/')
+
+        self.assertEqual(response.status_code, 200)
+        results = {item['id']: item for item in response.json()['results']}
+        first = results[str(self.attractions[0].id)]
+        self.assertEqual(first['review_count'], 2)
+        self.assertEqual(first['avg_rating'], 4.5)
+        second = results[str(self.attractions[1].id)]
+        self.assertEqual(second['review_count'], 0)
+        self.assertEqual(second['avg_rating'], 0)
+
+    def test_list_query_count_does_not_grow_with_page(self):
+        """測試列表的查詢數量不隨吸引設施數量增加"""
+        # 條件請求驗證、計數和列表頁各一次
+        with self.assertNumQueries(3):
+            self.client.get('/api/attractions/')
+
+        for i in range(5, 15):
+            Attraction.objects.create(id=uuid.uuid4(), name=f'更多設施 {i}', park=self.park)
+
+        with self.assertNumQueries(3):
+            self.client.get('/api/attractions/')
+
+    def test_retrieve_review_stats(self):
+        """測試詳情返回評論統計"""
+        response = self.client.get(f'/api/attractions/{self.attractions[0].id}/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['review_count'], 2)
+        self.assertEqual(response.json()['avg_rating'], 4.5)
+
+class AttractionCursorPaginationTest(AttractionApiTestMixin, TestCase):
+    """測試吸引設施列表的遊標分頁"""
+
+    def setUp(self):
+        self.create_catalog(attraction_count=25)
+
+    def test_cursor_pages_cover_all_attractions(self):
+        """測試遊標分頁按名稱順序返回全部吸引設施且不執行 COUNT"""
+        # 條件請求驗證和遊標頁各一次
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/attractions/?pagination=cursor')
+        first_page = response.json()
+        self.assertNotIn('count', first_page)
+        self.assertEqual(len(first_page['results']), 20)
+        self.assertIsNotNone(first_page['next'])
+
+        second_page = self.client.get(first_page['next']).json()
+        self.assertEqual(len(second_page['results']), 5)
+        self.assertIsNone(second_page['next'])
+
+        names = [item['name'] for item in first_page['results'] + second_page['results']]
+        self.assertEqual(names, sorted(attraction.name for attraction in self.attractions))
+
+    def test_cursor_pages_through_equal_names(self):
+        """測試同名吸引設施按 (名稱, ID) 翻頁，不使用 OFFSET，上一頁返回相同內容"""
+        for i in range(7):
+            Attraction.objects.create(id=uuid.uuid4(), name='同名設施', park=self.park)
+
+        pages = []
+        url = '/api/attractions/?pagination=cursor&page_size=3'
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                page = self.client.get(url).json()
+            self.assertFalse([q for q in queries if 'OFFSET' in q['sql']])
+            pages.append(page)
+            url = page['next']
+
+        ids = [item['id'] for page in pages for item in page['results']]
+        self.assertEqual(len(ids), 32)
+        self.assertEqual(len(set(ids)), 32)
+        expected = Attraction.objects.order_by('name', 'id').values_list('id', flat=True)
+        self.assertEqual(ids, [str(pk) for pk in expected])
+        self.assertEqual(self.client.get(pages[-1]['previous']).json()['results'], pages[-2]['results'])
+        self.assertIsNone(pages[0]['previous'])
+
+    def test_invalid_cursor(self):
+        """測試無效遊標返回 404"""
+        self.assertEqual(self.client.get('/api/attractions/', {'cursor': 'not-a-cursor'}).status_code, 404)
+
+    def test_page_number_is_default(self):
+        """測試默認仍使用頁碼分頁"""
+        response = self.client.get('/api/attractions/')
+
+        self.assertEqual(response.json()['count'], 25)
+
+class PaginatedActionTest(AttractionApiTestMixin, TestCase):
+    """測試自定義列表操作的分頁"""
+
+    def setUp(self):
+        self.create_catalog(attraction_count=3)
+        self.attraction = self.attractions[0]
+        for i in range(5):
+            user = User.objects.create_user(email=f'reviewer{i}@example.com', password='password', name=f'reviewer{i}')
+            self.add_review(self.attraction, user, 4)
+        # 自定義操作只對管理員開放
+        self.admin = User.objects.create_superuser(email='admin@example.com', password='password')
+        self.client.force_login(self.admin)
+
+    def test_park_attractions_paginated(self):
+        """測試公園吸引設施列表分頁並支持 page_size"""
+        response = self.client.get(f'/api/parks/{self.park.id}/attractions/?page_size=2')
+
+        data = response.json()
+        self.assertEqual(data['count'], 3)
+        self.assertEqual(len(data['results']), 2)
+
+    def test_attraction_reviews_paginated(self):
+        """測試吸引設施評論分頁，查詢數量固定"""
+        # 會話和用戶各一次，吸引設施、評論數量和評論頁各一次
+        with self.assertNumQueries(5):
+            response = self.client.get(f'/api/attractions/{self.attraction.id}/reviews/?page_size=2')
+
+        data = response.json()
+        self.assertEqual(data['review_count'], 5)
+        self.assertEqual(len(data['reviews']), 2)
+        self.assertIsNotNone(data['next'])
+        self.assertEqual(data['reviews'][0]['user']['name'][:8], 'reviewer')
@@ -0,0 +1,75 @@
+from django.test import TestCase
+from modelCore.models import Park, TicketType
+from test_attraction_api import AttractionApiTestMixin
+import uuid
+
+class BatchRetrieveTest(AttractionApiTestMixin, TestCase):
+    """測試按多個 ID 批量獲取"""
+
+    def setUp(self):
+        self.create_catalog(attraction_count=5)
+        self.add_review(self.attractions[2], self.users[0], 4)
+        self.client.force_login(self.users[0])
+        self.ticket_type = TicketType.objects.create(park=self.park, name='一日券', price='100.00')
+
+    def batch(self, url, ids, **params):
+        return self.client.get(url, {'ids': ','.join(str(i) for i in ids), **params})
+
+    def test_attractions_in_requested_order(self):
+        """測試按請求順序返回，與單個獲取的內容相同，並報告不存在的 ID"""
+        unknown = uuid.uuid4()
+        ids = [self.attractions[2].id, unknown, self.attractions[0].id, 'not-a-uuid', self.attractions[2].id]
+        response = self.batch('/api/attractions/batch/', ids)
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['count'], 2)
+        self.assertEqual(data['missing'], [str(unknown), 'not-a-uuid'])
+        self.assertEqual(data['results'][0], self.client.get(f'/api/attractions/{self.attractions[2].id}/').json())
+        self.assertEqual(data['results'][1]['id'], str(self.attractions[0].id))
+
+    def test_query_count_does_not_grow(self):
+        """測試查詢次數不隨 ID 數量增加"""
+        # 會話和用戶各一次查詢，吸引設施一次
+        with self.assertNumQueries(3):
+            self.batch('/api/attractions/batch/', [self.attractions[0].id])
+        with self.assertNumQueries(3):
+            self.batch('/api/attractions/batch/', [a.id for a in self.attractions])
+
+        parks = [Park.objects.create(id=uuid.uuid4(), name=f'公園 {i}', destination=self.destination) for i in range(4)]
+        ticket_types = [self.ticket_type] + [
+            TicketType.objects.create(park=park, name=f'票種 {i}', price='100.00') for i, park in enumerate(parks)
+        ]
+        # 會話和用戶各一次查詢，票種和公園一次
+        with self.assertNumQueries(3):
+            self.batch('/api/ticket-types/batch/', [self.ticket_type.id])
+        with self.assertNumQueries(3):
+            response = self.batch('/api/ticket-types/batch/', [t.id for t in ticket_types])
+        self.assertEqual([t['park_name'] for t in response.json()['results']], ['測試公園'] + [p.name for p in parks])
+
+    def test_parks_and_ticket_types(self):
+        """測試公園和票種的批量獲取"""
+        parks = self.batch('/api/parks/batch/', [self.park.id], fields='id,name').json()
+        ticket_types = self.batch('/api/ticket-types/batch/', [self.ticket_type.id]).json()
+
+        self.assertEqual(parks['results'], [{'id': str(self.park.id), 'name': '測試公園'}])
+        self.assertEqual(ticket_types['results'][0]['park_name'], '測試公園')
+        self.assertEqual(ticket_types['missing'], [])
+
+    def test_anonymous_cache_keeps_requested_order(self):
+        """測試匿名響應緩存區分 ID 的順序"""
+        self.client.logout()
+        first, second = self.attractions[0].id, self.attractions[1].id
+
+        self.client.get(f'/api/attractions/batch/?ids={second}&ids={first}')
+        response = self.client.get(f'/api/attractions/batch/?ids={first}&ids={second}')
+
+        self.assertEqual([a['id'] for a in response.json()['results']], [str(first), str(second)])
+
+    def test_anonymous_and_limits(self):
+        """測試匿名可用，缺少 ID 或 ID 過多時返回 400"""
+        self.client.logout()
+
+        self.assertEqual(self.batch('/api/attractions/batch/', [self.attractions[0].id]).status_code, 200)
+        self.assertEqual(self.client.get('/api/attractions/batch/').status_code, 400)
+        self.assertEqual(self.batch('/api/parks/batch/', [uuid.uuid4() for _ in range(101)]).status_code, 400)
@@ -0,0 +1,65 @@
+from django.test import TestCase
+from modelCore.models import Park, TicketType
+from test_attraction_api import AttractionApiTestMixin
+import uuid
+
+class ConditionalGetTest(AttractionApiTestMixin, TestCase):
+    """測試目錄端點的 ETag / Last-Modified 條件請求"""
+
+    def setUp(self):
+        self.create_catalog(attraction_count=3)
+
+    def test_list_not_modified(self):
+        """測試 If-None-Match 命中時返回 304"""
+        response = self.client.get('/api/attractions/')
+        etag = response['ETag']
+        self.assertIn('Last-Modified', response)
+
+        # 響應緩存命中時直接用保存的 ETag 驗證，不查詢數據庫
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/attractions/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_etag_changes_after_update(self):
+        """測試數據或相關評論變化後 ETag 改變"""
+        etag = self.client.get('/api/attractions/')['ETag']
+
+        self.add_review(self.attractions[0], self.users[0], 5)
+        response = self.client.get('/api/attractions/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+        etag = response['ETag']
+        self.attractions[1].delete()
+        response = self.client.get('/api/attractions/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_changes_after_related_delete(self):
+        """測試刪除較舊的公園後目的地列表的 ETag 改變"""
+        Park.objects.create(id=uuid.uuid4(), name='較新的公園', destination=self.destination)
+        response = self.client.get('/api/destinations/')
+        etag = response['ETag']
+
+        self.park.delete()
+        response = self.client.get('/api/destinations/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_retrieve_if_modified_since(self):
+        """測試詳情的 If-Modified-Since 條件請求"""
+        url = f'/api/parks/{self.park.id}/'
+        last_modified = self.client.get(url)['Last-Modified']
+
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_ticket_types_etag_follows_filters(self):
+        """測試票種列表的 ETag 隨過濾條件變化"""
+        TicketType.objects.create(park=self.park, name='成人票', price=100)
+        all_types = self.client.get('/api/ticket-types/')
+        filtered = self.client.get('/api/ticket-types/', {'park': self.park.id})
+        other = self.client.get('/api/ticket-types/', {'destination': 'c7b8d2f2-0000-0000-0000-000000000000'})
+
+        self.assertEqual(all_types['ETag'], filtered['ETag'])
+        self.assertNotEqual(all_types['ETag'], other['ETag'])
@@ -0,0 +1,84 @@
+from django.test import SimpleTestCase
+from modelCore.database import Cache, ParkDatabase
+import asyncio
+import tempfile
+
+class CountingParkDatabase(ParkDatabase):
+    """記錄 _getEntities 調用次數的測試用數據庫"""
+
+    def __init__(self, options=None):
+        super().__init__(options)
+        self.load_count = 0
+
+    async def _getEntities(self):
+        self.load_count += 1
+        await asyncio.sleep(0.01)
+        return [{'id': self.load_count}]
+
+class DatabaseInitTest(SimpleTestCase):
+    """測試 Database 的並發初始化和刷新"""
+
+    def test_concurrent_find_entity_loads_once(self):
+        """測試冷啟動時並發的 findEntity 只觸發一次加載"""
+        db = CountingParkDatabase()
+
+        async def run():
+            return await asyncio.gather(*[db.findEntity() for _ in range(10)])
+
+        results = asyncio.run(run())
+
+        self.assertEqual(db.load_count, 1)
+        self.assertTrue(db.initialized)
+        self.assertEqual(results, [{'id': 1}] * 10)
+
+    def test_refresh_swaps_entities(self):
+        """測試刷新會替換整個實體列表，並發刷新只加載一次"""
+        db = CountingParkDatabase()
+
+        async def run():
+            await db.init()
+            before = db.entities
+            await asyncio.gather(db.refresh(), db.refresh())
+            return before
+
+        before = asyncio.run(run())
+
+        self.assertEqual(db.load_count, 2)
+        self.assertEqual(before, [{'id': 1}])
+        self.assertEqual(db.entities, [{'id': 2}])
+
+class CacheSnapshotTest(SimpleTestCase):
+    """測試緩存快照的寫入和加載"""
+
+    def test_snapshot_round_trip(self):
+        """測試填充緩存後寫入快照，新的緩存實例可以直接命中"""
+        with tempfile.TemporaryDirectory() as snapshot_dir:
+            cache = Cache('TestCache', 1, snapshot_dir=snapshot_dir)
+            cache.wrap('entities', lambda: ['park'])
+
+            warm_cache = Cache('TestCache', 1, snapshot_dir=snapshot_dir)
+            self.assertEqual(warm_cache.load_snapshot(), 1)
+            self.assertEqual(warm_cache.wrap('entities', lambda: self.fail('callback should not run')), ['park'])
+
+            other_version = Cache('TestCache', 2, snapshot_dir=snapshot_dir)
+            self.assertEqual(other_version.load_snapshot(), 0)
+
+class CacheStatsTest(SimpleTestCase):
+    """測試緩存統計"""
+
+    def test_wrap_records_hits_misses_and_expirations(self):
+        """測試 wrap 按鍵前綴記錄命中、未命中、過期和淘汰"""
+        cache = Cache('StatsCache', 1)
+        cache.wrap('parks:all', lambda: [1])
+        cache.wrap('parks:all', lambda: [1])
+        cache.wrap('parks:all', lambda: [2], ttl=-1)
+        cache.clear('parks:all')
+
+        stats = cache.stats.as_dict()
+        parks = stats['prefixes']['parks']
+        self.assertEqual(parks['hits'], 1)
+        self.assertEqual(parks['misses'], 1)
+        self.assertEqual(parks['expirations'], 1)
+        self.assertEqual(parks['evictions'], 1)
+        self.assertEqual(parks['fills'], 2)
+        self.assertEqual(stats['totals']['hits'], 1)
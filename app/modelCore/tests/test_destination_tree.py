@@ -0,0 +1,47 @@
+from django.test import TestCase
+from modelCore.models import Destination, Park, User
+import uuid
+
+class DestinationTreeTest(TestCase):
+    """測試目的地→公園樹的預取和緩存"""
+
+    def setUp(self):
+        self.add_destinations(2)
+        self.user = User.objects.create_user(email='viewer@example.com', password='password', name='viewer')
+        self.client.force_login(self.user)
+
+    def add_destinations(self, count):
+        for i in range(count):
+            destination = Destination.objects.create(id=uuid.uuid4(), name=f'目的地 {i}', slug=uuid.uuid4().hex)
+            for name in ('乙公園', '甲公園'):
+                Park.objects.create(id=uuid.uuid4(), name=f'{name} {i}', destination=destination)
+
+    def test_api_list_queries_constant(self):
+        """測試目的地列表的查詢數量不隨目的地數量增加"""
+        # 會話、用戶、條件請求驗證、計數、目的地頁和公園預取各一次
+        with self.assertNumQueries(6):
+            response = self.client.get('/api/destinations/')
+        parks = response.json()['results'][0]['parks']
+        self.assertEqual([park['name'] for park in parks], sorted(park['name'] for park in parks))
+
+        self.add_destinations(5)
+        with self.assertNumQueries(6):
+            self.client.get('/api/destinations/')
+
+    def test_api_list_without_parks_skips_prefetch(self):
+        """測試不請求 parks 時不執行公園預取"""
+        with self.assertNumQueries(5):
+            response = self.client.get('/api/destinations/', {'fields': 'id,name'})
+        self.assertEqual(set(response.json()['results'][0]), {'id', 'name'})
+
+    def test_index_tree_cached_until_parks_change(self):
+        """測試首頁的目的地樹被緩存，公園變化後重新生成"""
+        self.client.get('/')
+
+        # 只剩會話和用戶查詢
+        with self.assertNumQueries(2):
+            response = self.client.get('/')
+        self.assertContains(response, '甲公園 0')
+
+        Park.objects.create(id=uuid.uuid4(), name='新公園', destination=Destination.objects.first())
+        self.assertContains(self.client.get('/'), '新公園')
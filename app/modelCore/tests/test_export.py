@@ -0,0 +1,56 @@
+from django.test import TestCase
+from django.utils import timezone
+from modelCore.models import Attraction
+from test_attraction_api import AttractionApiTestMixin
+import csv
+import datetime
+import io
+import json
+
+class CatalogExportTest(AttractionApiTestMixin, TestCase):
+    """測試目錄串流導出"""
+
+    def setUp(self):
+        self.create_catalog(attraction_count=3)
+        self.add_review(self.attractions[0], self.users[0], 4)
+        self.client.force_login(self.users[0])
+
+    def export(self, **params):
+        response = self.client.get('/api/export/', params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_ndjson_matches_api(self):
+        """測試 NDJSON 每行一個記錄，內容與 API 相同"""
+        records = [json.loads(line) for line in self.export().splitlines()]
+
+        self.assertEqual([r['type'] for r in records], ['destination', 'park'] + ['attraction'] * 3)
+        attraction = next(r for r in records if r.get('id') == str(self.attractions[0].id))
+        expected = self.client.get(f'/api/attractions/{self.attractions[0].id}/').json()
+        self.assertEqual({k: v for k, v in attraction.items() if k != 'type'}, expected)
+
+    def test_csv(self):
+        """測試 CSV 導出單一類型並包含表頭"""
+        rows = list(csv.reader(io.StringIO(self.export(output='csv', type='park'))))
+
+        self.assertEqual(rows[0][:3], ['id', 'name', 'destination'])
+        self.assertEqual(rows[1][1], '測試公園')
+        self.assertEqual(self.client.get('/api/export/', {'output': 'csv'}).status_code, 400)
+
+    def test_updated_since(self):
+        """測試只導出指定時間後變更的記錄，包括新評論"""
+        since = timezone.now() + datetime.timedelta(seconds=1)
+        Attraction.objects.filter(pk=self.attractions[1].pk).update(updated_at=since)
+
+        records = [json.loads(line) for line in self.export(type='attraction', updated_since=since.isoformat()).splitlines()]
+        self.assertEqual([r['id'] for r in records], [str(self.attractions[1].id)])
+
+        self.assertEqual(self.export(type='destination,park', updated_since='2999-01-01'), '')
+        self.assertEqual(self.client.get('/api/export/', {'updated_since': 'yesterday'}).status_code, 400)
+
+    def test_requires_login(self):
+        """測試未登入不能導出"""
+        self.client.logout()
+
+        self.assertEqual(self.client.get('/api/export/').status_code, 401)
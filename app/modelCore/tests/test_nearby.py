@@ -0,0 +1,85 @@
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from modelCore import geo
+from modelCore.models import Attraction, AttractionNeighbor
+from test_attraction_api import AttractionApiTestMixin
+from io import StringIO
+import random
+import uuid
+
+class GeohashTest(SimpleTestCase):
+    """測試 geohash 網格覆蓋"""
+
+    def test_encode(self):
+        """測試已知坐標的 geohash"""
+        self.assertEqual(geo.encode(57.64911, 10.40744, 11), 'u4pruydqqvj')
+
+    def test_covering_cells_contain_points_within_radius(self):
+        """測試覆蓋網格包含半徑內的所有點"""
+        rng = random.Random(1)
+        for _ in range(200):
+            lat, lng = rng.uniform(-60, 60), rng.uniform(-179, 179)
+            radius = rng.choice([50, 500, 5000, 40000])
+            cells = geo.covering_cells(lat, lng, radius)
+            # 在半徑內隨機取點
+            dlat = rng.uniform(-1, 1) * radius / geo.METERS_PER_DEGREE * 0.7
+            point = (lat + dlat, lng)
+            if geo.haversine(lat, lng, [point[0]], [point[1]])[0] > radius:
+                continue
+            point_hash = geo.encode(*point)
+            self.assertTrue(any(point_hash.startswith(cell) for cell in cells))
+
+class NearbyAttractionTest(AttractionApiTestMixin, TestCase):
+    """測試附近吸引設施查詢和最近鄰"""
+
+    def setUp(self):
+        # 吸引設施間隔約 111 米，沿緯度排列
+        self.create_catalog(attraction_count=5)
+        Attraction.objects.create(id=uuid.uuid4(), name='沒有坐標', park=self.park)
+        Attraction.objects.create(id=uuid.uuid4(), name='遠方設施', park=self.park, latitude=36.0, longitude=139.0)
+
+    def test_geohash_saved(self):
+        """測試保存時計算 geohash"""
+        attraction = self.attractions[0]
+        self.assertEqual(attraction.geohash, geo.encode(attraction.latitude, attraction.longitude))
+
+        attraction.latitude = 10.0
+        attraction.save(update_fields=['latitude'])
+        attraction.refresh_from_db()
+        self.assertEqual(attraction.geohash, geo.encode(10.0, attraction.longitude))
+
+    def test_nearby_sorted_by_distance(self):
+        """測試附近查詢按距離排序並遵守半徑和數量限制"""
+        response = self.client.get('/api/attractions/nearby/', {'lat': 35.0019, 'lng': 139.0019, 'radius': 200})
+
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([item['name'] for item in results], ['測試吸引設施 2', '測試吸引設施 1', '測試吸引設施 3'])
+        self.assertEqual(results, sorted(results, key=lambda item: item['distance']))
+
+        limited = self.client.get('/api/attractions/nearby/', {'lat': 35.0, 'lng': 139.0, 'radius': 5000, 'limit': 2})
+        self.assertEqual(limited.json()['count'], 2)
+
+    def test_nearby_requires_coordinates(self):
+        """測試缺少坐標時返回 400"""
+        response = self.client.get('/api/attractions/nearby/', {'lat': 'abc'})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_neighbors(self):
+        """測試最近鄰命令和接口"""
+        out = StringIO()
+        call_command('build_attraction_neighbors', '--k', '2', stdout=out)
+        self.assertIn('Stored 10 attraction neighbours', out.getvalue())
+
+        response = self.client.get(f'/api/attractions/{self.attractions[0].id}/neighbors/')
+        names = [item['name'] for item in response.json()['results']]
+        self.assertEqual(names, ['測試吸引設施 1', '測試吸引設施 2'])
+
+    def test_neighbors_fallback(self):
+        """測試未預先計算時即時查找最近鄰"""
+        self.assertFalse(AttractionNeighbor.objects.exists())
+
+        response = self.client.get(f'/api/attractions/{self.attractions[4].id}/neighbors/')
+
+        self.assertEqual(response.json()['results'][0]['name'], '測試吸引設施 3')
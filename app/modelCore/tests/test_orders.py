@@ -0,0 +1,216 @@
+from django.db import connection
+from unittest.mock import patch
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from modelCore.models import Cart, CartItem, NumberSequence, Order, OrderItem, Ticket, TicketType
+from modelCore.numbering import ALPHANUMERIC, ORDER_NUMBERS, NumberAllocator
+from test_attraction_api import AttractionApiTestMixin
+import datetime
+
+class OrderApiTestMixin(AttractionApiTestMixin):
+    """建立票種和下單的輔助方法"""
+
+    def create_ticket_types(self, count=2):
+        self.ticket_types = [
+            TicketType.objects.create(park=self.park, name=f'票種 {i}', price=f'{100 * (i + 1)}.00')
+            for i in range(count)
+        ]
+
+    def create_order(self, quantities):
+        return self.client.post('/api/orders/', {
+            'visit_date': (datetime.date.today() + datetime.timedelta(days=1)).isoformat(),
+            'items': [
+                {'ticket_type': ticket_type.id, 'quantity': quantity}
+                for ticket_type, quantity in zip(self.ticket_types, quantities)
+            ],
+        }, format='json', content_type='application/json')
+
+class OrderCreateTest(OrderApiTestMixin, TestCase):
+    """測試建立訂單"""
+
+    def setUp(self):
+        self.create_catalog(attraction_count=1)
+        self.create_ticket_types(count=3)
+        self.client.force_login(self.users[0])
+
+    def test_creates_items_and_tickets(self):
+        """測試建立訂單項目、票券和總金額"""
+        response = self.create_order([3, 4])
+
+        self.assertEqual(response.status_code, 201)
+        order = Order.objects.get(user=self.users[0])
+        self.assertEqual(order.items.count(), 2)
+        self.assertEqual(str(order.total_amount), '1100.00')
+        tickets = Ticket.objects.filter(order_item__order=order)
+        self.assertEqual(tickets.count(), 7)
+        numbers = [ticket.ticket_number for ticket in tickets]
+        self.assertEqual(len(set(numbers)), 7)
+        self.assertTrue(all(number.startswith('TIX') and len(number) == 19 for number in numbers))
+
+    def test_query_count_does_not_grow_with_order_size(self):
+        """測試查詢次數不隨訂單項目和票券數量增加"""
+        # 第一張訂單會創建編號序列
+        self.create_order([1])
+        with CaptureQueriesContext(connection) as small:
+            self.create_order([1])
+        with CaptureQueriesContext(connection) as large:
+            self.create_order([10, 10, 10])
+
+        self.assertEqual(Ticket.objects.count(), 32)
+        # 每個票種的驗證查詢除外
+        self.assertEqual(len(large), len(small) + 2)
+
+    def test_total_written_once(self):
+        """測試訂單總金額在建立時寫入，不再另外更新訂單"""
+        with CaptureQueriesContext(connection) as queries:
+            self.create_order([2, 1])
+
+        order = Order.objects.get(user=self.users[0])
+        self.assertEqual(str(order.total_amount), '400.00')
+        self.assertFalse([q for q in queries if q['sql'].startswith('UPDATE "modelCore_order"')])
+
+    def test_calculate_total(self):
+        """測試重新計算總金額用聚合查詢並只更新金額"""
+        self.create_order([2, 1])
+        order = Order.objects.get(user=self.users[0])
+        OrderItem.objects.filter(order=order, ticket_type=self.ticket_types[0]).update(quantity=5)
+
+        with self.assertNumQueries(2):
+            total = order.calculate_total()
+
+        self.assertEqual(str(total), '700.00')
+        order.refresh_from_db()
+        self.assertEqual(str(order.total_amount), '700.00')
+
+    def test_generate_ticket_numbers_skips_existing(self):
+        """測試批量生成的票券編號不與已有編號重複"""
+        self.create_order([2])
+        existing = set(Ticket.objects.values_list('ticket_number', flat=True))
+
+        numbers = Ticket.generate_ticket_numbers(50)
+
+        self.assertEqual(len(set(numbers)), 50)
+        self.assertFalse(existing & set(numbers))
+
+class OrderQueryCountTest(OrderApiTestMixin, TestCase):
+    """測試訂單列表和詳情的查詢次數不隨訂單大小增加"""
+
+    def setUp(self):
+        self.create_catalog(attraction_count=1)
+        self.create_ticket_types(count=3)
+        self.client.force_login(self.users[0])
+        self.create_order([1])
+        self.small = Order.objects.get(user=self.users[0])
+
+    def test_list(self):
+        """測試訂單列表的查詢次數固定"""
+        # 會話、用戶、分頁計數、訂單、訂單項目各一次
+        with self.assertNumQueries(5):
+            self.client.get('/api/orders/')
+
+        for _ in range(3):
+            self.create_order([10, 10, 10])
+        with self.assertNumQueries(5):
+            response = self.client.get('/api/orders/')
+
+        results = response.json()['results']
+        self.assertEqual(len(results), 4)
+        self.assertEqual(results[0]['items'][0]['ticket_type_name'], '票種 0')
+
+    def test_retrieve(self):
+        """測試訂單詳情的查詢次數固定，票券包含票種、公園和遊玩日期"""
+        self.create_order([10, 10, 10])
+        large = Order.objects.exclude(pk=self.small.pk).get()
+
+        # 會話、用戶、訂單、訂單項目、票券各一次
+        with self.assertNumQueries(5):
+            self.client.get(f'/api/orders/{self.small.pk}/')
+        with self.assertNumQueries(5):
+            response = self.client.get(f'/api/orders/{large.pk}/')
+
+        tickets = response.json()['tickets']
+        self.assertEqual(len(tickets), 30)
+        self.assertEqual(tickets[0]['park_name'], '測試公園')
+        self.assertEqual(tickets[0]['visit_date'], large.visit_date.isoformat())
+
+class CartTotalTest(OrderApiTestMixin, TestCase):
+    """測試購物車總金額"""
+
+    def setUp(self):
+        self.create_catalog(attraction_count=1)
+        self.create_ticket_types(count=3)
+        self.client.force_login(self.users[0])
+        self.cart = Cart.objects.create(user=self.users[0])
+        for quantity, ticket_type in enumerate(self.ticket_types, start=1):
+            CartItem.objects.create(cart=self.cart, ticket_type=ticket_type, quantity=quantity)
+
+    def test_total_by_aggregate(self):
+        """測試未預取項目時用一次聚合查詢計算"""
+        cart = Cart.objects.get(pk=self.cart.pk)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(str(cart.get_total_price()), '1400.00')
+        self.assertEqual(Cart.objects.create(user=self.users[1]).get_total_price(), 0)
+
+    def test_cart_view_query_count(self):
+        """測試購物車接口的查詢次數不隨項目數量增加"""
+        response = self.client.get(f'/api/cart/{self.cart.pk}/')
+        self.assertEqual(response.json()['total_price'], 1400.0)
+
+        CartItem.objects.create(
+            cart=self.cart,
+            ticket_type=TicketType.objects.create(park=self.park, name='年票', price='1000.00')
+        )
+        # 會話、用戶、購物車、購物車項目各一次
+        with self.assertNumQueries(4):
+            response = self.client.get(f'/api/cart/{self.cart.pk}/')
+        self.assertEqual(response.json()['total_price'], 2400.0)
+
+    def test_add_item_returns_fresh_cart(self):
+        """測試修改購物車後返回最新的項目和總金額"""
+        response = self.client.post(
+            f'/api/cart/{self.cart.pk}/add_item/',
+            {'ticket_type': str(self.ticket_types[0].id), 'quantity': 2},
+            content_type='application/json'
+        )
+
+        self.assertEqual(response.json()['total_price'], 1600.0)
+
+class NumberAllocatorTest(TestCase):
+    """測試訂單和票券編號分配"""
+
+    def setUp(self):
+        self.allocator = NumberAllocator('test_number', 'TST', ALPHANUMERIC, 2147483647)
+
+    def test_format_and_unique(self):
+        """測試編號格式不變且不重複"""
+        numbers = self.allocator.take(250) + [self.allocator.next() for _ in range(50)]
+
+        self.assertEqual(len(set(numbers)), 300)
+        today = datetime.date.today().strftime('%Y%m%d')
+        self.assertTrue(all(n.startswith(f'TST{today}') and len(n) == 19 for n in numbers))
+        self.assertEqual(len(ORDER_NUMBERS.next()), 19)
+
+    @override_settings(NUMBER_SEQUENCE_BLOCK_SIZE=10)
+    def test_committed_block_served_from_memory(self):
+        """測試提交後的區間在內存中分配，不再查詢數據庫"""
+        with self.captureOnCommitCallbacks(execute=True):
+            first = self.allocator.take_values(3)
+
+        with self.assertNumQueries(0):
+            rest = self.allocator.take_values(7)
+        self.assertEqual(first + rest, list(range(10)))
+        self.assertEqual(NumberSequence.objects.get(name='test_number').next_value, 10)
+
+        # 另一個進程預留的區間不重疊
+        self.assertEqual(NumberSequence.reserve('test_number', 5), 10)
+        self.assertEqual(self.allocator.take_values(1), [15])
+
+    @override_settings(NUMBER_SEQUENCE_BLOCK_SIZE=10)
+    def test_fork_drops_inherited_block(self):
+        """測試子進程不使用從父進程繼承的區間"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.allocator.take_values(1)
+
+        with patch('modelCore.numbering.os.getpid', return_value=-1):
+            self.assertEqual(self.allocator.take_values(1), [10])
@@ -0,0 +1,61 @@
+from django.core.cache import caches
+from django.test import TestCase
+from modelCore.models import Attraction, TicketType
+from test_attraction_api import AttractionApiTestMixin
+import uuid
+
+class ParkBundleTest(AttractionApiTestMixin, TestCase):
+    """測試公園頁面的合併接口"""
+
+    def setUp(self):
+        caches['catalog'].clear()
+        self.create_catalog(attraction_count=3)
+        self.add_review(self.attractions[0], self.users[0], 5)
+        self.add_review(self.attractions[0], self.users[1], 4)
+        self.ticket_types = [
+            TicketType.objects.create(park=self.park, name='一日券', price='100.00'),
+            TicketType.objects.create(park=self.park, name='兩日券', price='180.00'),
+        ]
+        TicketType.objects.create(park=self.park, name='停售票', price='50.00', is_active=False)
+        self.url = f'/api/parks/{self.park.id}/bundle/'
+
+    def test_bundle_contents(self):
+        """測試返回公園、目的地、帶評論統計的吸引設施和可購買的票種"""
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['id'], str(self.park.id))
+        self.assertEqual(data['destination']['name'], self.destination.name)
+        self.assertEqual(len(data['attractions']), 3)
+        first = next(a for a in data['attractions'] if a['id'] == str(self.attractions[0].id))
+        self.assertEqual(first, self.client.get(f'/api/attractions/{self.attractions[0].id}/').json())
+        self.assertEqual(first['review_count'], 2)
+        self.assertEqual([t['name'] for t in data['ticket_types']], ['一日券', '兩日券'])
+
+    def test_query_count_fixed(self):
+        """測試查詢次數不隨吸引設施數量增加"""
+        with self.assertNumQueries(3):
+            self.client.get(self.url)
+
+        for i in range(5):
+            Attraction.objects.create(id=uuid.uuid4(), name=f'新設施 {i}', park=self.park)
+        caches['catalog'].clear()
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.json()['attractions']), 8)
+
+    def test_cached_until_related_change(self):
+        """測試匿名請求整體緩存，票種變更後失效"""
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+        self.ticket_types[1].is_active = False
+        self.ticket_types[1].save()
+        response = self.client.get(self.url)
+        self.assertEqual([t['name'] for t in response.json()['ticket_types']], ['一日券'])
+
+    def test_not_found(self):
+        """測試不存在的公園返回 404"""
+        self.assertEqual(self.client.get(f'/api/parks/{uuid.uuid4()}/bundle/').status_code, 404)
@@ -0,0 +1,76 @@
+from unittest.mock import patch
+from django.test import TestCase
+from modelCore.database import SyncParkDatabase
+from modelCore.records import DestinationRecord, ParkRecord
+from test_attraction_api import AttractionApiTestMixin
+import uuid
+
+class ParkGroupingTest(AttractionApiTestMixin, TestCase):
+    """測試按目的地分組的公園列表"""
+
+    def setUp(self):
+        self.create_catalog(attraction_count=1)
+        self.client.force_login(self.users[0])
+        self.destinations = [
+            DestinationRecord(id=str(uuid.uuid4()), name=f'目的地 {i}', slug=f'destination-{i}')
+            for i in range(2)
+        ]
+        self.records = [
+            ParkRecord(id=str(uuid.uuid4()), name=f'公園 {i}', destination=self.destinations[i % 2])
+            for i in range(5)
+        ] + [ParkRecord(id=str(uuid.uuid4()), name='無目的地公園')]
+        self.park_db = SyncParkDatabase({})
+        self.park_db.get_all_parks = self.count_calls(lambda: list(self.records))
+
+    def count_calls(self, callback):
+        self.load_count = 0
+
+        def wrapper():
+            self.load_count += 1
+            return callback()
+        return wrapper
+
+    def test_match_filter_nested_key(self):
+        """測試過濾條件支持 'destination.id' 嵌套屬性"""
+        parks = self.park_db.getEntities({'destination.id': self.destinations[1].id})
+
+        self.assertEqual(parks, self.records[1:5:2])
+
+    def test_grouped_index_cached(self):
+        """測試分組索引一次建立，實體緩存刷新前重複使用"""
+        groups = self.park_db.getEntitiesGrouped('destination.id')
+
+        self.assertEqual(list(groups), [d.id for d in self.destinations])
+        self.assertEqual(groups[self.destinations[0].id], self.records[0:5:2])
+        self.assertIs(self.park_db.getEntitiesGrouped('destination.id'), groups)
+
+        self.park_db.cache.clear('entities')
+        self.assertIsNot(self.park_db.getEntitiesGrouped('destination.id'), groups)
+        self.assertEqual(self.load_count, 2)
+
+    def test_by_destination_upstream(self):
+        """測試上游數據按目的地分組，只加載一次公園列表"""
+        with patch('modelCore.views.serve_from_database', return_value=False), \
+                patch('modelCore.views.park_db', self.park_db):
+            grouped = self.client.get('/api/modelCore/parks/by_destination/').json()
+            single = self.client.get(
+                '/api/modelCore/parks/by_destination/', {'destination_id': self.destinations[1].id}
+            ).json()
+
+        self.assertEqual(self.load_count, 1)
+        self.assertEqual(list(grouped), [d.id for d in self.destinations])
+        self.assertEqual([p['name'] for p in grouped[self.destinations[0].id]], ['公園 0', '公園 2', '公園 4'])
+        self.assertEqual(grouped[self.destinations[1].id], single)
+
+    def test_by_destination_database(self):
+        """測試數據庫模式一次查詢完成分組"""
+        # 會話和用戶各一次查詢，公園一次
+        with patch('modelCore.views.serve_from_database', return_value=True), \
+                self.assertNumQueries(3):
+            response = self.client.get('/api/modelCore/parks/by_destination/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [p['id'] for p in response.json()[str(self.destination.id)]],
+            [str(self.park.id)]
+        )
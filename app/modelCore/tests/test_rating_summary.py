@@ -0,0 +1,81 @@
+from django.core.management import call_command
+from django.test import TestCase
+from io import StringIO
+from modelCore.models import AttractionRatingSummary
+from test_attraction_api import AttractionApiTestMixin
+
+class AttractionRatingSummaryTest(AttractionApiTestMixin, TestCase):
+    """測試遊樂設施評分統計的增量維護"""
+
+    def setUp(self):
+        self.create_catalog(attraction_count=2)
+        self.attraction = self.attractions[0]
+
+    def summary(self):
+        return AttractionRatingSummary.objects.get(attraction=self.attraction)
+
+    def test_create_update_and_delete(self):
+        """測試新增、修改評分和刪除評論時統計同步更新"""
+        first = self.add_review(self.attraction, self.users[0], 5)
+        second = self.add_review(self.attraction, self.users[1], 2)
+        self.assertEqual(self.summary().review_count, 2)
+        self.assertEqual(self.summary().rating_sum, 7)
+        self.assertEqual(self.summary().avg_rating, 3.5)
+        self.assertEqual(self.summary().histogram, {'1': 0, '2': 1, '3': 0, '4': 0, '5': 1})
+
+        second.rating = 4
+        second.save()
+        self.assertEqual(self.summary().rating_sum, 9)
+        self.assertEqual(self.summary().rating_2, 0)
+        self.assertEqual(self.summary().rating_4, 1)
+
+        first.delete()
+        self.assertEqual(self.summary().review_count, 1)
+        self.assertEqual(self.summary().avg_rating, 4)
+
+    def test_publish_and_unpublish(self):
+        """測試發布狀態變更時統計同步更新"""
+        review = self.add_review(self.attraction, self.users[0], 3, is_published=False)
+        self.assertFalse(AttractionRatingSummary.objects.filter(attraction=self.attraction).exists())
+
+        review.is_published = True
+        review.save()
+        self.assertEqual(self.summary().review_count, 1)
+
+        review.is_published = False
+        review.save()
+        self.assertEqual(self.summary().review_count, 0)
+        self.assertEqual(self.summary().avg_rating, 0)
+
+    def test_move_review_to_another_attraction(self):
+        """測試評論改到其他遊樂設施時兩邊的統計都更新"""
+        review = self.add_review(self.attraction, self.users[0], 5)
+        review.attraction = self.attractions[1]
+        review.save()
+
+        self.assertEqual(self.summary().review_count, 0)
+        other = AttractionRatingSummary.objects.get(attraction=self.attractions[1])
+        self.assertEqual(other.review_count, 1)
+
+    def test_delete_attraction_with_reviews(self):
+        """測試刪除有評論的遊樂設施時級聯刪除正常"""
+        self.add_review(self.attraction, self.users[0], 5)
+        self.attraction.delete()
+
+        self.assertFalse(AttractionRatingSummary.objects.exists())
+
+    def test_rebuild_command(self):
+        """測試重建命令得到與增量維護相同的結果"""
+        self.add_review(self.attraction, self.users[0], 5)
+        self.add_review(self.attraction, self.users[1], 3)
+        self.add_review(self.attraction, self.users[2], 1, is_published=False)
+        expected = self.summary()
+        AttractionRatingSummary.objects.all().delete()
+
+        out = StringIO()
+        call_command('rebuild_rating_summaries', stdout=out)
+
+        rebuilt = self.summary()
+        self.assertIn('1 attractions', out.getvalue())
+        for field in ['review_count', 'rating_sum', 'avg_rating', 'rating_1', 'rating_3', 'rating_5']:
+            self.assertEqual(getattr(rebuilt, field), getattr(expected, field))
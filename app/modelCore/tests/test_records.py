@@ -0,0 +1,54 @@
+from django.test import SimpleTestCase
+from modelCore.models import Destination, Park
+from modelCore.records import DestinationRecord, ParkRecord
+from modelCore.renderers import FastJSONRenderer
+from modelCore.serializers import DestinationSerializer, ParkSerializer
+import json
+import uuid
+
+class RecordSerializationParityTest(SimpleTestCase):
+    """測試緩存記錄與模型實例的序列化輸出相同"""
+
+    def setUp(self):
+        self.destination = Destination(id=uuid.uuid4(), name='東京迪士尼度假區', slug='tokyo-disney-resort')
+        self.destination_record = DestinationRecord(
+            id=str(self.destination.id), name=self.destination.name, slug=self.destination.slug
+        )
+
+    def render(self, data):
+        return json.loads(FastJSONRenderer().render(data))
+
+    def assertParity(self, serializer_class, instance, record):
+        """記錄走 as_representation()，模型實例走 ModelSerializer，渲染後的 JSON 應相同"""
+        self.assertEqual(
+            self.render(serializer_class(record).data),
+            self.render(serializer_class(instance).data)
+        )
+
+    def test_destination(self):
+        """測試目的地記錄"""
+        self.assertParity(DestinationSerializer, self.destination, self.destination_record)
+
+    def test_park(self):
+        """測試公園記錄，包括目的地名稱和 slug"""
+        park = Park(id=uuid.uuid4(), name='東京迪士尼海洋', destination=self.destination)
+        record = ParkRecord(id=str(park.id), name=park.name, destination=self.destination_record)
+
+        self.assertParity(ParkSerializer, park, record)
+
+    def test_park_without_destination(self):
+        """測試沒有目的地的公園記錄"""
+        park = Park(id=uuid.uuid4(), name='無目的地公園')
+        record = ParkRecord(id=str(park.id), name=park.name)
+
+        self.assertParity(ParkSerializer, park, record)
+
+    def test_many(self):
+        """測試列表序列化"""
+        parks = [Park(id=uuid.uuid4(), name=f'公園 {i}', destination=self.destination) for i in range(3)]
+        records = [ParkRecord(id=str(p.id), name=p.name, destination=self.destination_record) for p in parks]
+
+        self.assertEqual(
+            self.render(ParkSerializer(records, many=True).data),
+            self.render(ParkSerializer(parks, many=True).data)
+        )
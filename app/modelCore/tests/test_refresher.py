@@ -0,0 +1,36 @@
+from unittest.mock import patch
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from modelCore.refresher import CatalogRefresher
+from test_attraction_api import AttractionApiTestMixin
+import threading
+
+@override_settings(PARK_DATA_SOURCE='database')
+class CatalogRefresherTest(AttractionApiTestMixin, TestCase):
+    """測試上游同步只由 refresh_catalog 命令啟動"""
+
+    def setUp(self):
+        self.create_catalog(attraction_count=1)
+        self.client.force_login(self.users[0])
+
+    @patch('modelCore.refresher.ThemeParksService.sync_destinations', return_value=(True, ''))
+    def test_request_does_not_start_sync(self, sync):
+        """測試數據庫模式的請求不同步上游，也不啟動後台線程"""
+        threads = set(threading.enumerate())
+
+        response = self.client.get('/api/modelCore/parks/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(threading.enumerate()) - threads, set())
+        sync.assert_not_called()
+
+    def test_interval_disabled(self):
+        """測試運行測試時同步間隔為 0，不會循環同步上游"""
+        self.assertEqual(CatalogRefresher().interval, 0)
+
+    @patch('modelCore.refresher.ThemeParksService.sync_destinations', return_value=(True, ''))
+    def test_command_once(self, sync):
+        """測試 --once 同步一次後返回"""
+        call_command('refresh_catalog', '--once')
+
+        sync.assert_called_once_with()
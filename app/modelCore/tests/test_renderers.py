@@ -0,0 +1,93 @@
+from decimal import Decimal
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from modelCore.renderers import FastJSONRenderer
+from app.middleware import choose_encoding
+from test_attraction_api import AttractionApiTestMixin
+import datetime
+import gzip
+import json
+import uuid
+
+class FastJSONRendererTest(TestCase):
+    """測試快速 JSON 渲染器與默認渲染器輸出相同"""
+
+    def test_same_output_as_json_renderer(self):
+        """測試 UUID、Decimal、日期時間和特殊字符的輸出與 JSONRenderer 相同"""
+        data = {
+            'id': uuid.uuid4(),
+            'price': Decimal('1200.50'),
+            'created_at': timezone.now(),
+            'naive': datetime.datetime(2024, 1, 2, 3, 4, 5, 678000),
+            'date': datetime.date(2024, 1, 2),
+            'time': datetime.time(9, 30),
+            'duration': datetime.timedelta(minutes=5),
+            'name': '加勒比海盜  ',
+            'items': [{'rating': 4.5, 'tags': ('a', 'b'), 'empty': None}],
+            'big': 2 ** 70,
+        }
+
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_indent_uses_json_renderer(self):
+        """測試請求縮進時輸出與 JSONRenderer 相同"""
+        data = {'name': '測試', 'values': [1, 2]}
+        media_type = 'application/json; indent=2'
+
+        self.assertEqual(
+            FastJSONRenderer().render(data, media_type),
+            JSONRenderer().render(data, media_type)
+        )
+
+class CompressionMiddlewareTest(AttractionApiTestMixin, TestCase):
+    """測試響應壓縮"""
+
+    def setUp(self):
+        self.create_catalog(attraction_count=20)
+        self.client.force_login(self.users[0])
+
+    def test_gzip_large_json(self):
+        """測試大的 JSON 響應按 Accept-Encoding 壓縮"""
+        plain = self.client.get('/api/attractions/')
+        response = self.client.get('/api/attractions/', HTTP_ACCEPT_ENCODING='gzip, deflate')
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+        self.assertLess(len(response.content), len(plain.content))
+        self.assertEqual(json.loads(gzip.decompress(response.content)), plain.json())
+
+    def test_small_and_unaccepted_not_compressed(self):
+        """測試小響應和不接受壓縮的請求返回原始內容"""
+        small = self.client.get(f'/api/attractions/{self.attractions[0].id}/', HTTP_ACCEPT_ENCODING='gzip')
+        refused = self.client.get('/api/attractions/', HTTP_ACCEPT_ENCODING='gzip;q=0, identity')
+
+        self.assertFalse(small.has_header('Content-Encoding'))
+        self.assertFalse(refused.has_header('Content-Encoding'))
+        self.assertIn('Accept-Encoding', refused['Vary'])
+
+    @override_settings(COMPRESSION_MIN_SIZE=0)
+    def test_html_not_compressed(self):
+        """測試 HTML 頁面不壓縮"""
+        response = self.client.get('/', HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_streaming_export(self):
+        """測試串流導出逐塊壓縮"""
+        plain = b''.join(self.client.get('/api/export/').streaming_content)
+        response = self.client.get('/api/export/', HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertFalse(response.has_header('Content-Length'))
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), plain)
+
+    def test_choose_encoding(self):
+        """測試按權重選擇編碼"""
+        self.assertEqual(choose_encoding('gzip'), 'gzip')
+        self.assertEqual(choose_encoding('*'), choose_encoding('br, gzip'))
+        self.assertIsNone(choose_encoding(''))
+        self.assertIsNone(choose_encoding('identity, *;q=0'))
+        self.assertIsNone(choose_encoding('gzip;q=0.0'))
@@ -0,0 +1,97 @@
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import TestCase
+from unittest.mock import patch
+from modelCore.generations import get_cache, get_generations, generation_batch
+from modelCore.models import Attraction, Park
+from test_attraction_api import AttractionApiTestMixin
+import uuid
+
+class ResponseCacheTest(AttractionApiTestMixin, TestCase):
+    """測試匿名目錄 GET 的響應緩存"""
+
+    def setUp(self):
+        get_cache().clear()
+        self.create_catalog(attraction_count=3)
+
+    def test_isolated_from_dev_server(self):
+        """測試運行測試時目錄緩存使用進程內存，不與開發服務器共享"""
+        self.assertIsInstance(get_cache(), LocMemCache)
+
+    def test_hit_costs_no_queries(self):
+        """測試緩存命中不查詢數據庫且內容相同"""
+        first = self.client.get('/api/attractions/', {'park': self.park.id})
+
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/attractions/', {'park': self.park.id})
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_save_invalidates(self):
+        """測試保存或刪除數據、添加評論後緩存失效"""
+        self.client.get('/api/attractions/')
+
+        Attraction.objects.filter(pk=self.attractions[0].pk).first().save()
+        with self.assertNumQueries(3):
+            self.client.get('/api/attractions/')
+
+        self.add_review(self.attractions[0], self.users[0], 5)
+        response = self.client.get(f'/api/attractions/{self.attractions[0].id}/')
+        self.assertEqual(response.json()['review_count'], 1)
+
+    def test_authenticated_requests_bypass_cache(self):
+        """測試已登入用戶不使用緩存"""
+        self.client.get(f'/api/parks/{self.park.id}/')
+        # queryset.update 不發送信號，匿名請求仍返回緩存內容
+        Park.objects.filter(pk=self.park.pk).update(name='新名稱')
+        self.assertEqual(self.client.get(f'/api/parks/{self.park.id}/').json()['name'], '測試公園')
+
+        self.client.force_login(self.users[0])
+        self.assertEqual(self.client.get(f'/api/parks/{self.park.id}/').json()['name'], '新名稱')
+
+    def test_generation_batch_bumps_once(self):
+        """測試批量同步只在結束時更新一次版本"""
+        before, = get_generations([Park])
+        with generation_batch():
+            for i in range(3):
+                Park.objects.create(id=uuid.uuid4(), name=f'同步公園 {i}', destination=self.destination)
+            self.assertEqual(get_generations([Park]), (before,))
+        self.assertEqual(get_generations([Park]), (before + 1,))
+
+class UnavailableCache:
+    """所有操作都連接失敗的緩存"""
+
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            raise ConnectionError('cache is down')
+        return fail
+
+class CacheUnavailableTest(AttractionApiTestMixin, TestCase):
+    """測試緩存後端不可用時不緩存，讀寫照常"""
+
+    def setUp(self):
+        self.create_catalog(attraction_count=2)
+        patcher = patch('modelCore.generations.get_cache', return_value=UnavailableCache())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_writes_and_reads(self):
+        """測試保存觸發的版本遞增失敗時不影響保存，匿名請求返回最新數據"""
+        self.assertIsNone(get_generations([Park]))
+        self.park.name = '改名公園'
+        self.park.save()
+        Attraction.objects.create(id=uuid.uuid4(), name='新設施', park=self.park)
+
+        with patch('modelCore.mixins.get_cache', return_value=UnavailableCache()):
+            park = self.client.get(f'/api/parks/{self.park.id}/')
+            attractions = self.client.get('/api/attractions/')
+
+        self.assertEqual(park.json()['name'], '改名公園')
+        self.assertNotIn('ETag', park)
+        self.assertEqual(attractions.json()['count'], 3)
+
+    def test_index(self):
+        """測試首頁的目的地樹直接生成"""
+        self.client.force_login(self.users[0])
+        with patch('api.views.get_cache', return_value=UnavailableCache()):
+            self.assertContains(self.client.get('/'), '測試公園')
@@ -0,0 +1,142 @@
+from django.test import SimpleTestCase, TestCase
+from modelCore import search
+from modelCore.models import Attraction, Destination, Park, User
+import uuid
+
+class TokenizeTest(SimpleTestCase):
+    """測試搜索分詞"""
+
+    def test_cjk_bigrams_and_latin_words(self):
+        """測試中日韓文字切分為二元組，拉丁文字保持完整單詞"""
+        self.assertEqual(
+            search.tokenize('加勒比海盜 Pirates ＡＢＣ'),
+            ['加勒', '勒比', '比海', '海盜', '盜', 'pirates', 'abc']
+        )
+
+    def test_match_query(self):
+        """測試查詢語法：中文匹配二元組，最後的拉丁單詞使用前綴"""
+        self.assertEqual(search.build_match_query('加勒比 pira'), '"加勒" "勒比" "pira"*')
+        self.assertEqual(search.build_match_query('海'), '"海"*')
+        self.assertEqual(search.build_match_query('"; DROP'), '"drop"*')
+
+class CatalogSearchTest(TestCase):
+    """測試目錄全文搜索"""
+
+    def setUp(self):
+        self.destination = Destination.objects.create(id=uuid.uuid4(), name='東京迪士尼度假區', slug='tokyo')
+        self.park = Park.objects.create(id=uuid.uuid4(), name='東京迪士尼海洋', destination=self.destination)
+        self.pirates = Attraction.objects.create(
+            id=uuid.uuid4(), name='加勒比海盜', park=self.park, description='Pirates of the Caribbean'
+        )
+        self.mountain = Attraction.objects.create(
+            id=uuid.uuid4(), name='Space Mountain', park=self.park, description='太空山雲霄飛車'
+        )
+
+    def search(self, **params):
+        response = self.client.get('/api/search/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()['results']
+
+    def test_index_available(self):
+        """測試 SQLite 上使用 FTS5 索引，檢查結果只查詢一次"""
+        self.assertIsInstance(search.get_backend(), search.SQLiteFTSBackend)
+        with self.assertNumQueries(0):
+            self.assertTrue(search.fts_available())
+
+        search.reset_fts_available()
+        with self.assertNumQueries(1):
+            self.assertTrue(search.fts_available())
+
+    def test_cjk_and_prefix(self):
+        """測試中文子串、單字和英文前綴搜索"""
+        self.assertEqual([r['id'] for r in self.search(q='勒比海')], [str(self.pirates.id)])
+        self.assertEqual([r['id'] for r in self.search(q='盜')], [str(self.pirates.id)])
+        self.assertEqual([r['name'] for r in self.search(q='spa')], ['Space Mountain'])
+
+    def test_name_ranks_above_description(self):
+        """測試名稱匹配排在描述匹配之前"""
+        Attraction.objects.create(id=uuid.uuid4(), name='飛車', park=self.park)
+
+        results = self.search(q='飛車', type='attraction')
+
+        self.assertEqual([r['name'] for r in results], ['飛車', 'Space Mountain'])
+        self.assertEqual(results[1]['context'], '東京迪士尼海洋')
+
+    def test_type_filter(self):
+        """測試按類型過濾"""
+        self.assertEqual({r['type'] for r in self.search(q='東京')}, {'destination', 'park'})
+        self.assertEqual([r['type'] for r in self.search(q='東京', type='park')], ['park'])
+        self.assertEqual(self.client.get('/api/search/', {'q': 'x', 'type': 'ride'}).status_code, 400)
+
+    def test_kept_in_sync(self):
+        """測試保存、改名和刪除後索引同步"""
+        self.pirates.name = '幽靈公館'
+        self.pirates.save()
+        self.assertEqual(self.search(q='加勒比'), [])
+        self.assertEqual(len(self.search(q='幽靈')), 1)
+
+        self.park.name = '迪士尼樂園'
+        self.park.save()
+        self.assertEqual(self.search(q='幽靈')[0]['context'], '迪士尼樂園')
+
+        self.mountain.delete()
+        self.assertEqual(self.search(q='mountain'), [])
+
+    def test_batch_reindexes_touched_rows(self):
+        """測試批量同步結束後只重建涉及的行"""
+        search.get_backend().remove(search.DOCUMENTS['attraction'], [self.pirates.pk])
+
+        with search.search_batch():
+            Attraction.objects.create(id=uuid.uuid4(), name='巨雷山', park=self.park)
+            self.mountain.delete()
+            self.assertEqual(self.search(q='巨雷'), [])
+        self.assertEqual(len(self.search(q='巨雷')), 1)
+        self.assertEqual(self.search(q='mountain'), [])
+        # 未涉及的行不重建
+        self.assertEqual(self.search(q='加勒比'), [])
+
+        with search.search_batch():
+            self.park.name = '迪士尼樂園'
+            self.park.save()
+        self.assertEqual(self.search(q='加勒比')[0]['context'], '迪士尼樂園')
+
+    def test_batch_failure_skips_reindex(self):
+        """測試批量同步出錯時不更新索引"""
+        with self.assertRaises(ValueError), search.search_batch():
+            Attraction.objects.create(id=uuid.uuid4(), name='巨雷山', park=self.park)
+            raise ValueError
+
+        self.assertEqual(self.search(q='巨雷'), [])
+        self.pirates.save()
+        self.assertEqual(len(self.search(q='加勒比')), 1)
+
+    def test_like_fallback(self):
+        """測試沒有 FTS5 時的 icontains 後備搜索"""
+        results = search.LikeSearchBackend().search('mountain')
+
+        self.assertEqual([r['id'] for r in results], [str(self.mountain.id)])
+
+class AdminSearchTest(TestCase):
+    """測試後台搜索框"""
+
+    def setUp(self):
+        self.destination = Destination.objects.create(id=uuid.uuid4(), name='東京迪士尼度假區', slug='tokyo')
+        Destination.objects.create(id=uuid.uuid4(), name='上海迪士尼度假區', slug='shanghai')
+        self.park = Park.objects.create(id=uuid.uuid4(), name='東京迪士尼海洋', destination=self.destination)
+        self.mountain = Attraction.objects.create(id=uuid.uuid4(), name='Space Mountain', park=self.park)
+        self.client.force_login(User.objects.create_superuser(email='admin@example.com', password='password'))
+
+    def changelist(self, model, q):
+        response = self.client.get(f'/admin/modelCore/{model}/', {'q': q})
+        self.assertEqual(response.status_code, 200)
+        return list(response.context['cl'].result_list)
+
+    def test_search_fields_kept(self):
+        """測試仍按 search_fields 搜索，可以搜到目的地 slug"""
+        self.assertEqual(self.changelist('destination', 'tokyo'), [self.destination])
+        self.assertEqual(self.changelist('destination', 'oky'), [self.destination])
+
+    def test_index_matches_added(self):
+        """測試加上全文索引的匹配，例如全形字母"""
+        self.assertEqual(self.changelist('attraction', 'ｓｐａｃｅ'), [self.mountain])
+        self.assertEqual(self.changelist('park', '東京'), [self.park])
@@ -0,0 +1,60 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from modelCore.models import TicketType
+from test_attraction_api import AttractionApiTestMixin
+
+class SparseFieldsetTest(AttractionApiTestMixin, TestCase):
+    """測試 ?fields= / ?omit= 稀疏字段"""
+
+    def setUp(self):
+        self.create_catalog(attraction_count=3)
+        self.add_review(self.attractions[0], self.users[0], 4)
+
+    def test_fields_prunes_payload_and_columns(self):
+        """測試只返回並只查詢請求的字段"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/attractions/', {'fields': 'id,name,latitude,longitude'})
+
+        item = response.json()['results'][0]
+        self.assertEqual(set(item), {'id', 'name', 'latitude', 'longitude'})
+        page_sql = queries.captured_queries[-1]['sql']
+        self.assertNotIn('description', page_sql)
+        self.assertNotIn('modelCore_attractionratingsummary', page_sql)
+        self.assertNotIn('modelCore_park', page_sql)
+
+    def test_related_and_method_fields(self):
+        """測試請求關聯字段和評論統計時保持正確的連接"""
+        response = self.client.get(
+            f'/api/attractions/{self.attractions[0].id}/',
+            {'fields': 'id,destination_name,review_count'}
+        )
+
+        self.assertEqual(response.json(), {
+            'id': str(self.attractions[0].id),
+            'destination_name': '測試目的地',
+            'review_count': 1,
+        })
+
+    def test_omit(self):
+        """測試 omit 排除字段，且遊標分頁仍然可用"""
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/attractions/', {
+                'omit': 'description,review_count,avg_rating',
+                'pagination': 'cursor',
+                'page_size': 2,
+            })
+
+        item = response.json()['results'][0]
+        self.assertNotIn('description', item)
+        self.assertNotIn('avg_rating', item)
+        self.assertIn('park_name', item)
+        self.assertIsNotNone(response.json()['next'])
+
+    def test_ticket_types_fields(self):
+        """測試票種列表支持稀疏字段"""
+        TicketType.objects.create(park=self.park, name='成人票', price=100)
+
+        response = self.client.get('/api/ticket-types/', {'fields': 'name,price'})
+
+        self.assertEqual(response.json()['results'], [{'name': '成人票', 'price': '100.00'}])
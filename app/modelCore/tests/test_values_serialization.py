@@ -0,0 +1,63 @@
+from unittest.mock import patch
+from django.test import TestCase, override_settings
+from modelCore.values import ValuesPlan
+from modelCore.models import Attraction, TicketType
+from test_attraction_api import AttractionApiTestMixin
+
+class ValuesSerializationParityTest(AttractionApiTestMixin, TestCase):
+    """測試 values() 快速序列化與序列化器輸出完全一致"""
+
+    def setUp(self):
+        self.create_catalog(attraction_count=4)
+        self.add_review(self.attractions[0], self.users[0], 5)
+        self.add_review(self.attractions[0], self.users[1], 2)
+        self.add_review(self.attractions[1], self.users[0], 3, is_published=False)
+        Attraction.objects.filter(pk=self.attractions[2].pk).update(
+            image='attractions/test.jpg', latitude=None, description=''
+        )
+        TicketType.objects.create(park=self.park, name='成人票', description='全日', price='99.50')
+        TicketType.objects.create(park=self.park, name='兒童票', price=50, is_active=False)
+        # 登入後不使用響應緩存，兩種路徑都會實際執行
+        self.client.force_login(self.users[0])
+
+    def assertParity(self, url, params=None):
+        with override_settings(CATALOG_VALUES_SERIALIZATION=False):
+            expected = self.client.get(url, params)
+        actual = self.client.get(url, params)
+
+        self.assertEqual(actual.status_code, 200)
+        self.assertEqual(actual.content, expected.content)
+
+    def test_attractions(self):
+        """測試吸引設施列表"""
+        self.assertParity('/api/attractions/')
+        self.assertParity('/api/attractions/', {'park': self.park.id, 'page_size': 2, 'page': 2})
+
+    def test_attractions_cursor(self):
+        """測試遊標分頁"""
+        self.assertParity('/api/attractions/', {'pagination': 'cursor', 'page_size': 3})
+        next_url = self.client.get('/api/attractions/', {'pagination': 'cursor', 'page_size': 3}).json()['next']
+        self.assertParity(next_url)
+
+    def test_sparse_fields(self):
+        """測試稀疏字段"""
+        self.assertParity('/api/attractions/', {'fields': 'id,name,avg_rating,image'})
+        self.assertParity('/api/attractions/', {'omit': 'description,park'})
+
+    def test_parks_and_ticket_types(self):
+        """測試公園和票種列表"""
+        self.assertParity('/api/parks/')
+        self.assertParity('/api/ticket-types/')
+        self.assertParity('/api/ticket-types/', {'fields': 'name,price,park_name'})
+
+    def test_list_does_not_build_instances(self):
+        """測試列表走 values() 快速路徑，不創建模型實例，查詢數量與序列化器相同"""
+        render_many = ValuesPlan.render_many
+        with patch.object(Attraction, '__init__', side_effect=AssertionError('Attraction instance built')), \
+                patch.object(ValuesPlan, 'render_many', autospec=True, side_effect=render_many) as rendered, \
+                self.assertNumQueries(5):
+            response = self.client.get('/api/attractions/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), 4)
+        rendered.assert_called_once()
@@ -11,4 +11,5 @@ router.register(r'destinations', views.DestinationViewSet)
 urlpatterns = [
     path('', include(router.urls)),
     path('current-user/', views.current_user, name='current-user'),
+    path('cache-stats/', views.cache_stats, name='cache-stats'),
 ] 
\ No newline at end of file
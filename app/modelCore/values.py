@@ -0,0 +1,131 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from rest_framework import serializers
+
+class ValuesPlan:
+    """
+    Precompiled `.values()` rendering for a ModelSerializer
+
+    Each serializer field is mapped to the `.values()` lookups it reads and a
+    converter that turns the raw column values into the field's output. The
+    converters call the serializer fields' own `to_representation`, so rows
+    rendered from value dicts match what the serializer produces from model
+    instances. Method fields are supported when the serializer declares them
+    in `values_method_fields` as {name: (lookups, function)}.
+
+    `compile()` returns None when a field cannot be read from plain columns
+    (nested serializers, '*' sources, nullable hops, undeclared method
+    fields); callers then use the regular serializer.
+    """
+
+    def __init__(self, lookups, converters):
+        self.lookups = lookups
+        self.converters = converters
+
+    @classmethod
+    def compile(cls, serializer, model):
+        """
+        Build the plan for a serializer instance
+
+        Args:
+            serializer (Serializer): Serializer with its context (fields are read after sparse selection)
+            model (type): Model of the queryset that will be rendered
+
+        Returns:
+            ValuesPlan: Compiled plan, or None if the serializer is not supported
+        """
+        method_fields = getattr(serializer, 'values_method_fields', {})
+        lookups = []
+        converters = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, serializers.SerializerMethodField):
+                if name not in method_fields:
+                    return None
+                field_lookups, function = method_fields[name]
+                converter = cls._method_converter(field_lookups, function)
+            else:
+                compiled = cls._field_converter(model, field)
+                if compiled is None:
+                    return None
+                lookup, convert = compiled
+                field_lookups = (lookup,)
+                converter = cls._column_converter(lookup, convert)
+            lookups.extend(lookup for lookup in field_lookups if lookup not in lookups)
+            converters.append((name, converter))
+        return cls(lookups, converters)
+
+    @staticmethod
+    def _column_converter(lookup, convert):
+        def converter(row):
+            value = row[lookup]
+            return None if value is None else convert(value)
+        return converter
+
+    @staticmethod
+    def _method_converter(lookups, function):
+        def converter(row):
+            return function(*[row[lookup] for lookup in lookups])
+        return converter
+
+    @staticmethod
+    def _field_converter(model, field):
+        """
+        Map a serializer field to its `.values()` lookup and value converter
+
+        Returns:
+            tuple: (lookup, converter), or None if the field is not a plain column
+        """
+        if isinstance(field, (serializers.BaseSerializer, serializers.ManyRelatedField)) or field.source == '*':
+            return None
+
+        parts = field.source.split('.')
+        for i, part in enumerate(parts):
+            try:
+                model_field = model._meta.get_field(part)
+            except FieldDoesNotExist:
+                return None
+            if not model_field.concrete:
+                return None
+            last = i == len(parts) - 1
+            if model_field.is_relation:
+                if last:
+                    break
+                # DRF skips the field when a nullable hop is empty, values() would give None
+                if model_field.null:
+                    return None
+                model = model_field.related_model
+            elif not last:
+                return None
+
+        lookup = '__'.join(parts)
+        if model_field.is_relation:
+            if not isinstance(field, serializers.PrimaryKeyRelatedField):
+                return None
+            if field.pk_field is not None:
+                return lookup, field.pk_field.to_representation
+            return lookup, lambda value: value
+        if isinstance(model_field, models.FileField):
+            # FileField representations need a FieldFile to build the URL
+            def convert_file(value, model_field=model_field, field=field):
+                return field.to_representation(model_field.attr_class(None, model_field, value))
+            return lookup, convert_file
+        return lookup, field.to_representation
+
+    def render(self, row):
+        """
+        Render one `.values()` row
+
+        Args:
+            row (dict): Row keyed by lookup
+
+        Returns:
+            dict: Serialized item
+        """
+        return {name: converter(row) for name, converter in self.converters}
+
+    def render_many(self, rows):
+        """Render an iterable of `.values()` rows"""
+        render = self.render
+        return [render(row) for row in rows]
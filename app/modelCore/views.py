@@ -3,7 +3,11 @@ from rest_framework import viewsets, status, permissions, mixins
 from rest_framework.decorators import action, api_view, permission_classes, authentication_classes
 from rest_framework.response import Response
 from .models import Park, Destination, TicketType, Order, OrderItem, Ticket, Cart, CartItem
-from .database import SyncParkDatabase, ParkDatabase
+from .database import SyncParkDatabase, ParkDatabase, Caches
+from .records import DestinationRecord
+from .mixins import (
+    ConditionalGetMixin, CachedResponseMixin, SparseFieldsetViewMixin, ValuesListMixin, BatchRetrieveMixin
+)
 from .serializers import (
     ParkSerializer, DestinationSerializer, TicketTypeSerializer,
     TicketTypeListSerializer, OrderSerializer, OrderDetailSerializer,
@@ -12,11 +16,12 @@ from .serializers import (
 from django.conf import settings
 from .services import ThemeParksService
 from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
-from django.db.models import Q
+from django.db.models import Q, Prefetch
 from django.db.models.functions import Coalesce
 from django.db.models import F, Sum, Case, When, Value, CharField, OuterRef, Subquery
 from django.db.models import Count, Avg, Min, Max
 from django.db import transaction
+import os
 import uuid
 from rest_framework.authentication import TokenAuthentication, SessionAuthentication
 from drf_yasg.utils import swagger_auto_schema
@@ -26,25 +31,41 @@ from drf_yasg import openapi
 API_CONFIG = {
     'api_base_url': ThemeParksService.BASE_URL,
     'api_key': getattr(settings, 'PARK_API_KEY', ''),
-    'cacheVersion': 1,  # Cache version, can be modified when data structure changes
+    'cacheVersion': 2,  # Cache version, can be modified when data structure changes
     'useragent': 'VenueManagementSystem/1.0',
+    'snapshotDir': getattr(settings, 'CATALOG_CACHE_SNAPSHOT_DIR', None),
+    'snapshotMaxAge': getattr(settings, 'CATALOG_CACHE_SNAPSHOT_MAX_AGE', None),
+    'statsDir': getattr(settings, 'CATALOG_CACHE_STATS_DIR', None),
+    'entitiesTTL': getattr(settings, 'CATALOG_CACHE_ENTITIES_TTL', 60000),
 }
 
 # Create singleton instance of SyncParkDatabase
 park_db = SyncParkDatabase.get(API_CONFIG)
 
+def serve_from_database():
+    """
+    Whether park/destination endpoints should read from local tables instead of the upstream API
+
+    In database mode the tables are kept current by the refresh_catalog command.
+
+    Returns:
+        bool: True if PARK_DATA_SOURCE is 'database'
+    """
+    return getattr(settings, 'PARK_DATA_SOURCE', 'api') == 'database'
+
 # Create your views here.
 
 class ParkViewSet(viewsets.ReadOnlyModelViewSet):
     """API endpoint for park information"""
     queryset = Park.objects.all()
     serializer_class = ParkSerializer
+    # Upstream data is returned as a plain list, keep the database path in the same shape
+    pagination_class = None
     
     def get_queryset(self):
         """Get park queryset, filtered by request parameters"""
-        # This method might not be called if we use an external API as data source
-        # But we keep it for compatibility
-        queryset = super().get_queryset()
+        # Used in database mode, and as a fallback when the external API fails
+        queryset = super().get_queryset().select_related('destination')
         destination_id = self.request.query_params.get('destination_id')
         
         if destination_id:
@@ -54,6 +75,9 @@ class ParkViewSet(viewsets.ReadOnlyModelViewSet):
     
     def list(self, request, *args, **kwargs):
         """Get list of all parks"""
+        if serve_from_database():
+            return super().list(request, *args, **kwargs)
+        
         try:
             # Use SyncParkDatabase to get all parks
             filter_obj = {}
@@ -70,6 +94,9 @@ class ParkViewSet(viewsets.ReadOnlyModelViewSet):
     
     def retrieve(self, request, *args, **kwargs):
         """Get details of a specific park"""
+        if serve_from_database():
+            return super().retrieve(request, *args, **kwargs)
+        
         try:
             # Use SyncParkDatabase to get specific park
             park_id = kwargs['pk']
@@ -88,54 +115,48 @@ class ParkViewSet(viewsets.ReadOnlyModelViewSet):
     def by_destination(self, request):
         """Get parks grouped by destination"""
         destination_id = request.query_params.get('destination_id')
-        if destination_id:
-            try:
-                # Use SyncParkDatabase to get parks for specific destination
-                parks = park_db.getEntities({'destination.id': destination_id})
-                
-                serializer = self.get_serializer(parks, many=True)
-                return Response(serializer.data)
-            except Exception as e:
-                return Response({"error": f"Failed to get park data: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-        
-        # If no destination ID specified, return all parks grouped by destination
         try:
-            # Use ThemeParksService to get all destinations
-            destinations_data = ThemeParksService.get_all_destinations()
-            
-            result = {}
-            for dest_data in destinations_data:
-                dest_id = dest_data.get('id')
-                
-                # Use SyncParkDatabase to get parks for specific destination
-                parks = park_db.getEntities({'destination.id': dest_id})
-                
-                result[dest_id] = self.get_serializer(parks, many=True).data
-            
-            return Response(result)
+            if serve_from_database():
+                # get_queryset already applies destination_id
+                groups = SyncParkDatabase.group_entities(self.get_queryset(), 'destination.id')
+            else:
+                # Index built once per cache fill, lookups do not scan the park list
+                groups = park_db.getEntitiesGrouped('destination.id')
         except Exception as e:
             return Response({"error": f"Failed to get park data: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        
+        if destination_id:
+            parks = groups.get(str(destination_id), [])
+            serializer = self.get_serializer(parks, many=True)
+            return Response(serializer.data)
+        
+        # Serialize all parks at once, then split the rows back into their groups
+        parks = [park for group in groups.values() for park in group]
+        rows = iter(self.get_serializer(parks, many=True).data)
+        result = {
+            dest_id: [next(rows) for _ in group]
+            for dest_id, group in groups.items()
+        }
+        return Response(result)
 
 class DestinationViewSet(viewsets.ReadOnlyModelViewSet):
     """API endpoint for destination information"""
     queryset = Destination.objects.all()
     serializer_class = DestinationSerializer
+    # Upstream data is returned as a plain list, keep the database path in the same shape
+    pagination_class = None
     
     def list(self, request, *args, **kwargs):
         """Get list of all destinations"""
+        if serve_from_database():
+            return super().list(request, *args, **kwargs)
+        
         try:
             # Use ThemeParksService to get all destination data
             destinations_data = ThemeParksService.get_all_destinations()
             
-            # Convert data to destination objects
-            destinations = []
-            for dest_data in destinations_data:
-                destination = Destination(
-                    id=dest_data.get('id'),
-                    name=dest_data.get('name'),
-                    slug=dest_data.get('slug')
-                )
-                destinations.append(destination)
+            # Convert data to destination records
+            destinations = [DestinationRecord.from_data(dest_data) for dest_data in destinations_data]
             
             serializer = self.get_serializer(destinations, many=True)
             return Response(serializer.data)
@@ -145,17 +166,16 @@ class DestinationViewSet(viewsets.ReadOnlyModelViewSet):
     
     def retrieve(self, request, *args, **kwargs):
         """Get details of a specific destination"""
+        if serve_from_database():
+            return super().retrieve(request, *args, **kwargs)
+        
         try:
             # Use ThemeParksService to get specific destination data
             destination_id = kwargs['pk']
             dest_data = ThemeParksService.get_destination_by_id(destination_id)
             
             if dest_data:
-                destination = Destination(
-                    id=dest_data.get('id'),
-                    name=dest_data.get('name'),
-                    slug=dest_data.get('slug')
-                )
+                destination = DestinationRecord.from_data(dest_data)
                 serializer = self.get_serializer(destination)
                 return Response(serializer.data)
             
@@ -167,6 +187,11 @@ class DestinationViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=True, methods=['get'])
     def parks(self, request, pk=None):
         """Get all parks for a specific destination"""
+        if serve_from_database():
+            parks = Park.objects.filter(destination_id=pk).select_related('destination')
+            serializer = ParkSerializer(parks, many=True)
+            return Response(serializer.data)
+        
         try:
             # Use SyncParkDatabase to get parks for specific destination
             parks = park_db.getEntities({'destination.id': pk})
@@ -191,20 +216,34 @@ def current_user(request):
         'is_staff': user.is_staff
     })
 
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+@authentication_classes([TokenAuthentication, SessionAuthentication])
+def cache_stats(request):
+    """
+    Get hit/miss/latency statistics of the in-process catalog caches (staff only)
+    """
+    return Response({
+        'pid': os.getpid(),
+        'caches': [cache.stats.as_dict() for cache in Caches.values()],
+    })
+
 # Ticket and order related viewsets
-class TicketTypeViewSet(viewsets.ModelViewSet):
+class TicketTypeViewSet(CachedResponseMixin, ConditionalGetMixin, SparseFieldsetViewMixin, ValuesListMixin, BatchRetrieveMixin, viewsets.ModelViewSet):
     """Ticket Type Viewset"""
     queryset = TicketType.objects.all()
     serializer_class = TicketTypeSerializer
     authentication_classes = [TokenAuthentication, SessionAuthentication]
+    conditional_timestamp_fields = ('updated_at', 'park__updated_at')
+    cache_models = (TicketType, Park)
     
     def get_permissions(self):
         """
         Set permissions based on action type:
-        - List and retrieve views: Allow unauthenticated access
+        - List, retrieve and batch views: Allow unauthenticated access
         - Create, update, delete views: Require admin permissions
         """
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'batch']:
             permission_classes = [permissions.AllowAny]
         else:
             permission_classes = [permissions.IsAdminUser]
@@ -216,7 +255,8 @@ class TicketTypeViewSet(viewsets.ModelViewSet):
         return TicketTypeSerializer
     
     def get_queryset(self):
-        queryset = super().get_queryset()
+        # park_name reads the park, join it instead of one query per ticket type
+        queryset = super().get_queryset().select_related('park')
         
         # Filter by park
         park_id = self.request.query_params.get('park')
@@ -294,10 +334,19 @@ class OrderViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Regular users can only view their own orders, admins can view all orders"""
+        # Check if this is for swagger documentation generation
+        if getattr(self, 'swagger_fake_view', False):
+            return Order.objects.none()
+        
         user = self.request.user
-        if user.is_staff:
-            return Order.objects.all()
-        return Order.objects.filter(user=user)
+        queryset = Order.objects.all() if user.is_staff else Order.objects.filter(user=user)
+        
+        # Items show their ticket type, tickets of the detail view also the park,
+        # prefetched so the query count does not depend on the order size
+        lookups = [Prefetch('items', queryset=OrderItem.objects.select_related('ticket_type__park'))]
+        if self.action == 'retrieve':
+            lookups.append('items__tickets')
+        return queryset.prefetch_related(*lookups)
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -485,7 +534,14 @@ class CartViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Users can only view their own carts"""
         user = self.request.user
-        return Cart.objects.filter(user=user)
+        # Items are serialized with their ticket types and summed for the total
+        return Cart.objects.filter(user=user).prefetch_related(
+            Prefetch('items', queryset=CartItem.objects.select_related('ticket_type__park'))
+        )
+    
+    def cart_response(self):
+        """Serialize the cart after a change, reloaded since its prefetched items are stale"""
+        return Response(CartSerializer(self.get_object()).data)
     
     def perform_create(self, serializer):
         """Ensure cart is associated with the current user"""
@@ -516,7 +572,7 @@ class CartViewSet(viewsets.ModelViewSet):
                 cart_item.quantity += quantity
                 cart_item.save()
                 
-            return Response(CartSerializer(cart).data)
+            return self.cart_response()
             
         except TicketType.DoesNotExist:
             return Response({"detail": "Specified ticket type does not exist"}, status=status.HTTP_404_NOT_FOUND)
@@ -536,7 +592,7 @@ class CartViewSet(viewsets.ModelViewSet):
             item = CartItem.objects.get(id=item_id, cart=cart)
             item.delete()
                 
-            return Response(CartSerializer(cart).data)
+            return self.cart_response()
             
         except CartItem.DoesNotExist:
             return Response({"detail": "Specified cart item does not exist"}, status=status.HTTP_404_NOT_FOUND)
@@ -561,7 +617,7 @@ class CartViewSet(viewsets.ModelViewSet):
             item.quantity = quantity
             item.save()
                 
-            return Response(CartSerializer(cart).data)
+            return self.cart_response()
             
         except CartItem.DoesNotExist:
             return Response({"detail": "Specified cart item does not exist"}, status=status.HTTP_404_NOT_FOUND)
@@ -573,4 +629,4 @@ class CartViewSet(viewsets.ModelViewSet):
         """Clear the cart"""
         cart = self.get_object()
         cart.items.all().delete()
-        return Response(CartSerializer(cart).data)
+        return self.cart_response()